@@ -0,0 +1,100 @@
+"""Compare the threaded and async scraper engines against the local stub server.
+
+Each engine runs in its own subprocess so peak RSS is measured cleanly.
+
+    python -m benchmarks.bench_engines --events 1000 --latency-ms 50
+"""
+import argparse
+import hashlib
+import json
+import logging
+import resource
+import subprocess
+import sys
+import time
+
+def _output_digest(path: str) -> str:
+    """Order-independent digest of a CSV's rows"""
+    with open(path, encoding='utf-8') as f:
+        header = f.readline()
+        rows = sorted(f)
+    return hashlib.sha256((header + ''.join(rows)).encode()).hexdigest()
+
+def run_worker(args) -> dict:
+    from .common import configure_stub_providers, make_app, seed_events
+    from .fixture_set import FixtureSet
+    from .stub_server import StubProviderServer
+
+    logging.basicConfig(level=logging.WARNING)
+    fixtures = FixtureSet.load(args.fixtures) if args.fixtures else None
+    with StubProviderServer(picks_per_event=args.picks, latency_ms=args.latency_ms, fixtures=fixtures) as server:
+        configure_stub_providers(server)
+        app = make_app()
+
+        from src.scraper.scraper import EventScraper
+        from src.ticketmaster.api import TicketmasterAPI
+        from src.todaytix.api import TodayTixAPI
+
+        with app.app_context():
+            job = seed_events(args.events - args.events // 4, args.events // 4)
+            scraper = EventScraper(
+                todaytix_api=TodayTixAPI(),
+                ticketmaster_api=TicketmasterAPI(),
+                output_dir=app.config['OUTPUT_FILE_DIR'],
+                concurrent_requests=args.concurrency,
+                engine=args.engine
+            )
+            started = time.perf_counter()
+            success, output_file = scraper.run(job)
+            elapsed = time.perf_counter() - started
+
+            return {
+                'engine': args.engine,
+                'concurrency': args.concurrency,
+                'events': args.events,
+                'success': success,
+                'seconds': round(elapsed, 3),
+                'events_per_second': round(args.events / elapsed, 1),
+                'tickets': job.total_tickets_found,
+                'requests': server.requests_served,
+                'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                'output_digest': _output_digest(output_file) if output_file else None
+            }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=400)
+    parser.add_argument('--picks', type=int, default=120, help='Ticketmaster picks per event')
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--fixtures', help='Replay recorded responses from this directory instead of synthetic ones')
+    parser.add_argument('--threaded-concurrency', type=int, default=20)
+    parser.add_argument('--async-concurrency', type=int, default=200)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--engine', default='threaded', help=argparse.SUPPRESS)
+    parser.add_argument('--concurrency', type=int, default=20, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    results = []
+    for engine, concurrency in (('threaded', args.threaded_concurrency), ('async', args.async_concurrency)):
+        command = [
+            sys.executable, '-m', 'benchmarks.bench_engines', '--worker',
+            '--engine', engine, '--concurrency', str(concurrency),
+            '--events', str(args.events), '--picks', str(args.picks), '--latency-ms', str(args.latency_ms)
+        ]
+        if args.fixtures:
+            command += ['--fixtures', args.fixtures]
+        completed = subprocess.run(command, capture_output=True, text=True, check=True)
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    print(f"{'engine':<10}{'conc':>6}{'seconds':>10}{'events/s':>10}{'tickets':>10}{'rss MB':>9}")
+    for r in results:
+        print(f"{r['engine']:<10}{r['concurrency']:>6}{r['seconds']:>10}{r['events_per_second']:>10}{r['tickets']:>10}{r['peak_rss_mb']:>9}")
+    identical = len({r['output_digest'] for r in results}) == 1
+    print(f"Output identical across engines: {identical}")
+
+if __name__ == '__main__':
+    main()
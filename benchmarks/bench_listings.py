@@ -0,0 +1,129 @@
+"""Measure memory and GC cost of the scraper's in-flight listings on a synthetic run.
+
+Builds rows for --listings synthetic seats through EventScraper.process_seats,
+keeps them all in flight (as queued results or distributed batches would be),
+then streams them to CSV. Runs in a subprocess so peak RSS is measured cleanly.
+
+    python -m benchmarks.bench_listings --listings 1000000
+"""
+import argparse
+import gc
+import hashlib
+import json
+import logging
+import resource
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+
+def _rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def _synthetic_seats(event_index: int, count: int):
+    return [{
+        'section': f'Section {100 + (event_index + i) % 40}',
+        'row': chr(65 + i % 20),
+        'seats': f'{i % 30 + 1},{i % 30 + 2}',
+        'price': 45.0 + (i * 7 % 300) / 2,
+        'face_value': 40.0 + (i * 7 % 300) / 2,
+        'type': 'standard'
+    } for i in range(count)]
+
+class GCTimer:
+    """Time spent in the cyclic garbage collector, via gc.callbacks"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.collections = 0
+        self._started = None
+
+    def __call__(self, phase, info):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            self.seconds += time.perf_counter() - self._started
+            self.collections += 1
+            self._started = None
+
+def run_worker(args) -> dict:
+    from .common import make_app
+
+    logging.basicConfig(level=logging.WARNING)
+    app = make_app()
+
+    from src.models.database import Event
+    from src.scraper.output import StreamingCSVWriter
+    from src.scraper.scraper import EventScraper
+
+    events_count = max(1, args.listings // args.per_event)
+    today = date.today()
+    events = [Event(
+        id=i + 1,
+        website='TicketMaster',
+        event_id=f'SYN-{i}',
+        ticketmaster_id=f'TM{i:08d}',
+        event_name=f'Synthetic Concert {i}',
+        event_date=today + timedelta(days=i % 180),
+        event_time='19:30',
+        venue_name=f'Arena {i % 40}',
+        markup=1.6
+    ) for i in range(events_count)]
+
+    with app.app_context():
+        scraper = EventScraper(None, None, app.config['OUTPUT_FILE_DIR'])
+        baseline_rss = _rss_mb()
+        timer = GCTimer()
+        gc.collect()
+        gc.callbacks.append(timer)
+
+        started = time.perf_counter()
+        in_flight = []
+        for i, event in enumerate(events):
+            in_flight.append(scraper.process_seats(event, _synthetic_seats(i, args.per_event)))
+        built = time.perf_counter()
+        peak_rss = _rss_mb()
+
+        with StreamingCSVWriter(app.config['OUTPUT_FILE_DIR']) as writer:
+            for rows in in_flight:
+                writer.write_rows(rows)
+            output_file = writer.publish(f"{app.config['OUTPUT_FILE_DIR']}/listings.csv")
+        written = time.perf_counter()
+        gc.callbacks.remove(timer)
+
+    with open(output_file, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    return {
+        'listings': sum(len(rows) for rows in in_flight),
+        'build_seconds': round(built - started, 2),
+        'write_seconds': round(written - built, 2),
+        'gc_seconds': round(timer.seconds, 2),
+        'gc_collections': timer.collections,
+        'rss_growth_mb': round(peak_rss - baseline_rss, 1),
+        'peak_rss_mb': peak_rss,
+        'output_digest': digest
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--listings', type=int, default=1000000)
+    parser.add_argument('--per-event', type=int, default=200)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    command = [
+        sys.executable, '-m', 'benchmarks.bench_listings', '--worker',
+        '--listings', str(args.listings), '--per-event', str(args.per_event)
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    for key, value in result.items():
+        print(f"{key:<16}{value}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Scale test of the catalogue pages and the scrape loop at growing catalogue sizes.
+
+For each size a fresh subprocess fills a throwaway SQLite database with a
+synthetic catalogue (see benchmarks.catalogue), times /api/events, /events and
+/api/events/export through a test client, then runs EventScraper.run against
+the stub provider with the given load profile.
+
+    python -m benchmarks.bench_scale --events 1000,10000,100000 \\
+        --latency lognormal:40:0.6 --listings uniform:0:240 --error-rate 0.02
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+
+PAGES = ('/api/events', '/events', '/api/events/export')
+
+def _rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+def run_worker(args) -> dict:
+    from .catalogue import generate_catalogue
+    from .common import configure_stub_providers, make_app
+    from .stub_server import Distribution, LoadProfile, StubProviderServer
+
+    logging.basicConfig(level=logging.ERROR)
+    app = make_app(web=True)
+    result = {'events': args.events}
+
+    with app.app_context():
+        started = time.perf_counter()
+        counts = generate_catalogue(args.events, seed=args.seed, todaytix_share=args.todaytix_share, headers=args.headers)
+        result['generate_seconds'] = round(time.perf_counter() - started, 2)
+        result['rules'] = counts['rules']
+        database_path = app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]
+        result['db_mb'] = round(os.path.getsize(database_path) / 1024 / 1024, 1)
+
+    if not args.skip_web:
+        client = app.test_client()
+        for path in PAGES:
+            started = time.perf_counter()
+            response = client.get(path)
+            result[f'{path} ms'] = round((time.perf_counter() - started) * 1000)
+            result[f'{path} MB'] = round(len(response.data) / 1024 / 1024, 1)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+
+    if not args.skip_run:
+        profile = LoadProfile(
+            latency_ms=Distribution(args.latency),
+            listings=Distribution(args.listings),
+            error_rate=args.error_rate,
+            error_statuses=tuple(int(status) for status in args.error_statuses.split(',')),
+            retry_after_seconds=args.retry_after
+        )
+        with StubProviderServer(profile=profile, seed=args.seed) as server:
+            configure_stub_providers(server)
+
+            from src.models.database import ScraperJob, db
+            from src.scraper.scraper import EventScraper
+            from src.ticketmaster.api import TicketmasterAPI
+            from src.todaytix.api import TodayTixAPI
+
+            with app.app_context():
+                job = ScraperJob(status='running', interval_minutes=20, concurrent_requests=args.concurrency, engine=args.engine)
+                db.session.add(job)
+                db.session.commit()
+                scraper = EventScraper(
+                    todaytix_api=TodayTixAPI(),
+                    ticketmaster_api=TicketmasterAPI(),
+                    output_dir=app.config['OUTPUT_FILE_DIR'],
+                    concurrent_requests=args.concurrency,
+                    engine=args.engine
+                )
+                started = time.perf_counter()
+                success, _ = scraper.run(job)
+                elapsed = time.perf_counter() - started
+                result.update({
+                    'run_success': success,
+                    'run_seconds': round(elapsed, 1),
+                    'events/s': round(job.events_processed / elapsed, 1),
+                    'tickets': job.total_tickets_found,
+                    'requests': server.requests_served,
+                    'errors': sum(server.errors_served.values())
+                })
+
+    result['peak_rss_mb'] = _rss_mb()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', default='1000,10000', help='Comma-separated catalogue sizes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--todaytix-share', type=float, default=0.3)
+    parser.add_argument('--headers', type=int, default=1000, help='Ticketmaster headers in the pool')
+    parser.add_argument('--engine', default='async')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--latency', default='lognormal:40:0.5', help='Stub latency in ms, e.g. fixed:50 or uniform:20:80')
+    parser.add_argument('--listings', default='uniform:0:240', help='Listings per event')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-statuses', default='500,503,429')
+    parser.add_argument('--retry-after', type=float, help='Retry-After seconds sent with 429/503')
+    parser.add_argument('--skip-web', action='store_true')
+    parser.add_argument('--skip-run', action='store_true')
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args, _ = parser.parse_known_args()
+
+    if args.worker:
+        args.events = int(args.events)
+        print(json.dumps(run_worker(args)))
+        return
+
+    results = []
+    for size in args.events.split(','):
+        command = [sys.executable, '-m', 'benchmarks.bench_scale', '--worker'] + [
+            arg for arg in sys.argv[1:] if not arg.startswith('--events')
+        ] + ['--events', size.strip()]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            sys.exit(f"Scale run with {size} events failed:\n{completed.stderr[-2000:]}")
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        print(' '.join(f'{key}={value}' for key, value in results[-1].items()), flush=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=1)
+
+if __name__ == '__main__':
+    main()
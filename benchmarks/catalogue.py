@@ -0,0 +1,138 @@
+"""Fill a database with a synthetic catalogue for scale testing.
+
+Events are spread over both websites, every city in CITY_URL_MAP, a pool of
+venues and shows, and the next six months. TodayTix events get pattern rules
+and their shows get venue mappings (excluded seats), and a share of
+Ticketmaster events are double-check events, so the scrape loop and the
+events pages see the same mix they do in production. Generation is seeded and
+repeatable.
+
+    python -m benchmarks.catalogue --events 10000 --database-uri sqlite:////tmp/scale.db
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict
+
+from src.constants import CITY_URL_MAP
+from src.models.database import Event, EventRule, TicketmasterHeader, VenueMapping, db
+
+RULE_TYPES = ('even', 'odd', 'consecutive')
+RULE_KEYWORDS = ('EVEN', 'ODD', 'PAIR', 'ALT', 'SIDE')
+SECTIONS = ('Orchestra', 'Mezzanine', 'Balcony', 'Box', 'Stalls', 'Dress Circle')
+
+def generate_catalogue(events: int, seed: int = 0, todaytix_share: float = 0.3, double_check_share: float = 0.02,
+                       rules_share: float = 0.5, shows: int = 400, venues: int = 300, mappings_per_show: int = 3,
+                       headers: int = 50, batch_size: int = 5000) -> Dict[str, int]:
+    """Insert the catalogue with bulk inserts; call inside an app context. Returns row counts."""
+    rng = random.Random(seed)
+    today = date.today()
+    city_ids = list(CITY_URL_MAP.values())
+    show_venues = {show: f'Theatre {rng.randrange(venues)}' for show in range(shows)}
+    counts = {'events': 0, 'rules': 0, 'venue_mappings': 0, 'headers': 0}
+
+    # Rule rows need the generated event ids, so events go in per batch and rules follow
+    for start in range(0, events, batch_size):
+        rows = []
+        for i in range(start, min(start + batch_size, events)):
+            event_date = today + timedelta(days=rng.randrange(180))
+            row = {
+                'event_id': f'SYN-{seed}-{i}',
+                'event_date': event_date,
+                'event_time': rng.choice(('14:00', '19:00', '19:30', '20:00')),
+                'city_id': rng.choice(city_ids),
+                'markup': rng.choice((1.4, 1.5, 1.6, 1.8)),
+                'in_hand': rng.choice(('N', 'Y')),
+                'stock_type': rng.choice(('ELECTRONIC', 'MOBILE_SCREENCAP', None)),
+                'double_check': False,
+                'first_scrape_completed': False
+            }
+            if rng.random() < todaytix_share:
+                show = rng.randrange(shows)
+                row.update({
+                    'website': 'TodayTix',
+                    'todaytix_show_id': str(1000 + show),
+                    'todaytix_event_id': str(500000 + i),
+                    'event_name': f'Synthetic Show {show}',
+                    'venue_name': show_venues[show]
+                })
+            else:
+                row.update({
+                    'website': 'TicketMaster',
+                    'ticketmaster_id': f'SYN{seed:02d}{i:08d}',
+                    'event_name': f'Synthetic Concert {i % (events // 3 + 1)}',
+                    'venue_name': f'Arena {rng.randrange(venues)}',
+                    'double_check': rng.random() < double_check_share
+                })
+            rows.append(row)
+        db.session.execute(db.insert(Event), rows)
+
+        batch_ids = db.session.execute(
+            db.select(Event.id).where(Event.website == 'TodayTix', Event.event_id.in_([r['event_id'] for r in rows]))
+        ).scalars().all()
+        rules = [
+            {'event_id': event_id, 'rule_type': rule_type, 'keyword': rng.choice(RULE_KEYWORDS)}
+            for event_id in batch_ids if rng.random() < rules_share
+            for rule_type in rng.sample(RULE_TYPES, rng.randint(1, len(RULE_TYPES)))
+        ]
+        if rules:
+            db.session.execute(db.insert(EventRule), rules)
+        db.session.commit()
+        counts['events'] += len(rows)
+        counts['rules'] += len(rules)
+
+    mappings = []
+    for show, venue in show_venues.items():
+        for _ in range(mappings_per_show):
+            first = rng.randint(1, 12)
+            mappings.append({
+                'event_name': f'Synthetic Show {show}',
+                'venue_name': venue,
+                'section': rng.choice(SECTIONS),
+                'row': chr(ord('A') + rng.randrange(12)),
+                'seats': ','.join(str(n) for n in range(first, first + rng.randint(1, 4))),
+                'active': True
+            })
+    db.session.execute(db.insert(VenueMapping), mappings)
+    counts['venue_mappings'] = len(mappings)
+
+    # Headers deactivate after three failures, so runs with error rates need a deep pool
+    for i in range(headers):
+        db.session.add(TicketmasterHeader({
+            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:133.0) Gecko/20100101 Firefox/133.0',
+            'Accept': '*/*',
+            'Cookie': f'synthetic={seed}-{i};'
+        }))
+    counts['headers'] = headers
+    db.session.commit()
+    return counts
+
+def main():
+    from flask import Flask
+    from src.config import Config
+    from src.db_utils import migrate_database
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, required=True)
+    parser.add_argument('--database-uri', required=True, help='Database to fill, e.g. sqlite:////tmp/scale.db')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--todaytix-share', type=float, default=0.3)
+    parser.add_argument('--headers', type=int, default=50)
+    args = parser.parse_args()
+
+    app = Flask('benchmarks')
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.database_uri
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    migrate_database(app)
+
+    with app.app_context():
+        started = time.perf_counter()
+        counts = generate_catalogue(args.events, seed=args.seed, todaytix_share=args.todaytix_share, headers=args.headers)
+    print(', '.join(f'{count} {name}' for name, count in counts.items()) + f' in {time.perf_counter() - started:.1f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Helpers shared by the benchmark scripts: an isolated app, seeded events and fake provider config."""
+import os
+import tempfile
+from datetime import date, timedelta
+from flask import Flask
+from src.config import Config
+from src.models.database import db, Event, ScraperJob, TicketmasterHeader
+
+def configure_stub_providers(server):
+    """Point both provider clients at a running StubProviderServer"""
+    from src.ticketmaster.api import TicketmasterAPI
+
+    os.environ['PROXY_API_URL'] = server.base_url
+    os.environ['PROXY_API_KEY'] = 'benchmark'
+    os.environ['TICKETMASTER_API_KEY'] = 'benchmark'
+    os.environ['TICKETMASTER_API_SECRET'] = 'benchmark'
+    # Keep the header service from calling out for real headers
+    os.environ.pop('HEADER_FETCHER_API_URL', None)
+    os.environ.pop('HEADER_FETCHER_API_KEY', None)
+    TicketmasterAPI.BASE_URL = server.ticketmaster_base_url
+
+def make_app(work_dir: str = None, web: bool = False) -> Flask:
+    """Create a minimal app on a throwaway SQLite database, without the scheduler or header task.
+
+    With web=True the UI blueprints and templates are registered too, with
+    login disabled, so pages and API routes can be timed through a test client.
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix='scraper-bench-')
+    output_dir = os.path.join(work_dir, 'output')
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Rooted at src/ when serving pages, so render_template finds src/templates
+    app = Flask('src' if web else 'benchmarks')
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    app.config['OUTPUT_FILE_DIR'] = output_dir
+    db.init_app(app)
+    if web:
+        _register_web(app)
+    with app.app_context():
+        db.create_all()
+        # A cookie-bearing header so TicketmasterAPI never asks the header fetcher for one
+        db.session.add(TicketmasterHeader({
+            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:133.0) Gecko/20100101 Firefox/133.0',
+            'Accept': '*/*',
+            'Cookie': 'benchmark=1'
+        }))
+        db.session.commit()
+    return app
+
+def _register_web(app: Flask):
+    from src.routes import events, scraper, todaytix_events, upload
+    from src.routes.auth import auth_bp, login_manager
+    from src.routes.rules import rules_bp
+    from src.routes.ticketmaster_events import bp as ticketmaster_events_bp
+    from src.routes.venue_mapping import bp as venue_mapping_bp
+
+    app.config['LOGIN_DISABLED'] = True
+    login_manager.init_app(app)
+    for blueprint in (auth_bp, events.bp, scraper.bp, upload.bp, todaytix_events.bp, rules_bp,
+                      venue_mapping_bp, ticketmaster_events_bp):
+        app.register_blueprint(blueprint)
+
+def seed_events(ticketmaster_count: int, todaytix_count: int) -> ScraperJob:
+    """Insert plain events for both providers plus a running job; call inside an app context"""
+    today = date.today()
+    for i in range(ticketmaster_count):
+        db.session.add(Event(
+            website='TicketMaster',
+            event_id=f'BENCH-TM-{i}',
+            ticketmaster_id=f'TM{i:08d}',
+            event_name=f'Benchmark Concert {i}',
+            event_date=today + timedelta(days=i % 180),
+            event_time='19:30',
+            venue_name=f'Arena {i % 40}',
+            markup=1.6
+        ))
+    for i in range(todaytix_count):
+        db.session.add(Event(
+            website='TodayTix',
+            event_id=f'BENCH-TT-{i}',
+            todaytix_show_id=str(1000 + i % 50),
+            todaytix_event_id=str(500000 + i),
+            event_name=f'Benchmark Show {i % 50}',
+            event_date=today + timedelta(days=i % 90),
+            event_time='19:30',
+            venue_name=f'Theatre {i % 50}',
+            markup=1.6
+        ))
+
+    job = ScraperJob(status='running', interval_minutes=20, concurrent_requests=5)
+    db.session.add(job)
+    db.session.commit()
+    return job
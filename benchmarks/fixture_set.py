@@ -0,0 +1,65 @@
+"""Recorded provider responses used by the stub server and the micro-benchmarks.
+
+A fixture directory holds one file per recorded event:
+
+    ticketmaster/<name>.json   list of quickpicks response bodies, one per page (limit 40)
+    todaytix/<name>.json       one TodayTix sections response body
+
+Any event or showtime id maps onto one recording by a stable hash, so a
+catalogue of thousands of events replays a handful of real-shaped responses.
+"""
+import json
+import os
+import zlib
+from typing import Dict, List
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Page size the quickpicks recordings were made with, as TicketmasterAPI requests
+RECORDED_PAGE_LIMIT = 40
+
+class FixtureSet:
+    def __init__(self, quickpicks: Dict[str, List[dict]], sections: Dict[str, dict]):
+        if not quickpicks or not sections:
+            raise ValueError("Fixture set needs at least one Ticketmaster and one TodayTix recording")
+        self.quickpicks = quickpicks
+        self.sections = sections
+        self._quickpicks_names = sorted(quickpicks)
+        self._sections_names = sorted(sections)
+
+    @classmethod
+    def load(cls, fixtures_dir: str = DEFAULT_FIXTURES_DIR) -> 'FixtureSet':
+        def read_dir(name: str) -> Dict:
+            path = os.path.join(fixtures_dir, name)
+            recordings = {}
+            for filename in sorted(os.listdir(path)):
+                if filename.endswith('.json'):
+                    with open(os.path.join(path, filename), encoding='utf-8') as f:
+                        recordings[filename[:-len('.json')]] = json.load(f)
+            return recordings
+
+        return cls(read_dir('ticketmaster'), read_dir('todaytix'))
+
+    @staticmethod
+    def _pick(names: List[str], key: str) -> str:
+        return names[zlib.crc32(key.encode()) % len(names)]
+
+    def quickpicks_pages(self, event_id: str) -> List[dict]:
+        return self.quickpicks[self._pick(self._quickpicks_names, event_id)]
+
+    def quickpicks_page(self, event_id: str, offset: int, limit: int = RECORDED_PAGE_LIMIT) -> dict:
+        """The recorded page at offset; past the last page, an empty one"""
+        if limit != RECORDED_PAGE_LIMIT:
+            raise ValueError(f"Quickpicks were recorded with limit={RECORDED_PAGE_LIMIT}, got {limit}")
+        pages = self.quickpicks_pages(event_id)
+        index = offset // RECORDED_PAGE_LIMIT
+        return pages[index] if index < len(pages) else {'picks': []}
+
+    def sections_response(self, show_id: str, showtime_id: str) -> dict:
+        return self.sections[self._pick(self._sections_names, f'{show_id}-{showtime_id}')]
+
+    def all_quickpicks_pages(self) -> List[dict]:
+        return [page for name in self._quickpicks_names for page in self.quickpicks[name]]
+
+    def all_sections_responses(self) -> List[dict]:
+        return [self.sections[name] for name in self._sections_names]
@@ -0,0 +1,214 @@
+"""Local stub of the Ticketmaster quickpicks API and the TodayTix proxy.
+
+Responses are generated deterministically from the event id, so repeated runs
+against the same catalogue return the same inventory. Given a FixtureSet, the
+server replays recorded responses instead. A LoadProfile makes listing counts
+vary per event and adds sampled latency and injected errors per request.
+"""
+import asyncio
+import json
+import math
+import random
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+from aiohttp import web
+from .fixture_set import FixtureSet
+
+class Distribution:
+    """A sampled quantity written as kind:args, e.g. fixed:50, uniform:10:200, lognormal:40:0.6, exponential:50.
+
+    lognormal takes the median and sigma; exponential takes the mean.
+    """
+
+    ARITY = {'fixed': 1, 'uniform': 2, 'lognormal': 2, 'exponential': 1}
+
+    def __init__(self, spec: str):
+        kind, *args = str(spec).split(':')
+        if kind not in self.ARITY or len(args) != self.ARITY[kind]:
+            raise ValueError(f"Invalid distribution: {spec}")
+        self.spec = spec
+        self.kind = kind
+        self.args = [float(arg) for arg in args]
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == 'fixed':
+            return self.args[0]
+        if self.kind == 'uniform':
+            return rng.uniform(*self.args)
+        if self.kind == 'lognormal':
+            median, sigma = self.args
+            return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        mean = self.args[0]
+        return rng.expovariate(1 / mean) if mean > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return self.spec
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """How the stub behaves: latency per request, listings per event and the share of failed requests"""
+    latency_ms: Distribution = field(default_factory=lambda: Distribution('fixed:50'))
+    listings: Distribution = field(default_factory=lambda: Distribution('fixed:120'))
+    error_rate: float = 0.0
+    error_statuses: Tuple[int, ...] = (500, 503, 429)
+    retry_after_seconds: Optional[float] = None
+
+class StubProviderServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, picks_per_event: int = 120,
+                 sections_per_show: int = 6, latency_ms: float = 50, fixtures: Optional[FixtureSet] = None,
+                 profile: Optional[LoadProfile] = None, seed: int = 0):
+        self.host = host
+        self.port = port
+        self.sections_per_show = sections_per_show
+        self.fixtures = fixtures
+        self.profile = profile or LoadProfile(
+            latency_ms=Distribution(f'fixed:{latency_ms}'),
+            listings=Distribution(f'fixed:{picks_per_event}')
+        )
+        self.requests_served = 0
+        self.errors_served = Counter()
+        self._load_rng = random.Random(seed)
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._started = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    @property
+    def ticketmaster_base_url(self) -> str:
+        """Value for TicketmasterAPI.BASE_URL"""
+        return f'{self.base_url}/api/ismds'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, name='stub-provider-server')
+        self._thread.daemon = True
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get('/api/ismds/event/{event_id}/quickpicks', self._quickpicks)
+        app.router.add_get('/api/proxy/request', self._proxy_request)
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port, backlog=2048)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._started.set()
+        self._loop.run_forever()
+
+    async def _simulate(self) -> Optional[web.Response]:
+        """Wait a sampled latency; returns the error response when this request is picked to fail"""
+        self.requests_served += 1
+        latency_ms = self.profile.latency_ms.sample(self._load_rng)
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000)
+        if self.profile.error_rate and self._load_rng.random() < self.profile.error_rate:
+            status = self._load_rng.choice(self.profile.error_statuses)
+            self.errors_served[status] += 1
+            headers = {}
+            if status in (429, 503) and self.profile.retry_after_seconds:
+                headers['Retry-After'] = f'{self.profile.retry_after_seconds:g}'
+            return web.json_response({'error': 'injected by stub'}, status=status, headers=headers)
+        return None
+
+    @staticmethod
+    def _rng(key: str) -> random.Random:
+        return random.Random(zlib.crc32(key.encode()))
+
+    def listing_count(self, key: str) -> int:
+        """Listings of one event or showtime, the same on every request"""
+        return max(0, int(round(self.profile.listings.sample(self._rng(f'{key}-listings')))))
+
+    def quickpicks_payload(self, event_id: str, offset: int, limit: int) -> dict:
+        """One page of quickpicks for an event, in the shape TicketmasterAPI parses"""
+        if self.fixtures:
+            return self.fixtures.quickpicks_page(event_id, offset, limit)
+        rng = self._rng(event_id)
+        total = self.listing_count(event_id)
+        picks = []
+        offers = []
+        for i in range(offset, min(offset + limit, total)):
+            offer_id = f'{event_id}-offer-{i}'
+            price = round(40 + rng.random() * 260, 2)
+            offers.append({'offerId': offer_id, 'listPrice': price, 'faceValue': round(price * 0.85, 2)})
+            first_seat = 1 + (i * 2) % 30
+            picks.append({
+                'selection': 'standard',
+                'type': 'seat',
+                'section': f'{100 + i % 24}',
+                'row': chr(ord('A') + i % 20),
+                'offerGroups': [{'offers': [offer_id], 'seats': [first_seat, first_seat + 1]}]
+            })
+        return {'offset': offset, 'total': total, 'picks': picks, '_embedded': {'offer': offers}}
+
+    def sections_payload(self, show_id: str, showtime_id: str) -> dict:
+        """A TodayTix sections response for one showtime"""
+        if self.fixtures:
+            return self.fixtures.sections_response(show_id, showtime_id)
+        rng = self._rng(f'{show_id}-{showtime_id}')
+        # Rows hold up to five pairs each
+        rows_per_section = math.ceil(self.listing_count(f'{show_id}-{showtime_id}') / 5 / self.sections_per_show)
+        sections = []
+        for s in range(self.sections_per_show):
+            blocks = []
+            for r in range(rows_per_section):
+                price = round(30 + rng.random() * 150, 2)
+                blocks.append({
+                    'row': chr(ord('A') + r % 26) * (r // 26 + 1),
+                    'salePrice': {'value': price},
+                    'faceValue': {'value': round(price * 0.9, 2)},
+                    'feeSummary': {
+                        'convenience': {'value': 3.5},
+                        'concierge': {'value': 1.0},
+                        'orderFee': {'value': 2.25}
+                    },
+                    'seats': [
+                        {'name': f'{n}', 'isRestrictedView': rng.random() < 0.1}
+                        for n in range(1, 11)
+                    ]
+                })
+            sections.append({'name': f'Section {s}', 'seatBlocks': blocks})
+        return {'data': sections}
+
+    async def _quickpicks(self, request: web.Request) -> web.Response:
+        error = await self._simulate()
+        if error is not None:
+            return error
+        offset = int(request.query.get('offset', 0))
+        limit = int(request.query.get('limit', 40))
+        return web.json_response(self.quickpicks_payload(request.match_info['event_id'], offset, limit))
+
+    async def _proxy_request(self, request: web.Request) -> web.Response:
+        error = await self._simulate()
+        if error is not None:
+            return error
+        parts = request.query.get('url', '').split('/')
+        # .../shows/{show_id}/showtimes/{showtime_id}/sections
+        try:
+            show_id = parts[parts.index('shows') + 1]
+            showtime_id = parts[parts.index('showtimes') + 1]
+        except (ValueError, IndexError):
+            return web.json_response({'content': None})
+        return web.json_response({'content': json.dumps(self.sections_payload(show_id, showtime_id))})
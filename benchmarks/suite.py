@@ -0,0 +1,248 @@
+"""Offline benchmark suite for the scraper hot paths, driven by recorded provider responses.
+
+Micro-benchmarks time the parsing and listing code on the recordings in
+benchmarks/fixtures; the end-to-end benchmarks run EventScraper.run with both
+engines against the stub server replaying the same recordings, each in its own
+subprocess. Results are appended to a JSON history and compared with the last
+entry from the same machine and Python, so regressions show up between
+versions. Nothing leaves localhost.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --only micro --threshold 15 --fail-on-regression
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+
+from .fixture_set import DEFAULT_FIXTURES_DIR, FixtureSet
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(__file__), 'results', 'history.json')
+
+# Pattern rules and excluded seats as a TodayTix event with rules would have them
+TODAYTIX_RULES = {'even': 'EVEN', 'odd': 'ODD', 'consecutive': 'PAIR'}
+TODAYTIX_EXCLUDED = {'Orchestra_C': ['3', '4', '5'], 'Mezzanine_B': ['1', '2']}
+
+def measure(func: Callable[[], object], ops: int, min_seconds: float = 0.2, repeats: int = 5) -> Dict:
+    """Time func, which performs `ops` operations per call, over several calibrated repeats"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds / repeats or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - started) / (loops * ops))
+    return {
+        'value': round(min(timings) * 1e6, 3),
+        'median': round(statistics.median(timings) * 1e6, 3),
+        'unit': 'us/op',
+        'better': 'lower',
+        'ops': ops
+    }
+
+def run_micro(fixtures_dir: str) -> Dict[str, Dict]:
+    from .common import make_app
+
+    logging.basicConfig(level=logging.WARNING)
+    # TodayTixAPI refuses to start without proxy settings; nothing is requested here
+    os.environ.setdefault('PROXY_API_URL', 'http://127.0.0.1:9')
+    os.environ.setdefault('PROXY_API_KEY', 'benchmark')
+    fixtures = FixtureSet.load(fixtures_dir)
+    app = make_app()
+
+    from src.models.database import Event
+    from src.scraper.scraper import EventScraper
+    from src.ticketmaster.api import TicketmasterAPI
+    from src.todaytix.api import TodayTixAPI
+
+    results = {}
+    with app.app_context():
+        ticketmaster_api = TicketmasterAPI()
+        todaytix_api = TodayTixAPI()
+        scraper = EventScraper(todaytix_api, ticketmaster_api, app.config['OUTPUT_FILE_DIR'])
+
+        pages = [page for page in fixtures.all_quickpicks_pages() if page.get('picks')]
+        results['ticketmaster_process_seats_data'] = measure(
+            lambda: [ticketmaster_api._process_seats_data(page) for page in pages],
+            sum(len(page['picks']) for page in pages)
+        )
+
+        responses = fixtures.all_sections_responses()
+        results['todaytix_pair_seats'] = measure(
+            lambda: [todaytix_api._pair_seats(response, TODAYTIX_RULES, TODAYTIX_EXCLUDED) for response in responses],
+            sum(len(section['seatBlocks']) for response in responses for section in response['data'])
+        )
+
+        blocks = [
+            [seat for seat in block['seats'] if not seat['isRestrictedView']]
+            for response in responses for section in response['data'] for block in section['seatBlocks']
+        ]
+        results['todaytix_analyze_seat_pattern'] = measure(
+            lambda: [todaytix_api.analyze_seat_pattern(seats) for seats in blocks],
+            len(blocks)
+        )
+
+        ticketmaster_seats = [seat for page in pages for seat in ticketmaster_api._process_seats_data(page)]
+        todaytix_seats = [seat for response in responses for seat in todaytix_api._pair_seats(response, TODAYTIX_RULES)]
+        ticketmaster_event = Event(website='TicketMaster', event_id='BENCH-TM', event_name='Benchmark Concert',
+                                   event_date=date(2026, 6, 1), event_time='19:30', venue_name='Arena', markup=1.6)
+        todaytix_event = Event(website='TodayTix', event_id='BENCH-TT', event_name='Benchmark Show',
+                               event_date=date(2026, 6, 1), event_time='19:30', venue_name='Theatre', markup=1.6)
+        results['process_seats'] = measure(
+            lambda: (scraper.process_seats(ticketmaster_event, ticketmaster_seats),
+                     scraper.process_seats(todaytix_event, todaytix_seats)),
+            len(ticketmaster_seats) + len(todaytix_seats)
+        )
+
+        listings = [(seat['section'], seat['row'], seat['seats']) for seat in ticketmaster_seats + todaytix_seats]
+        results['generate_inventory_id'] = measure(
+            lambda: [scraper.generate_inventory_id('BENCH-TM', section, row, seats) for section, row, seats in listings],
+            len(listings)
+        )
+
+        # Second scrape: a tenth of the tickets sold and a tenth repriced, in a different order
+        rng = random.Random(16)
+        second_scrape = [dict(seat) for seat in ticketmaster_seats if rng.random() > 0.1]
+        for seat in second_scrape:
+            if rng.random() < 0.1:
+                seat['price'] = round(seat['price'] * 1.05, 2)
+        rng.shuffle(second_scrape)
+        results['compare_scrapes'] = measure(
+            lambda: scraper.compare_scrapes(ticketmaster_seats, second_scrape),
+            len(ticketmaster_seats) + len(second_scrape)
+        )
+    return results
+
+def run_end_to_end(fixtures_dir: str, events: int, latency_ms: float) -> Dict[str, Dict]:
+    results = {}
+    for engine, concurrency in (('threaded', 20), ('async', 200)):
+        command = [
+            sys.executable, '-m', 'benchmarks.bench_engines', '--worker',
+            '--engine', engine, '--concurrency', str(concurrency),
+            '--events', str(events), '--latency-ms', str(latency_ms), '--fixtures', fixtures_dir
+        ]
+        completed = subprocess.run(command, capture_output=True, text=True, check=True)
+        run = json.loads(completed.stdout.strip().splitlines()[-1])
+        if not run['success']:
+            raise RuntimeError(f"End-to-end run with the {engine} engine failed")
+        results[f'run_{engine}'] = {
+            'value': run['events_per_second'],
+            'unit': 'events/s',
+            'better': 'higher',
+            'seconds': run['seconds'],
+            'tickets': run['tickets'],
+            'peak_rss_mb': run['peak_rss_mb'],
+            'output_digest': run['output_digest']
+        }
+    return results
+
+def _git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        return completed.stdout.strip() or None
+    except OSError:
+        return None
+
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_history(path: str, history: List[Dict]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+    os.replace(temp_path, path)
+
+def change_percent(result: Dict, previous: Dict) -> float:
+    """How much worse (positive) or better (negative) result is than previous, in percent"""
+    if not previous.get('value'):
+        return 0.0
+    change = (result['value'] - previous['value']) / previous['value'] * 100
+    return change if result['better'] == 'lower' else -change
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', choices=('micro', 'e2e'), help='Run one group of benchmarks')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument('--events', type=int, default=300, help='Events per end-to-end run')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Stub server latency for end-to-end runs')
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    parser.add_argument('--no-save', action='store_true', help='Compare with the history without appending to it')
+    parser.add_argument('--threshold', type=float, default=10, help='Percent worse than the last entry that counts as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_micro(args.fixtures)))
+        return
+
+    results = {}
+    if args.only != 'e2e':
+        # Micro-benchmarks get a fresh interpreter too, away from the suite's own imports
+        completed = subprocess.run([sys.executable, '-m', 'benchmarks.suite', '--worker', '--fixtures', args.fixtures],
+                                   capture_output=True, text=True, check=True)
+        results.update(json.loads(completed.stdout.strip().splitlines()[-1]))
+    if args.only != 'micro':
+        results.update(run_end_to_end(args.fixtures, args.events, args.latency_ms))
+
+    entry = {
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'machine': f'{platform.node()} {platform.machine()}',
+        'settings': {'events': args.events, 'latency_ms': args.latency_ms, 'fixtures': os.path.basename(os.path.normpath(args.fixtures))},
+        'results': results
+    }
+    history = load_history(args.history)
+    previous = next((
+        e for e in reversed(history)
+        if e['python'] == entry['python'] and e['machine'] == entry['machine'] and e.get('settings') == entry['settings']
+    ), None)
+
+    regressions = []
+    print(f"{'benchmark':<34}{'value':>12}  {'unit':<9}{'previous':>12}{'change':>9}")
+    for name, result in results.items():
+        before = previous['results'].get(name) if previous else None
+        line = f"{name:<34}{result['value']:>12}  {result['unit']:<9}"
+        if before:
+            worse_by = change_percent(result, before)
+            flag = '  REGRESSION' if worse_by > args.threshold else ''
+            change = (result['value'] - before['value']) / before['value'] * 100 if before['value'] else 0.0
+            line += f"{before['value']:>12}{change:>+8.1f}%{flag}"
+            if flag:
+                regressions.append(name)
+        print(line)
+    if previous:
+        print(f"Compared with {previous['recorded_at']} ({previous['commit'] or 'unknown commit'})")
+
+    if not args.no_save:
+        history.append(entry)
+        save_history(args.history, history)
+        print(f"Appended to {args.history}")
+    if regressions and args.fail_on_regression:
+        sys.exit(f"Regressions over {args.threshold}%: {', '.join(regressions)}")
+
+if __name__ == '__main__':
+    main()
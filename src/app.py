@@ -2,6 +2,7 @@ import time
 from flask import Flask
 from src.routes import todaytix_events, upload
 from .config import Config
+from .db_utils import migrate_database
 from .models.database import db, Event
 from .routes import events, scraper
 from .constants import CITY_URL_MAP
@@ -10,6 +11,7 @@ from .routes.auth import auth_bp, login_manager
 from .routes.rules import rules_bp
 from .routes.venue_mapping import bp as venue_mapping_bp
 from .routes.ticketmaster_events import bp as ticketmaster_events_bp
+from .routes.metrics import bp as metrics_bp
 from datetime import datetime, timedelta
 import logging
 
@@ -36,13 +38,6 @@ def create_app():
     scheduler.start()
     logger.info("APScheduler started")
     
-    # Initialize header service
-    with app.app_context():
-        from .services.header_service import HeaderService
-        header_service = HeaderService()
-        header_service.start_background_task()
-        logger.info("Header service background task started")
-    
     # Initialize Flask-Login
     login_manager.init_app(app)
 
@@ -55,12 +50,50 @@ def create_app():
     app.register_blueprint(rules_bp)
     app.register_blueprint(venue_mapping_bp)
     app.register_blueprint(ticketmaster_events_bp)
+    app.register_blueprint(metrics_bp)
 
     with app.app_context():
         db.create_all()
+
+    added_columns = migrate_database(app)
+    if added_columns:
+        logger.info(f"Added database columns: {', '.join(added_columns)}")
+
+    # Header service and prober query ticketmaster_headers, so only once it is migrated
+    with app.app_context():
+        from .services.header_service import HeaderService
+        header_service = HeaderService()
+        header_service.start_background_task()
+        logger.info("Header service background task started")
+
+        from .services.header_prober import header_prober
+        header_prober.start(app)
+
+    from .scraper.scheduler import ScraperScheduler
+    ScraperScheduler.resume_interrupted(app)
+
+    from .scraper.double_check import DoubleCheckPipeline
+    rescheduled = DoubleCheckPipeline.recover(app)
+    if rescheduled:
+        logger.info(f"Rescheduled {rescheduled} pending double-check confirmations")
     
     return app
 
+def create_worker_app():
+    """App for headless scraper nodes: config and database only, no web UI or scheduler."""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+    migrate_database(app)
+
+    from .services.header_prober import header_prober
+    header_prober.start(app)
+
+    return app
+
 if __name__ == '__main__':
     app = create_app()
     app.run(host='0.0.0.0', port=5001)
\ No newline at end of file
@@ -13,9 +13,31 @@ class Config:
     STORE_API_BASE_URL = os.getenv('STORE_API_BASE_URL', '')
     STORE_API_KEY = os.getenv('STORE_API_KEY')
     COMPANY_ID = os.getenv('COMPANY_ID')
+    # Only if the store applies an uploaded CSV as changes (quantity 0 delists) rather than
+    # replacing the whole inventory with it; without this, delta mode uploads full snapshots
+    STORE_DELTA_UPLOADS = os.getenv('STORE_DELTA_UPLOADS', 'False').lower() == 'true'
     PROXY_API_URL = os.getenv('PROXY_API_URL')
     PROXY_API_KEY = os.getenv('PROXY_API_KEY')
     MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', '5'))
+    SCRAPER_STOP_POLL_SECONDS = float(os.getenv('SCRAPER_STOP_POLL_SECONDS', '2'))
+    # Comma-separated 'max_hours_ahead:interval_minutes' tiers, '*' for the last tier
+    SCRAPE_TIERS = os.getenv('SCRAPE_TIERS', '48:0,336:60,*:360')
+    # Job progress is written every N events or T seconds, whichever comes first
+    PROGRESS_FLUSH_EVENTS = int(os.getenv('PROGRESS_FLUSH_EVENTS', '25'))
+    PROGRESS_FLUSH_SECONDS = float(os.getenv('PROGRESS_FLUSH_SECONDS', '2'))
+    # Distributed runs: events per queued batch, lease length and how often idle nodes poll
+    WORK_QUEUE_BATCH_SIZE = int(os.getenv('WORK_QUEUE_BATCH_SIZE', '25'))
+    WORK_QUEUE_LEASE_SECONDS = int(os.getenv('WORK_QUEUE_LEASE_SECONDS', '120'))
+    WORK_QUEUE_POLL_SECONDS = float(os.getenv('WORK_QUEUE_POLL_SECONDS', '2'))
+    # Interrupted runs younger than this are resumed instead of started over
+    RUN_CHECKPOINT_MAX_AGE_MINUTES = int(os.getenv('RUN_CHECKPOINT_MAX_AGE_MINUTES', '120'))
+    # Optional Parquet price history (needs pyarrow), kept apart from the 24h CSV cleanup
+    HISTORY_ENABLED = os.getenv('HISTORY_ENABLED', 'False').lower() == 'true'
+    HISTORY_DIR = os.getenv('HISTORY_DIR', 'data/history')
+    HISTORY_RETENTION_DAYS = int(os.getenv('HISTORY_RETENTION_DAYS', '90'))
+    # Stack sampling interval of profiled runs
+    PROFILE_INTERVAL_SECONDS = float(os.getenv('PROFILE_INTERVAL_SECONDS', '0.005'))
+    DOUBLE_CHECK_DELAY_SECONDS = int(os.getenv('DOUBLE_CHECK_DELAY_SECONDS', '1200'))
     SCHEDULER_API_ENABLED = True
     AUTH_USERNAME = os.getenv('AUTH_USERNAME')
     AUTH_PASSWORD = os.getenv('AUTH_PASSWORD')
@@ -13,3 +13,14 @@ CITY_URL_MAP = {
     "Other Cities": 98
 }
 
+
+# Column order of the ticket CSV the scraper writes and the store upload expects
+TICKET_CSV_COLUMNS = [
+    'inventory_id', 'event_name', 'venue_name', 'event_date',
+    'event_id', 'quantity', 'section', 'row', 'seats', 'barcodes',
+    'internal_notes', 'public_notes', 'tags', 'list_price',
+    'face_price', 'taxed_cost', 'cost', 'hide_seats', 'in_hand',
+    'in_hand_date', 'instant_transfer', 'files_available',
+    'split_type', 'custom_split', 'stock_type', 'zone',
+    'shown_quantity', 'passthrough'
+]
@@ -1,5 +1,6 @@
 import os
-from .models.database import db
+from sqlalchemy import inspect, text
+from .models.database import TicketmasterHeader, db
 
 def reset_database(app):
     """Utility function to reset the database"""
@@ -14,4 +15,55 @@ def reset_database(app):
         
         # Create all tables
         db.create_all()
-        print("Created new database with updated schema")
\ No newline at end of file
+        print("Created new database with updated schema")
+
+def _sql_default(column):
+    """Render a column's scalar Python default as a SQL literal, if it has one"""
+    if column.default is None or not column.default.is_scalar:
+        return None
+    value = column.default.arg
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+def migrate_database(app):
+    """Add columns and indexes that were introduced after a table was first created.
+
+    db.create_all() only creates missing tables, so existing databases need
+    new columns and indexes added in place, and rows stored before a derived
+    column existed need it filled. Returns the list of columns and indexes added.
+    """
+    added = []
+    with app.app_context():
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                default = _sql_default(column)
+                if default is not None:
+                    ddl += f' DEFAULT {default}'
+
+                with db.engine.begin() as connection:
+                    connection.execute(text(ddl))
+                added.append(f'{table.name}.{column.name}')
+
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing_indexes:
+                    continue
+                with db.engine.begin() as connection:
+                    index.create(connection)
+                added.append(f'{table.name}.{index.name}')
+
+        TicketmasterHeader.backfill_fingerprints()
+    return added
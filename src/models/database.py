@@ -1,7 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import case
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql import func
 from datetime import datetime, timedelta
+import hashlib
 import json
+import zlib
 
 db = SQLAlchemy()
 
@@ -27,6 +31,7 @@ class Event(db.Model):
     internal_notes = db.Column(db.Text, nullable=True)
     double_check = db.Column(db.Boolean, default=False)
     first_scrape_completed = db.Column(db.Boolean, default=False)
+    last_scraped_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
 
@@ -57,6 +62,7 @@ class Event(db.Model):
             'internal_notes': self.internal_notes,
             'double_check': self.double_check,
             'first_scrape_completed': self.first_scrape_completed,
+            'last_scraped_at': self.last_scraped_at.isoformat() if self.last_scraped_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -81,6 +87,11 @@ class ScraperJob(db.Model):
     interval_minutes = db.Column(db.Integer, nullable=False)
     concurrent_requests = db.Column(db.Integer, nullable=False, default=5)
     auto_upload = db.Column(db.Boolean, nullable=False, default=False)  
+    engine = db.Column(db.String(20), nullable=False, default='threaded')  # 'threaded' or 'async'
+    upload_mode = db.Column(db.String(20), nullable=False, default='full')  # 'full' or 'delta'
+    full_upload_every = db.Column(db.Integer, nullable=False, default=6)  # Full snapshot every N uploads in delta mode
+    distributed = db.Column(db.Boolean, nullable=False, default=False)  # Split runs into batches on the work queue
+    profile = db.Column(db.Boolean, nullable=False, default=False)  # Profile the next run, then reset
     last_run = db.Column(db.DateTime)
     next_run = db.Column(db.DateTime)
     events_processed = db.Column(db.Integer, default=0)
@@ -95,6 +106,11 @@ class ScraperJob(db.Model):
             'interval_minutes': self.interval_minutes,
             'concurrent_requests': self.concurrent_requests,
             'auto_upload': self.auto_upload,
+            'engine': self.engine,
+            'upload_mode': self.upload_mode,
+            'full_upload_every': self.full_upload_every,
+            'distributed': self.distributed,
+            'profile': self.profile,
             'last_run': self.last_run.isoformat() if self.last_run else None,
             'next_run': self.next_run.isoformat() if self.next_run else None,
             'events_processed': self.events_processed,
@@ -168,35 +184,158 @@ class VenueMapping(db.Model):
             excluded_seats[key].update(seat.strip() for seat in mapping.seats.split(','))
         
         return excluded_seats
+
+    @staticmethod
+    def excluded_seats_index():
+        """Load all active mappings at once as {(event_name, venue_name): {section_row: frozenset(seats)}}"""
+        grouped = {}
+        for event_name, venue_name, section, row, seats in db.session.query(
+            VenueMapping.event_name, VenueMapping.venue_name,
+            VenueMapping.section, VenueMapping.row, VenueMapping.seats
+        ).filter(VenueMapping.active.is_(True)):
+            excluded = grouped.setdefault((event_name, venue_name), {}).setdefault(f"{section}_{row}", set())
+            excluded.update(seat.strip() for seat in seats.split(','))
+
+        return {
+            venue: {key: frozenset(seats) for key, seats in sections.items()}
+            for venue, sections in grouped.items()
+        }
         
+class DoubleCheckSnapshot(db.Model):
+    __tablename__ = 'double_check_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False, index=True)
+    ticket_keys = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed JSON list of ticket keys
+    ticket_count = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, confirming, confirmed, expired
+    first_scraped_at = db.Column(db.DateTime, nullable=False)
+    confirm_at = db.Column(db.DateTime, nullable=False)
+    confirmed_at = db.Column(db.DateTime, nullable=True)
+    stable_count = db.Column(db.Integer, nullable=True)
+
+    def __init__(self, event_id, keys, first_scraped_at, confirm_at):
+        self.event_id = event_id
+        self.ticket_keys = zlib.compress(json.dumps(sorted(keys)).encode())
+        self.ticket_count = len(keys)
+        self.status = 'pending'
+        self.first_scraped_at = first_scraped_at
+        self.confirm_at = confirm_at
+
+    @property
+    def keys(self):
+        return set(json.loads(zlib.decompress(self.ticket_keys)))
+
+class ScrapeRun(db.Model):
+    """One scraper run whose events are split into ScrapeBatch rows for any node to claim"""
+    __tablename__ = 'scrape_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('scraper_jobs.id', ondelete='CASCADE'), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='open')  # open, completed, cancelled, abandoned
+    total_batches = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, server_default=func.now())
+    closed_at = db.Column(db.DateTime, nullable=True)
+
+class ScrapeBatch(db.Model):
+    __tablename__ = 'scrape_batches'
+    __table_args__ = (db.Index('ix_scrape_batches_run_status', 'run_id', 'status'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('scrape_runs.id', ondelete='CASCADE'), nullable=False)
+    event_ids = db.Column(db.Text, nullable=False)  # Comma-separated Event.id values
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, leased, done, failed, cancelled
+    lease_owner = db.Column(db.String(255), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    results = db.Column(db.LargeBinary, nullable=True)  # zlib-compressed JSON [[event id, rows], ...]
+    ticket_count = db.Column(db.Integer, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def event_id_list(self):
+        return [int(event_id) for event_id in self.event_ids.split(',') if event_id]
+
+    @staticmethod
+    def encode_results(results):
+        return zlib.compress(json.dumps(results, default=str).encode())
+
+    @staticmethod
+    def decode_results(payload):
+        return json.loads(zlib.decompress(payload)) if payload else []
+
 class TicketmasterHeader(db.Model):
     __tablename__ = 'ticketmaster_headers'
     
     id = db.Column(db.Integer, primary_key=True)
     headers = db.Column(db.Text, nullable=False)  # JSON string of headers
-    created_at = db.Column(db.DateTime, server_default=func.now())
+    created_at = db.Column(db.DateTime, server_default=func.now(), index=True)
     last_used = db.Column(db.DateTime, nullable=True)
     failures = db.Column(db.Integer, default=0)
     is_active = db.Column(db.Boolean, default=True)
+    # SHA-1 of the Cookie header, so lookups and dedup are index seeks instead of LIKE scans over the JSON
+    cookie_fingerprint = db.Column(db.String(40), nullable=True, index=True)
+    # No default: rows from before the column was added stay NULL until backfill_fingerprints
+    has_cookie = db.Column(db.Boolean, nullable=True)
+
+    __table_args__ = (db.Index('ix_ticketmaster_headers_active', 'is_active', 'has_cookie', 'created_at'),)
     
     def __init__(self, headers_dict):
         self.headers = json.dumps(headers_dict)
         self.failures = 0
         self.is_active = True
+        cookie = headers_dict.get('Cookie')
+        self.has_cookie = bool(cookie)
+        self.cookie_fingerprint = self.fingerprint(cookie) if cookie else None
         
     @property
     def headers_dict(self):
         return json.loads(self.headers)
+
+    @staticmethod
+    def fingerprint(cookie: str) -> str:
+        return hashlib.sha1(cookie.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def find_by_cookie(cls, cookie: str):
+        """The header stored with this cookie, if any"""
+        if not cookie:
+            return None
+        return cls.query.filter(cls.cookie_fingerprint == cls.fingerprint(cookie)).first()
+
+    @classmethod
+    def backfill_fingerprints(cls) -> int:
+        """Fill cookie_fingerprint and has_cookie on rows stored before they existed"""
+        rows = cls.query.filter(cls.has_cookie.is_(None)).all()
+        for row in rows:
+            cookie = row.headers_dict.get('Cookie')
+            row.has_cookie = bool(cookie)
+            row.cookie_fingerprint = cls.fingerprint(cookie) if cookie else None
+        db.session.commit()
+        return len(rows)
         
     def mark_used(self):
-        self.last_used = datetime.now()
-        db.session.commit()
+        """Queue the usage on the write-behind buffer instead of committing per request"""
+        from ..services.write_behind import write_behind
+
+        now = datetime.now()
+        # Update the loaded row without dirtying it, so a later commit cannot overwrite the merged write
+        set_committed_value(self, 'last_used', now)
+        write_behind.update(TicketmasterHeader, self.id, max={'last_used': now})
         
     def mark_failure(self):
-        self.failures += 1
+        """Queue the failure on the write-behind buffer; three failures deactivate the header"""
+        from ..services.write_behind import write_behind
+
+        set_committed_value(self, 'failures', (self.failures or 0) + 1)
         if self.failures >= 3:
-            self.is_active = False
-        db.session.commit()
+            set_committed_value(self, 'is_active', False)
+        write_behind.update(TicketmasterHeader, self.id, add={'failures': 1}, set={'is_active': self.active_after_failures})
+
+    @staticmethod
+    def active_after_failures(values):
+        """is_active for a write-behind update that adds failures: off once they reach three"""
+        return case((values['failures'] >= 3, False), else_=TicketmasterHeader.is_active)
         
     @classmethod
     def get_active_headers(cls):
@@ -204,6 +343,6 @@ class TicketmasterHeader(db.Model):
         expiry_time = datetime.now() - timedelta(hours=24)
         return cls.query.filter(
             cls.is_active == True,
-            cls.created_at > expiry_time,
-            cls.headers.like('%Cookie%')
+            cls.has_cookie == True,
+            cls.created_at > expiry_time
         ).order_by(cls.last_used.asc().nullsfirst()).all()
\ No newline at end of file
@@ -0,0 +1,14 @@
+from flask import Blueprint, Response, request
+from flask_login import current_user
+from ..auth_utils import check_auth
+from ..services.metrics import metrics
+
+bp = Blueprint('metrics', __name__)
+
+@bp.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition; the UI session or HTTP basic auth with the app credentials."""
+    auth = request.authorization
+    if not current_user.is_authenticated and not (auth and check_auth(auth.username, auth.password)):
+        return Response('Authentication required\n', 401, {'WWW-Authenticate': 'Basic realm="metrics"'})
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -7,11 +7,13 @@ from src.scraper.scheduler import scheduler, ScraperScheduler
 from src.ticketmaster.api import TicketmasterAPI
 from ..todaytix.api import TodayTixAPI
 from ..scraper.scraper import EventScraper
+from ..scraper.cancellation import cancellation_registry
+from ..scraper.profiling import load_hotspots
+from ..services.host_limiter import host_limiters
 from ..models.database import Event, ScraperJob, db
 from pathlib import Path
 from werkzeug.utils import secure_filename
 from flask import send_file
-from ..services import UploadService  
 
 bp = Blueprint('scraper', __name__)
 
@@ -30,6 +32,23 @@ def start_scrape():
         interval_minutes = data.get('interval_minutes', 20)
         concurrent_requests = data.get('concurrent_requests', 5)
         auto_upload = data.get('auto_upload', False)
+        engine = data.get('engine', 'threaded')
+        upload_mode = data.get('upload_mode', 'full')
+        full_upload_every = int(data.get('full_upload_every', 6))
+        distributed = bool(data.get('distributed', False))
+        profile = bool(data.get('profile', False))
+
+        if engine not in EventScraper.ENGINES:
+            return jsonify({
+                "status": "error",
+                "message": f"Invalid engine: {engine}"
+            }), 400
+
+        if upload_mode not in EventScraper.UPLOAD_MODES or full_upload_every < 1:
+            return jsonify({
+                "status": "error",
+                "message": "Invalid upload mode settings"
+            }), 400
         
         events = Event.query.all()
         if not events:
@@ -50,6 +69,11 @@ def start_scrape():
                 interval_minutes=interval_minutes,
                 concurrent_requests=concurrent_requests,
                 auto_upload=auto_upload,
+                engine=engine,
+                upload_mode=upload_mode,
+                full_upload_every=full_upload_every,
+                distributed=distributed,
+                profile=profile,
                 events_processed=0,
                 total_tickets_found=0,
                 last_run=None,
@@ -61,6 +85,11 @@ def start_scrape():
             job.interval_minutes = interval_minutes
             job.concurrent_requests = concurrent_requests
             job.auto_upload = auto_upload
+            job.engine = engine
+            job.upload_mode = upload_mode
+            job.full_upload_every = full_upload_every
+            job.distributed = distributed
+            job.profile = profile
             job.events_processed = 0
             job.total_tickets_found = 0
             job.next_run = datetime.now()
@@ -87,12 +116,19 @@ def start_scrape():
                         ticketmaster_api=ticketmaster_api,
                         output_dir=output_dir,
                         concurrent_requests=job.concurrent_requests,
-                        auto_upload=job.auto_upload  
+                        auto_upload=job.auto_upload,
+                        engine=job.engine or 'threaded',
+                        upload_mode=job.upload_mode or 'full',
+                        full_upload_every=job.full_upload_every or 6,
+                        distributed=bool(job.distributed)
                     )
 
                     app.logger.info(f"Scraper settings - auto_upload: {scraper.auto_upload}, max_concurrent: {scraper.max_concurrent}")
 
-                    success, output_file = scraper.run(job)
+                    try:
+                        success, output_file = scraper.run(job)
+                    finally:
+                        ticketmaster_api.close()
 
                     app.logger.info(f"Scraper run completed - success: {success}, output_file: {output_file}, auto_upload setting: {scraper.auto_upload}")
 
@@ -101,27 +137,7 @@ def start_scrape():
                         return
 
                     if success and output_file:
-                        app.logger.info(f"Checking auto_upload setting for job {job_id}: {job.auto_upload}")
-
-                        if job.auto_upload:
-                            app.logger.info(f"Starting file upload for job {job_id}")
-                            try:
-                                upload_service = UploadService(
-                                    api_base_url=app.config['STORE_API_BASE_URL'],
-                                    api_key=app.config['STORE_API_KEY'],
-                                    company_id=app.config['COMPANY_ID']
-                                )
-                                upload_success, message = upload_service.upload_csv(output_file)
-
-                                if upload_success:
-                                    app.logger.info(f"Scheduled job {job_id}: File uploaded successfully")
-                                else:
-                                    app.logger.error(f"Scheduled job {job_id}: File upload failed - {message}")
-                            except Exception as e:
-                                app.logger.error(f"Scheduled job {job_id}: Upload error - {str(e)}")
-                        else:
-                            app.logger.info(f"Auto upload disabled for job {job_id}, skipping upload")
-
+                        # EventScraper.run already uploaded the full file or delta when auto_upload is on
                         job.status = 'completed'
                         job.last_run = datetime.now()
                         job.next_run = job.last_run + timedelta(minutes=interval_minutes)
@@ -182,10 +198,12 @@ def start_scrape():
 def stop_all_running_jobs():
     """Helper function to stop all running jobs and clean up"""
     # Stop all running scraper jobs
-    running_jobs = ScraperJob.query.filter(ScraperJob.status.in_(['running', 'completed'])).all()
+    running_jobs = ScraperJob.query.filter(ScraperJob.status.in_(['running', 'resuming', 'completed'])).all()
     for job in running_jobs:
         job.status = 'stopped'
         job.next_run = None
+        # Stop runs in this process immediately; other processes see the status change
+        cancellation_registry.cancel(job.id)
         
         # Remove all scheduled jobs for this job_id
         jobs = scheduler.get_jobs()
@@ -229,7 +247,13 @@ def get_status():
                 "total_tickets_found": job.total_tickets_found,
                 "interval_minutes": job.interval_minutes,
                 "concurrent_requests": job.concurrent_requests,
-                "auto_upload": job.auto_upload
+                "auto_upload": job.auto_upload,
+                "engine": job.engine,
+                "upload_mode": job.upload_mode,
+                "full_upload_every": job.full_upload_every,
+                "distributed": job.distributed,
+                "profile": job.profile,
+                "host_concurrency": host_limiters.snapshot()
             })
         else:
             return jsonify({
@@ -239,7 +263,13 @@ def get_status():
                 "events_processed": 0,
                 "total_tickets_found": 0,
                 "concurrent_requests": 5,
-                "auto_upload": False
+                "auto_upload": False,
+                "engine": "threaded",
+                "upload_mode": "full",
+                "full_upload_every": 6,
+                "distributed": False,
+                "profile": False,
+                "host_concurrency": host_limiters.snapshot()
             })
             
     except Exception as e:
@@ -247,7 +277,77 @@ def get_status():
             "status": "error",
             "message": str(e)
         }), 500
-    
+
+@bp.route('/api/scrape/profile', methods=['POST'])
+@login_required
+def profile_next_run():
+    """Profile the next run of the current job"""
+    try:
+        job = ScraperJob.query.order_by(ScraperJob.id.desc()).first()
+        if not job:
+            return jsonify({
+                "status": "error",
+                "message": "No scraper job to profile"
+            }), 400
+
+        job.profile = True
+        db.session.commit()
+        return jsonify({
+            "status": "success",
+            "message": "The next run will be profiled"
+        })
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+@bp.route('/api/scrape/profiles', methods=['GET'])
+@login_required
+def list_profiles():
+    try:
+        profiles = [get_file_info(str(file_path)) for file_path in Path(get_output_dir()).glob('profile_*.json')]
+        profiles.sort(key=lambda x: x['created_at'], reverse=True)
+        return jsonify({
+            "status": "success",
+            "profiles": profiles
+        })
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+@bp.route('/api/scrape/profiles/<filename>', methods=['GET'])
+@login_required
+def profile_hotspots(filename):
+    """Top functions of a saved profile, by self (?sort=self) or total (?sort=total) samples"""
+    try:
+        sort = request.args.get('sort', 'self')
+        limit = request.args.get('limit', 25, type=int)
+        safe_filename = secure_filename(filename)
+        file_path = os.path.join(get_output_dir(), safe_filename)
+        if sort not in ('self', 'total') or not safe_filename.startswith('profile_') or not safe_filename.endswith('.json'):
+            return jsonify({
+                "status": "error",
+                "message": "Invalid profile request"
+            }), 400
+        if not os.path.exists(file_path):
+            return jsonify({
+                "status": "error",
+                "message": "Profile not found"
+            }), 404
+
+        return jsonify({
+            "status": "success",
+            "profile": load_hotspots(file_path, sort, limit)
+        })
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
 def get_file_info(file_path):
     """Get file information including creation time and age"""
     stat = os.stat(file_path)
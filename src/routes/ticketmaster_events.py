@@ -36,12 +36,15 @@ def search_events():
             }), 400
 
         api = TicketmasterAPI()
-        events = api.search_events(
-            event_name=event_name,
-            location=city,
-            start_date=data.get('start_date'),
-            end_date=data.get('end_date')
-        )
+        try:
+            events = api.search_events(
+                event_name=event_name,
+                location=city,
+                start_date=data.get('start_date'),
+                end_date=data.get('end_date')
+            )
+        finally:
+            api.close()
 
         if not events:
             return jsonify({
@@ -96,11 +99,7 @@ def refresh_headers():
         from ..services.header_service import HeaderService
         service = HeaderService()
         
-        headers = []
-        for _ in range(count):
-            header = service.fetch_new_header()
-            if header:
-                headers.append(header)
+        headers = service.prefetch(count)
         
         return jsonify({
             'success': True,
@@ -120,6 +119,9 @@ def get_header_status():
     """Get status of Ticketmaster headers"""
     try:
         from ..models.database import TicketmasterHeader
+        from ..services.header_pool import header_pool
+        from ..services.header_prober import header_prober
+        from ..services.header_service import HeaderService
         
         total = TicketmasterHeader.query.count()
         
@@ -139,7 +141,10 @@ def get_header_status():
                 'total': total,
                 'active': active,
                 'failed': failed
-            }
+            },
+            'pool': header_pool.snapshot(),
+            'prefetch': HeaderService().status(),
+            'probe': header_prober.snapshot()
         })
     except Exception as e:
         current_app.logger.error(f"Error getting header status: {str(e)}")
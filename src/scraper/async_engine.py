@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import queue
+import threading
+from typing import Iterator, List, Optional, Tuple
+import aiohttp
+from ..models.database import Event
+from .listing import ListingRows
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+class AsyncScrapeEngine:
+    """Scrape events on a single asyncio event loop instead of a thread per request.
+
+    Seat fetching goes through the provider clients' *_async methods on one shared
+    aiohttp session; parsing and row building reuse the EventScraper methods, so
+    the rows produced match the threaded engine.
+    """
+
+    STOP_POLL_SECONDS = 0.5
+    PUT_RETRY_SECONDS = 0.01
+
+    def __init__(self, scraper, concurrency: int):
+        self.scraper = scraper
+        self.concurrency = max(1, concurrency)
+        self._abandoned = threading.Event()
+        self._loop = None
+        self._main_task = None
+
+    def iter_results(self, events: List[Event]) -> Iterator[Tuple[Event, Optional[ListingRows]]]:
+        """Run the event loop in a background thread, yielding (event, seats) as each one completes.
+
+        The hand-off queue holds at most concurrency results; while it is full,
+        finished events keep their slot, so fetching pauses until the consumer
+        catches up. Closing the generator early cancels the loop.
+        """
+        results = queue.Queue(maxsize=self.concurrency)
+        self._abandoned.clear()
+        thread = threading.Thread(target=self._run_loop, args=(events, results), name='async-scrape-engine')
+        thread.daemon = True
+        thread.start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self._cancel()
+            # Drain so the loop's last put cannot block on a full queue
+            while thread.is_alive():
+                try:
+                    results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            thread.join()
+
+    def _cancel(self):
+        self._abandoned.set()
+        loop, task = self._loop, self._main_task
+        if loop is not None and task is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # Loop already closed
+
+    def _run_loop(self, events: List[Event], results: queue.Queue):
+        with self.scraper.app.app_context():
+            try:
+                asyncio.run(self._scrape(events, results))
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.error(f"Error in async scrape engine: {str(e)}")
+            finally:
+                results.put(_DONE)
+
+    def _stopping(self) -> bool:
+        return self._abandoned.is_set() or self.scraper.should_stop()
+
+    async def _scrape(self, events: List[Event], results: queue.Queue):
+        self._loop = asyncio.get_running_loop()
+        self._main_task = asyncio.current_task()
+        if self._abandoned.is_set():
+            return
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=30)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            tasks = [asyncio.create_task(self._process_event(session, semaphore, event, results)) for event in events]
+            try:
+                pending = set(tasks)
+                while pending:
+                    _, pending = await asyncio.wait(pending, timeout=self.STOP_POLL_SECONDS)
+                    if self._stopping():
+                        logger.info("Stop requested, terminating scraper")
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _put(self, results: queue.Queue, item: Tuple[Event, Optional[ListingRows]]):
+        """Hand a result to the consumer, waiting (without blocking the loop) while the queue is full"""
+        while not self._stopping():
+            try:
+                results.put_nowait(item)
+                return
+            except queue.Full:
+                await asyncio.sleep(self.PUT_RETRY_SECONDS)
+
+    async def _process_event(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                             event: Event, results: queue.Queue):
+        async with semaphore:
+            if self._stopping():
+                return
+            try:
+                rows = await self._scrape_event(session, event)
+            except Exception as e:
+                logger.error(f"Error processing event {event.event_name}: {str(e)}")
+                rows = None
+            # Keep the slot until the consumer takes the rows
+            await self._put(results, (event, rows))
+
+    async def _scrape_event(self, session: aiohttp.ClientSession, event: Event) -> ListingRows:
+        """Async mirror of EventScraper.process_event."""
+        scraper = self.scraper
+        ticketmaster_api = scraper.ticketmaster_api
+
+        if event.website == 'TicketMaster' and event.double_check and not event.first_scrape_completed:
+            if scraper.double_check_stage(event) == 'first':
+                logger.info(f"Performing first scrape for double-check event: {event.event_name}")
+                first_scrape = await ticketmaster_api.get_seats_async(session, event.ticketmaster_id)
+                # A database write; keep it off the loop so other requests are not stalled
+                await asyncio.to_thread(scraper.record_first_scrape, event, first_scrape)
+            return []
+
+        if event.website == 'TodayTix':
+            if not event.todaytix_event_id or not event.todaytix_show_id:
+                logger.error(f"Missing TodayTix IDs for event: {event.event_name}")
+                return []
+
+            rules, excluded_seats = scraper.todaytix_filters(event)
+            seats_data = await scraper.todaytix_api.get_seats_async(
+                session,
+                int(event.todaytix_show_id),
+                int(event.todaytix_event_id),
+                rules=rules,
+                excluded_seats=excluded_seats
+            )
+            return scraper.process_seats(event, seats_data)
+
+        if not event.ticketmaster_id:
+            logger.error(f"Missing Ticketmaster ID for event: {event.event_name}")
+            return []
+
+        seats_data = await ticketmaster_api.get_seats_async(session, event.ticketmaster_id)
+        return scraper.process_seats(event, seats_data)
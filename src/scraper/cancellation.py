@@ -0,0 +1,103 @@
+import logging
+import threading
+from typing import Dict, Optional
+from ..models.database import ScraperJob
+
+logger = logging.getLogger(__name__)
+
+class CancellationToken:
+    """Process-local stop flag shared by the scraper run and its workers"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def reset(self):
+        self._event.clear()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to timeout seconds, waking early if cancelled"""
+        return self._event.wait(timeout)
+
+class CancellationRegistry:
+    """Tokens of the runs active in this process, keyed by ScraperJob id"""
+
+    def __init__(self):
+        self._tokens: Dict[int, CancellationToken] = {}
+        self._lock = threading.Lock()
+
+    def register(self, job_id: int, token: CancellationToken):
+        with self._lock:
+            self._tokens[job_id] = token
+
+    def unregister(self, job_id: int, token: CancellationToken):
+        with self._lock:
+            if self._tokens.get(job_id) is token:
+                del self._tokens[job_id]
+
+    def cancel(self, job_id: int) -> bool:
+        with self._lock:
+            token = self._tokens.get(job_id)
+        if token:
+            token.cancel()
+        return token is not None
+
+    def cancel_all(self) -> int:
+        with self._lock:
+            tokens = list(self._tokens.values())
+        for token in tokens:
+            token.cancel()
+        return len(tokens)
+
+cancellation_registry = CancellationRegistry()
+
+class JobStatusWatcher:
+    """Background thread that cancels a token once its ScraperJob is marked stopped.
+
+    Covers stops issued from another process (e.g. a different gunicorn worker),
+    where the registry cannot reach the token directly. Stop latency is bounded
+    by poll_interval.
+    """
+
+    def __init__(self, app, job_id: int, token: CancellationToken, poll_interval: float = 2.0):
+        self.app = app
+        self.job_id = job_id
+        self.token = token
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, name=f'job-watcher-{self.job_id}')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 5)
+            self._thread = None
+
+    def _job_stopped(self) -> bool:
+        with self.app.app_context():
+            status = ScraperJob.query.with_entities(ScraperJob.status).filter(
+                ScraperJob.id == self.job_id
+            ).scalar()
+            return status == 'stopped'
+
+    def _watch(self):
+        while not self._stop_event.is_set() and not self.token.is_cancelled():
+            try:
+                if self._job_stopped():
+                    logger.info(f"Job {self.job_id} marked stopped, cancelling run")
+                    self.token.cancel()
+                    return
+            except Exception as e:
+                logger.error(f"Error checking status of job {self.job_id}: {str(e)}")
+            self._stop_event.wait(self.poll_interval)
@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+from .output import StreamingCSVWriter
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CheckpointState:
+    job_id: int
+    run_started: datetime
+    timestamp: str
+    due_ids: List[int]
+    skipped_event_ids: List[str]
+    partial_path: str
+    header_offset: int
+    run_id: str = ''
+    done_ids: Set[int] = field(default_factory=set)
+    failed_ids: Set[int] = field(default_factory=set)
+    offset: int = 0
+    row_count: int = 0
+    journal_size: int = 0
+
+    @property
+    def pending_ids(self) -> Set[int]:
+        return set(self.due_ids) - self.done_ids
+
+class RunCheckpoint:
+    """Journal of a scraper run's finished events so a restarted process can pick up where it stopped.
+
+    state_dir/run_checkpoint.json describes the run (which events are due and
+    the partial output file) and run_checkpoint.journal gets one line per
+    finished event with the partial file's size after its rows, flagged when
+    its scrape failed and nothing was written for it. On resume the
+    partial file is cut back to the last journalled size, so rows written
+    without a journal line are dropped and scraped again.
+
+    The state carries the run_id of the run that last started or resumed it.
+    A run stopping late (stop, then start again) finds another run_id there
+    and leaves the files alone, since they belong to the newer run.
+    """
+
+    STATE_FILE = 'run_checkpoint.json'
+    JOURNAL_FILE = 'run_checkpoint.journal'
+
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        self.state_path = os.path.join(state_dir, self.STATE_FILE)
+        self.journal_path = os.path.join(state_dir, self.JOURNAL_FILE)
+        self.state: Optional[CheckpointState] = None
+        self._journal = None
+        os.makedirs(state_dir, exist_ok=True)
+
+    def start(self, job_id: int, run_started: datetime, timestamp: str, due_ids: List[int],
+              skipped_event_ids: Set[str], output_dir: str) -> StreamingCSVWriter:
+        """Record a new run, replacing any earlier checkpoint, and return the writer for its partial output."""
+        self.close()
+        partial_path = os.path.join(output_dir, f'.tickets_{timestamp}.csv.partial')
+        writer = StreamingCSVWriter(output_dir, temp_path=partial_path)
+        self.state = CheckpointState(
+            job_id=job_id,
+            run_started=run_started,
+            timestamp=timestamp,
+            due_ids=due_ids,
+            skipped_event_ids=sorted(skipped_event_ids),
+            partial_path=partial_path,
+            header_offset=writer.offset
+        )
+        self._claim()
+        # A new file rather than truncating, so a stopping run's open journal cannot write into it
+        temp_path = f'{self.journal_path}.tmp'
+        self._journal = open(temp_path, 'w', encoding='utf-8')
+        os.replace(temp_path, self.journal_path)
+        return writer
+
+    def _claim(self):
+        """Write the state file under a fresh run_id, making this run the checkpoint's owner."""
+        state = self.state
+        state.run_id = uuid.uuid4().hex
+        data = {
+            'job_id': state.job_id,
+            'run_id': state.run_id,
+            'run_started': state.run_started.isoformat(),
+            'timestamp': state.timestamp,
+            'due_ids': state.due_ids,
+            'skipped_event_ids': state.skipped_event_ids,
+            'partial_path': state.partial_path,
+            'header_offset': state.header_offset
+        }
+        temp_path = f'{self.state_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.state_path)
+
+    def _read_state(self) -> Optional[dict]:
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, job_id: int, max_age: timedelta) -> Optional[CheckpointState]:
+        """The interrupted run of job_id, if one is recent enough to finish; stale checkpoints are discarded."""
+        data = self._read_state()
+        try:
+            state = CheckpointState(
+                job_id=data['job_id'],
+                run_started=datetime.fromisoformat(data['run_started']),
+                timestamp=data['timestamp'],
+                due_ids=data['due_ids'],
+                skipped_event_ids=data['skipped_event_ids'],
+                partial_path=data['partial_path'],
+                header_offset=data['header_offset'],
+                run_id=data.get('run_id', '')
+            )
+        except (TypeError, ValueError, KeyError):
+            return None
+
+        if (state.job_id != job_id or datetime.now() - state.run_started > max_age
+                or not os.path.exists(state.partial_path)):
+            logger.info(f"Discarding checkpoint of run started {state.run_started}")
+            self.state = state
+            self.discard()
+            return None
+
+        state.offset = state.header_offset
+        try:
+            with open(self.journal_path, encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break  # Torn last line
+                    values = line.split()
+                    event_id, offset, row_count = (int(value) for value in values[:3])
+                    state.done_ids.add(event_id)
+                    if values[3:] == ['failed']:
+                        state.failed_ids.add(event_id)
+                    state.offset, state.row_count = offset, row_count
+                    state.journal_size += len(line.encode())
+        except OSError:
+            pass
+        self.state = state
+        return state
+
+    def resume(self, state: CheckpointState, output_dir: str) -> StreamingCSVWriter:
+        """Reopen the partial output of an interrupted run and keep journalling into it."""
+        self.state = state
+        self._claim()
+        writer = StreamingCSVWriter.resume(output_dir, state.partial_path, state.offset, state.row_count)
+        if os.path.exists(self.journal_path):
+            os.truncate(self.journal_path, state.journal_size)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        return writer
+
+    def record(self, event_id: int, writer: StreamingCSVWriter, failed: bool = False):
+        """Journal an event whose rows have been handed to writer, or whose scrape failed."""
+        flag = ' failed' if failed else ''
+        self._journal.write(f'{event_id} {writer.offset} {writer.row_count}{flag}\n')
+        self._journal.flush()
+
+    def sync(self, writer: StreamingCSVWriter):
+        """Force the partial output, then the journal, to disk."""
+        writer.sync()
+        os.fsync(self._journal.fileno())
+
+    def close(self):
+        if self._journal and not self._journal.closed:
+            self._journal.close()
+
+    def discard(self):
+        """Forget this run's checkpoint, removing its partial output if it was not published.
+
+        Once another run has taken the checkpoint over, its state, journal and
+        partial output are left as they are.
+        """
+        self.close()
+        state, self.state = self.state, None
+        on_disk = self._read_state()
+        owned = state is not None and on_disk is not None and on_disk.get('run_id', '') == state.run_id
+        if state is not None and os.path.exists(state.partial_path):
+            if owned or on_disk is None or on_disk.get('partial_path') != state.partial_path:
+                os.remove(state.partial_path)
+        if not owned:
+            return
+        for path in (self.journal_path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
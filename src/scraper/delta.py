@@ -0,0 +1,149 @@
+import csv
+import json
+import logging
+import os
+import shutil
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional, Set
+from ..constants import TICKET_CSV_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Held from reading carried rows out of the baseline until the output built
+# from them is committed, so a run and a double-check publish cannot interleave
+baseline_lock = threading.Lock()
+
+@dataclass
+class InventoryDelta:
+    added: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+    price_changed: Set[str] = field(default_factory=set)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.price_changed)
+
+    def to_dict(self) -> Dict:
+        return {
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'price_changed': len(self.price_changed)
+        }
+
+class InventoryDeltaTracker:
+    """Diff each run's ticket CSV against the previous run's, keyed by inventory_id.
+
+    The previous inventory is kept as a copy of its CSV under state_dir, and
+    state_dir/delta_state.json tracks how many delta uploads have gone out since
+    the last full one.
+    """
+
+    BASELINE_FILE = 'last_inventory.csv'
+    STATE_FILE = 'delta_state.json'
+
+    def __init__(self, state_dir: str):
+        self.state_dir = state_dir
+        self.baseline_path = os.path.join(state_dir, self.BASELINE_FILE)
+        self.state_path = os.path.join(state_dir, self.STATE_FILE)
+        os.makedirs(state_dir, exist_ok=True)
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'uploads_since_full': 0, 'force_full': True}
+
+    def _save_state(self, state: Dict):
+        temp_path = f'{self.state_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+
+    @staticmethod
+    def _read_prices(path: str) -> Dict[str, str]:
+        with open(path, encoding='utf-8', newline='') as f:
+            return {row['inventory_id']: row['list_price'] for row in csv.DictReader(f)}
+
+    def compute(self, current_csv: str) -> Optional[InventoryDelta]:
+        """Compare current_csv with the baseline; None when there is no baseline yet."""
+        if not os.path.exists(self.baseline_path):
+            return None
+
+        previous = self._read_prices(self.baseline_path)
+        delta = InventoryDelta()
+        seen = set()
+        with open(current_csv, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                inventory_id = row['inventory_id']
+                seen.add(inventory_id)
+                if inventory_id not in previous:
+                    delta.added.add(inventory_id)
+                elif previous[inventory_id] != row['list_price']:
+                    delta.price_changed.add(inventory_id)
+        delta.removed = set(previous) - seen
+        return delta
+
+    def write_delta_csv(self, current_csv: str, delta: InventoryDelta, path: str) -> str:
+        """Write added and repriced rows, plus removed rows with quantity 0, in upload format.
+
+        Written every run; it is uploaded only to stores that apply such a file
+        as changes (STORE_DELTA_UPLOADS).
+        """
+        changed = delta.added | delta.price_changed
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8', newline='') as out:
+            writer = csv.DictWriter(out, fieldnames=TICKET_CSV_COLUMNS, extrasaction='ignore', lineterminator='\n')
+            writer.writeheader()
+            with open(current_csv, encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    if row['inventory_id'] in changed:
+                        writer.writerow(row)
+            if delta.removed:
+                with open(self.baseline_path, encoding='utf-8', newline='') as f:
+                    for row in csv.DictReader(f):
+                        if row['inventory_id'] in delta.removed:
+                            row['quantity'] = 0
+                            writer.writerow(row)
+        os.replace(temp_path, path)
+        return path
+
+    def carried_rows(self, event_ids: Set[str]) -> Iterator[Dict]:
+        """Baseline rows for events that were not scraped this run, to keep the output complete."""
+        if not event_ids or not os.path.exists(self.baseline_path):
+            return
+        with open(self.baseline_path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                if row['event_id'] in event_ids:
+                    yield row
+
+    def full_upload_due(self, full_upload_every: int) -> bool:
+        """Whether the next upload should be a full snapshot rather than a delta."""
+        state = self._load_state()
+        return state.get('force_full', True) or state.get('uploads_since_full', 0) + 1 >= max(1, full_upload_every)
+
+    def mark_out_of_sync(self):
+        """Force the next upload to be a full snapshot, e.g. after a run that was not uploaded."""
+        state = self._load_state()
+        if not state.get('force_full'):
+            state['force_full'] = True
+            self._save_state(state)
+
+    def record_upload(self, full: bool, success: bool):
+        state = self._load_state()
+        if not success:
+            # The store may have missed changes; resync with a full snapshot
+            state['force_full'] = True
+        elif full:
+            state['uploads_since_full'] = 0
+            state['force_full'] = False
+        else:
+            state['uploads_since_full'] = state.get('uploads_since_full', 0) + 1
+        self._save_state(state)
+
+    def commit(self, current_csv: str):
+        """Make current_csv the baseline for the next run."""
+        temp_path = f'{self.baseline_path}.tmp'
+        shutil.copyfile(current_csv, temp_path)
+        os.replace(temp_path, self.baseline_path)
@@ -0,0 +1,222 @@
+import csv
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Set, Tuple
+from ..models.database import DoubleCheckSnapshot, Event, ScraperJob, db
+from .delta import baseline_lock
+from .listing import ListingRows, ProviderSeats
+from .output import StreamingCSVWriter
+
+logger = logging.getLogger(__name__)
+
+def ticket_key(ticket: Dict) -> str:
+    """Identity of a ticket for comparing two scrapes"""
+    return f"{ticket['section']}_{ticket['row']}_{ticket['seats']}_{ticket['price']}"
+
+class DoubleCheckPipeline:
+    """Confirm double-check Ticketmaster events with a second scrape after delay_seconds.
+
+    The first scrape's ticket keys are stored in double_check_snapshots and a
+    one-off scheduler job fires the confirmation at confirm_at, independent of
+    the regular runs. Tickets present in both scrapes are published right
+    away in a complete snapshot: the last published listings of every other
+    event plus the confirmed ones, uploaded and committed as the delta
+    baseline like a regular run's output. If that publish fails they are kept
+    under state/double_check instead, and the next regular run writes them in
+    place of scraping the event. Either way the event then rejoins regular
+    scraping.
+    """
+
+    ACTIVE_STATUSES = ('pending', 'confirming')
+    CONFIRMED_DIR = os.path.join('state', 'double_check')
+
+    def __init__(self, app, delay_seconds: int = 1200):
+        self.app = app
+        self.delay_seconds = delay_seconds
+        self.confirmed_dir = os.path.join(app.config['OUTPUT_FILE_DIR'], self.CONFIRMED_DIR)
+
+    def pending_event_ids(self) -> Set[int]:
+        """Events whose confirmation is still outstanding; runs must not scrape them again"""
+        with self.app.app_context():
+            rows = db.session.query(DoubleCheckSnapshot.event_id).filter(
+                DoubleCheckSnapshot.status.in_(self.ACTIVE_STATUSES)
+            ).all()
+            return {row[0] for row in rows}
+
+    def record_first_scrape(self, event: Event, first_scrape: ProviderSeats):
+        """Persist the first scrape and schedule its confirmation."""
+        if not first_scrape:
+            return
+
+        now = datetime.now()
+        with self.app.app_context():
+            snapshot = DoubleCheckSnapshot(
+                event.id,
+                {ticket_key(ticket) for ticket in first_scrape},
+                first_scraped_at=now,
+                confirm_at=now + timedelta(seconds=self.delay_seconds)
+            )
+            db.session.add(snapshot)
+            db.session.commit()
+            self.schedule(snapshot.id, snapshot.confirm_at)
+            logger.info(f"Stored first scrape of {event.event_name} ({snapshot.ticket_count} tickets), confirming at {snapshot.confirm_at}")
+
+    def schedule(self, snapshot_id: int, run_date: datetime):
+        from .scheduler import scheduler
+
+        scheduler.add_job(
+            func=DoubleCheckPipeline.confirm,
+            trigger='date',
+            run_date=run_date,
+            args=[snapshot_id, self.app],
+            id=f'double_check_{snapshot_id}',
+            replace_existing=True
+        )
+
+    @staticmethod
+    def confirm(snapshot_id: int, app):
+        """Second scrape of a double-check event; publishes the tickets seen in both scrapes."""
+        from ..ticketmaster.api import TicketmasterAPI
+        from .scraper import EventScraper
+
+        with app.app_context():
+            # Claim the snapshot so a second process cannot confirm it too
+            claimed = DoubleCheckSnapshot.query.filter_by(id=snapshot_id, status='pending').update({'status': 'confirming'})
+            db.session.commit()
+            if not claimed:
+                return
+
+            snapshot = db.session.get(DoubleCheckSnapshot, snapshot_id)
+            event = db.session.get(Event, snapshot.event_id)
+            job = ScraperJob.query.order_by(ScraperJob.id.desc()).first()
+            delay = app.config.get('DOUBLE_CHECK_DELAY_SECONDS', 1200)
+
+            if event is None or job is None or job.status in ('stopped', 'error'):
+                logger.info(f"Scraper not active, dropping double-check snapshot {snapshot_id}")
+                snapshot.status = 'expired'
+                db.session.commit()
+                return
+
+            if datetime.now() - snapshot.confirm_at > timedelta(seconds=delay):
+                # The first scrape is too old to confirm anything; the next run starts over
+                logger.info(f"Double-check snapshot {snapshot_id} for {event.event_name} is stale, expiring")
+                snapshot.status = 'expired'
+                db.session.commit()
+                return
+
+            ticketmaster_api = None
+            try:
+                logger.info(f"Performing second scrape for double-check event: {event.event_name}")
+                ticketmaster_api = TicketmasterAPI()
+                scraper = EventScraper(
+                    todaytix_api=None,
+                    ticketmaster_api=ticketmaster_api,
+                    output_dir=app.config['OUTPUT_FILE_DIR'],
+                    auto_upload=job.auto_upload,
+                    upload_mode=job.upload_mode or 'full',
+                    full_upload_every=job.full_upload_every or 6
+                )
+                second_scrape = scraper.ticketmaster_api.get_seats(event.ticketmaster_id)
+                first_keys = snapshot.keys
+                stable_tickets = [ticket for ticket in second_scrape if ticket_key(ticket) in first_keys]
+                rows = scraper.process_seats(event, stable_tickets)
+                pipeline = DoubleCheckPipeline(app, delay)
+                published = pipeline.publish(scraper, event, rows)
+                if not published:
+                    pipeline.stage(event, rows)
+
+                snapshot.status = 'confirmed'
+                snapshot.confirmed_at = datetime.now()
+                snapshot.stable_count = len(stable_tickets)
+                event.first_scrape_completed = True
+                # Published counts as its scrape; staged rows need the next run
+                event.last_scraped_at = snapshot.confirmed_at if published else None
+                db.session.commit()
+                logger.info(f"Confirmed {len(stable_tickets)}/{snapshot.ticket_count} stable tickets for {event.event_name}")
+            except Exception as e:
+                logger.error(f"Error confirming double-check event {event.event_name}: {str(e)}")
+                db.session.rollback()
+                DoubleCheckSnapshot.query.filter_by(id=snapshot_id).update({'status': 'expired'})
+                db.session.commit()
+            finally:
+                if ticketmaster_api is not None:
+                    ticketmaster_api.close()
+
+    def _confirmed_path(self, event_id: int) -> str:
+        return os.path.join(self.confirmed_dir, f'{event_id}.csv')
+
+    def publish(self, scraper, event: Event, rows: ListingRows) -> bool:
+        """Publish the last published listings of every other event plus event's confirmed rows.
+
+        The snapshot goes through scraper.publish_results, like a run's
+        output. False when there is no published snapshot to build on yet or
+        the upload failed; the caller then stages the rows for the next run.
+        """
+        tracker = scraper.delta_tracker
+        if not os.path.exists(tracker.baseline_path):
+            logger.info(f"No published inventory to add {event.event_name} to yet, keeping it for the next run")
+            return False
+
+        output_dir = self.app.config['OUTPUT_FILE_DIR']
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        other_event_ids = {row[0] for row in db.session.query(Event.event_id).filter(Event.id != event.id)}
+        try:
+            with baseline_lock:
+                with StreamingCSVWriter(output_dir) as writer:
+                    writer.write_rows(tracker.carried_rows(other_event_ids))
+                    writer.write_rows(rows)
+                    output_file = writer.publish(os.path.join(output_dir, f'tickets_{timestamp}_doublecheck_{event.id}.csv'))
+                return scraper.publish_results(output_file)
+        except Exception as e:
+            logger.error(f"Error publishing double-checked tickets for {event.event_name}: {str(e)}")
+            return False
+
+    def stage(self, event: Event, rows: ListingRows) -> str:
+        """Keep an event's confirmed rows for the next run's output, when publishing them failed."""
+        with StreamingCSVWriter(self.confirmed_dir) as writer:
+            writer.write_rows(rows)
+            return writer.publish(self._confirmed_path(event.id))
+
+    def confirmed_event_ids(self) -> Set[int]:
+        """Events whose confirmed rows are waiting for a run"""
+        if not os.path.isdir(self.confirmed_dir):
+            return set()
+        names = (os.path.splitext(name) for name in os.listdir(self.confirmed_dir))
+        return {int(stem) for stem, ext in names if ext == '.csv' and stem.isdigit()}
+
+    def iter_confirmed(self, events: List[Event]) -> Iterator[Tuple[Event, ListingRows]]:
+        """Yield (event, rows) from the confirmed rows of events, like a scrape would"""
+        for event in events:
+            with open(self._confirmed_path(event.id), encoding='utf-8', newline='') as f:
+                reader = csv.reader(f)
+                next(reader, None)  # Header; stage wrote the rows in TICKET_CSV_COLUMNS order
+                rows = list(reader)
+            logger.info(f"Using {len(rows)} double-checked tickets for {event.event_name}")
+            yield event, rows
+
+    def clear_confirmed(self, event_ids):
+        """Drop confirmed rows once a published run has included them"""
+        for event_id in event_ids:
+            try:
+                os.remove(self._confirmed_path(event_id))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def recover(app):
+        """Reschedule confirmations lost with the previous process; overdue ones fire immediately."""
+        pipeline = DoubleCheckPipeline(app, app.config.get('DOUBLE_CHECK_DELAY_SECONDS', 1200))
+        now = datetime.now()
+        with app.app_context():
+            # A confirmation stuck mid-flight for a whole delay died with its process
+            DoubleCheckSnapshot.query.filter(
+                DoubleCheckSnapshot.status == 'confirming',
+                DoubleCheckSnapshot.confirm_at < now - timedelta(seconds=pipeline.delay_seconds)
+            ).update({'status': 'pending'})
+            db.session.commit()
+
+            pending = DoubleCheckSnapshot.query.filter_by(status='pending').all()
+            for snapshot in pending:
+                pipeline.schedule(snapshot.id, max(snapshot.confirm_at, now))
+            return len(pending)
@@ -0,0 +1,150 @@
+import logging
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as pa_ds
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency: pip install pyarrow (poetry install -E history)
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Columns kept from the ticket CSV, with their types
+HISTORY_CSV_COLUMNS = {
+    'event_id': 'string',
+    'inventory_id': 'string',
+    'section': 'string',
+    'row': 'string',
+    'seats': 'string',
+    'quantity': 'int16',
+    'list_price': 'int32',
+    'face_price': 'float64',
+    'taxed_cost': 'float64',
+    'cost': 'float64',
+}
+
+def history_available() -> bool:
+    return pa is not None
+
+class PriceHistory:
+    """Columnar history of every run's listings as zstd Parquet, partitioned by date and provider.
+
+    Each run adds history_dir/date=YYYY-MM-DD/provider=<website>/run_<ts>.parquet
+    with rows sorted by event_id. Run files are merged into one compacted file
+    per partition, sorted by event and run time, once a day is over or
+    compact_after runs have piled up, so reading one event's week touches a
+    few files and row groups. Partitions older than retention_days are
+    deleted. Requires pyarrow.
+    """
+
+    COMPACTED_FILE = 'compacted.parquet'
+
+    def __init__(self, history_dir: str, retention_days: int = 90, compact_after: int = 12):
+        if pa is None:
+            raise RuntimeError("Price history needs pyarrow, which is not installed")
+        self.history_dir = history_dir
+        self.retention_days = retention_days
+        self.compact_after = compact_after
+        os.makedirs(history_dir, exist_ok=True)
+
+    def _partition_dir(self, day: date, provider: str) -> str:
+        return os.path.join(self.history_dir, f'date={day.isoformat()}', f'provider={provider}')
+
+    def _write(self, table: 'pa.Table', path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix='.', suffix='.parquet.tmp', dir=os.path.dirname(path))
+        os.close(fd)
+        pq.write_table(table, temp_path, compression='zstd', row_group_size=50000)
+        os.replace(temp_path, path)
+
+    def record_run(self, csv_path: str, run_at: datetime, providers: Dict[str, str],
+                   exclude_event_ids: Iterable[str] = ()) -> int:
+        """Add a run's listings from its ticket CSV; events in exclude_event_ids (carried rows) are left out."""
+        table = pa_csv.read_csv(csv_path, convert_options=pa_csv.ConvertOptions(
+            include_columns=list(HISTORY_CSV_COLUMNS),
+            column_types={name: pa.type_for_alias(alias) for name, alias in HISTORY_CSV_COLUMNS.items()}
+        ))
+
+        excluded = pa.array(sorted(exclude_event_ids), type=pa.string())
+        if len(excluded):
+            table = table.filter(pc.invert(pc.is_in(table['event_id'], value_set=excluded)))
+        if not table.num_rows:
+            return 0
+
+        event_ids = pa.array(list(providers), type=pa.string())
+        provider_names = pa.array([providers[event_id] for event_id in providers], type=pa.string())
+        provider_column = pc.fill_null(pc.take(provider_names, pc.index_in(table['event_id'], value_set=event_ids)), 'unknown')
+        table = table.append_column('run_at', pa.repeat(pa.scalar(run_at, type=pa.timestamp('s')), table.num_rows))
+
+        written = 0
+        for provider in pc.unique(provider_column).to_pylist():
+            part = table.filter(pc.equal(provider_column, provider)).sort_by('event_id')
+            path = os.path.join(self._partition_dir(run_at.date(), provider.lower()), f"run_{run_at.strftime('%Y%m%d_%H%M%S')}.parquet")
+            self._write(part, path)
+            written += part.num_rows
+        logger.info(f"Recorded {written} listings in price history")
+        return written
+
+    def compact(self, today: date):
+        """Merge run files of finished days, or of any partition with compact_after of them, into its compacted file."""
+        for day_dir in self._day_dirs():
+            day_over = self._day(day_dir) < today
+            for provider_dir in sorted(os.listdir(day_dir)):
+                partition = os.path.join(day_dir, provider_dir)
+                runs = sorted(name for name in os.listdir(partition) if name.startswith('run_') and name.endswith('.parquet'))
+                if not runs or (not day_over and len(runs) < self.compact_after):
+                    continue
+                tables = [pq.read_table(os.path.join(partition, name), partitioning=None) for name in runs]
+                existing = os.path.join(partition, self.COMPACTED_FILE)
+                if os.path.exists(existing):
+                    tables.insert(0, pq.read_table(existing, partitioning=None))
+                merged = pa.concat_tables(tables).sort_by([('event_id', 'ascending'), ('run_at', 'ascending')])
+                self._write(merged, existing)
+                for name in runs:
+                    os.remove(os.path.join(partition, name))
+                logger.info(f"Compacted {len(runs)} history files in {partition}")
+
+    def apply_retention(self, today: Optional[date] = None) -> List[str]:
+        """Delete day partitions older than retention_days; returns the removed directories."""
+        cutoff = (today or date.today()) - timedelta(days=self.retention_days)
+        removed = []
+        for day_dir in self._day_dirs():
+            if self._day(day_dir) < cutoff:
+                shutil.rmtree(day_dir, ignore_errors=True)
+                removed.append(day_dir)
+        if removed:
+            logger.info(f"Removed {len(removed)} day(s) of price history older than {cutoff}")
+        return removed
+
+    def maintain(self, today: Optional[date] = None):
+        today = today or date.today()
+        self.apply_retention(today)
+        self.compact(today)
+
+    def event_history(self, event_id: str, days: int = 7, today: Optional[date] = None) -> 'pa.Table':
+        """All recorded listings of one event over the last `days` days, oldest run first."""
+        start = ((today or date.today()) - timedelta(days=days - 1)).isoformat()
+        dataset = pa_ds.dataset(
+            self.history_dir,
+            format='parquet',
+            partitioning=pa_ds.partitioning(pa.schema([('date', pa.string()), ('provider', pa.string())]), flavor='hive')
+        )
+        table = dataset.to_table(filter=(pa_ds.field('event_id') == event_id) & (pa_ds.field('date') >= start))
+        return table.sort_by([('run_at', 'ascending'), ('inventory_id', 'ascending')])
+
+    def _day_dirs(self) -> List[str]:
+        return sorted(
+            os.path.join(self.history_dir, name) for name in os.listdir(self.history_dir)
+            if name.startswith('date=') and os.path.isdir(os.path.join(self.history_dir, name))
+        )
+
+    @staticmethod
+    def _day(day_dir: str) -> date:
+        return date.fromisoformat(os.path.basename(day_dir)[len('date='):])
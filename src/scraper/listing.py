@@ -0,0 +1,94 @@
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, Tuple, Union
+from ..constants import TICKET_CSV_COLUMNS
+
+# Seats as the provider clients return them, before process_seats prices them
+ProviderSeats = List[Dict]
+
+class EventColumns(NamedTuple):
+    """Upload columns that are the same for every listing of one event, built once per event"""
+    event_name: str
+    venue_name: str
+    event_date: str
+    event_id: str
+    in_hand: str
+    in_hand_date: Any
+    stock_type: str
+
+    @classmethod
+    def for_event(cls, event, in_hand_date: str) -> 'EventColumns':
+        return cls(
+            event_name=event.event_name,
+            venue_name=event.venue_name or 'Unknown Venue',
+            event_date=f"{event.event_date.strftime('%Y-%m-%d')}T{event.event_time}:00",
+            event_id=event.event_id,
+            in_hand=event.in_hand or "N",
+            in_hand_date=event.in_hand_date or in_hand_date,
+            stock_type=event.stock_type or "ELECTRONIC"
+        )
+
+# Upload columns with the same value for every listing of every event
+FIXED_COLUMNS = {
+    'quantity': 2, 'barcodes': "", 'internal_notes': "", 'public_notes': "", 'tags': "",
+    'hide_seats': "Y", 'instant_transfer': "N", 'files_available': "N", 'split_type': "NEVERLEAVEONE",
+    'custom_split': "", 'zone': "N", 'shown_quantity': "", 'passthrough': ""
+}
+
+class EventListings:
+    """One event's listings stored column-wise next to its EventColumns.
+
+    Each listing is a position in eight per-field lists instead of a 28-key
+    dict, and the lists only hold strings and numbers, which the garbage
+    collector does not track. Iterating yields full rows in
+    TICKET_CSV_COLUMNS order, expanded one at a time for the writer.
+    """
+
+    __slots__ = ('event', 'inventory_ids', 'sections', 'rows', 'seats',
+                 'list_prices', 'face_prices', 'taxed_costs', 'costs')
+    # Upload column of each per-field list, in append() order
+    LISTING_COLUMNS = ('inventory_id', 'section', 'row', 'seats', 'list_price', 'face_price', 'taxed_cost', 'cost')
+
+    def __init__(self, event: EventColumns):
+        self.event = event
+        self.inventory_ids = []
+        self.sections = []
+        self.rows = []
+        self.seats = []
+        self.list_prices = []
+        self.face_prices = []
+        self.taxed_costs = []
+        self.costs = []
+
+    def append(self, inventory_id: str, section, row, seats, list_price: int, face_price, taxed_cost, cost):
+        self.inventory_ids.append(inventory_id)
+        self.sections.append(section)
+        self.rows.append(row)
+        self.seats.append(seats)
+        self.list_prices.append(list_price)
+        self.face_prices.append(face_price)
+        self.taxed_costs.append(taxed_cost)
+        self.costs.append(cost)
+
+    def __len__(self) -> int:
+        return len(self.inventory_ids)
+
+    def __iter__(self) -> Iterator[Tuple]:
+        fixed = tuple(self.event) + tuple(FIXED_COLUMNS.values())
+        for listing in zip(
+            self.inventory_ids, self.sections, self.rows, self.seats,
+            self.list_prices, self.face_prices, self.taxed_costs, self.costs
+        ):
+            yield _ROW_ORDER(listing + fixed)
+
+
+def _row_order() -> itemgetter:
+    """Picks TICKET_CSV_COLUMNS, in order, out of a listing's own values followed by its event's and the fixed ones"""
+    names = EventListings.LISTING_COLUMNS + EventColumns._fields + tuple(FIXED_COLUMNS)
+    if sorted(names) != sorted(TICKET_CSV_COLUMNS):
+        raise ValueError(f"EventListings columns do not match TICKET_CSV_COLUMNS: {sorted(set(names) ^ set(TICKET_CSV_COLUMNS))}")
+    return itemgetter(*(names.index(column) for column in TICKET_CSV_COLUMNS))
+
+_ROW_ORDER = _row_order()
+
+# One event's rows in TICKET_CSV_COLUMNS order: listings just scraped, or positional rows read back
+ListingRows = Union[EventListings, List[Sequence]]
@@ -0,0 +1,110 @@
+import csv
+import logging
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+from ..constants import TICKET_CSV_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+class StreamingCSVWriter:
+    """Write ticket rows to disk as they arrive and publish the file atomically.
+
+    Rows go to a hidden temp file in the output directory; publish() renames it
+    into place, so readers never see a partial CSV. If the writer is closed
+    without publishing, the temp file is removed unless it was kept with
+    detach() for a later resume().
+    """
+
+    def __init__(self, output_dir: str, columns: List[str] = None, temp_path: Optional[str] = None):
+        self.output_dir = output_dir
+        self.columns = columns or TICKET_CSV_COLUMNS
+        self.row_count = 0
+        self.published_path = None
+        self._keep = False
+
+        os.makedirs(output_dir, exist_ok=True)
+        if temp_path is None:
+            fd, self.temp_path = tempfile.mkstemp(prefix='.tickets_', suffix='.csv.tmp', dir=output_dir)
+            self._file = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+        else:
+            self.temp_path = temp_path
+            self._file = open(temp_path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction='ignore', lineterminator='\n')
+        self._rows = csv.writer(self._file, lineterminator='\n')
+        self._writer.writeheader()
+        self._file.flush()
+
+    @classmethod
+    def resume(cls, output_dir: str, temp_path: str, offset: int, row_count: int,
+               columns: List[str] = None) -> 'StreamingCSVWriter':
+        """Reopen a detached temp file, dropping anything written after offset."""
+        writer = cls.__new__(cls)
+        writer.output_dir = output_dir
+        writer.columns = columns or TICKET_CSV_COLUMNS
+        writer.row_count = row_count
+        writer.published_path = None
+        writer._keep = False
+        writer.temp_path = temp_path
+        os.truncate(temp_path, offset)
+        writer._file = open(temp_path, 'a', encoding='utf-8', newline='')
+        writer._writer = csv.DictWriter(writer._file, fieldnames=writer.columns, extrasaction='ignore', lineterminator='\n')
+        writer._rows = csv.writer(writer._file, lineterminator='\n')
+        return writer
+
+    @property
+    def offset(self) -> int:
+        """Bytes written so far, all of them handed to the OS"""
+        return self._file.tell()
+
+    def sync(self):
+        """Force written rows to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def write_rows(self, rows: Iterable[Union[Dict, Sequence]]):
+        """Append rows and push them to the OS so progress is visible on disk.
+
+        Dicts are matched to columns by key; sequences, such as the rows an
+        EventListings expands to, are written positionally.
+        """
+        for row in rows:
+            if isinstance(row, dict):
+                self._writer.writerow(row)
+            else:
+                self._rows.writerow(row)
+            self.row_count += 1
+        self._file.flush()
+
+    def publish(self, path: str) -> str:
+        """Durably move the finished file to path."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, path)
+        self.published_path = path
+        logger.info(f"Saved {self.row_count} rows to {path}")
+        return path
+
+    def detach(self):
+        """Close the writer but keep the temp file for a later resume()."""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+        self._keep = True
+
+    def abort(self):
+        """Discard the temp file."""
+        if not self._file.closed:
+            self._file.close()
+        if self.published_path is None and not self._keep and os.path.exists(self.temp_path):
+            try:
+                os.remove(self.temp_path)
+            except OSError as e:
+                logger.error(f"Error removing temporary output {self.temp_path}: {str(e)}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.abort()
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Frames kept per sampled stack; deeper frames are dropped from the root side
+MAX_STACK_DEPTH = 64
+
+def _function_key(code) -> Tuple[str, int, str]:
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+def _label(key: Tuple[str, int, str]) -> str:
+    filename, line, name = key
+    return f"{name} ({os.path.relpath(filename) if os.path.isabs(filename) else filename}:{line})"
+
+class SamplingProfiler:
+    """Sample the stacks of every thread in the process at a fixed interval.
+
+    Runs in its own thread and reads sys._current_frames(), so worker threads,
+    the async engine's loop and the run thread are all covered without
+    instrumenting them. Threads that were already running when profiling
+    started, other than the profiled one, are ignored. Cost is proportional to
+    the sampling rate, not to the number of calls, and nothing runs unless a
+    profile was asked for.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = 0
+        self.duration = 0.0
+        self.self_counts: Counter = Counter()
+        self.total_counts: Counter = Counter()
+        self.stacks: Counter = Counter()
+        self._started = None
+        self._ignored = set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, name='sampling-profiler', daemon=True)
+
+    def _sample_loop(self):
+        self._ignored.add(threading.get_ident())
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in self._ignored:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_function_key(frame.f_code))
+                    frame = frame.f_back
+                self.samples += 1
+                self.self_counts[stack[0]] += 1
+                for key in set(stack):
+                    self.total_counts[key] += 1
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        current = threading.get_ident()
+        self._ignored = {thread.ident for thread in threading.enumerate() if thread.ident != current}
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.monotonic() - self._started
+        return False
+
+    def _entries(self, counts: Counter, limit: int) -> List[Dict]:
+        return [{
+            'function': _label(key),
+            'self_samples': self.self_counts[key],
+            'total_samples': self.total_counts[key],
+            'self_percent': round(100 * self.self_counts[key] / self.samples, 2),
+            'total_percent': round(100 * self.total_counts[key] / self.samples, 2)
+        } for key, _ in counts.most_common(limit)]
+
+    def save(self, path: str, limit: int = 50) -> Dict:
+        """Write the summary to path (JSON) and folded stacks next to it for flamegraph tools."""
+        summary = {
+            'interval_seconds': self.interval,
+            'duration_seconds': round(self.duration, 2),
+            'samples': self.samples,
+            # Where threads were when sampled, and what was on their stacks
+            'self': self._entries(self.self_counts, limit),
+            'total': self._entries(self.total_counts, limit)
+        }
+        with open(path, 'w') as f:
+            json.dump(summary, f, indent=1)
+        with open(f"{os.path.splitext(path)[0]}.folded", 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(';'.join(key[2] for key in stack) + f' {count}\n')
+        logger.info(f"Saved profile with {self.samples} samples over {self.duration:.1f}s to {path}")
+        return summary
+
+def load_hotspots(path: str, sort: str = 'self', limit: Optional[int] = None) -> Dict:
+    """Read a saved profile, keeping the hotspots ranked by self or total samples"""
+    with open(path) as f:
+        summary = json.load(f)
+    hotspots = summary.pop(sort)
+    summary.pop('total' if sort == 'self' else 'self', None)
+    summary['sort'] = sort
+    summary['hotspots'] = hotspots[:limit] if limit else hotspots
+    return summary
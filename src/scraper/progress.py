@@ -0,0 +1,51 @@
+import logging
+import time
+from typing import Callable, Optional
+from ..models.database import ScraperJob, db
+
+logger = logging.getLogger(__name__)
+
+class ProgressReporter:
+    """Batch job progress updates instead of committing after every event.
+
+    Counters are kept in memory and written to the job every flush_every events
+    or flush_seconds, whichever comes first, so the status the UI polls lags by
+    at most one flush window.
+    """
+
+    def __init__(self, job: ScraperJob, total_events: int, flush_every: int = 25, flush_seconds: float = 2.0,
+                 on_flush: Optional[Callable[[], None]] = None):
+        self.job = job
+        self.on_flush = on_flush
+        self.total_events = total_events
+        self.flush_every = max(1, flush_every)
+        self.flush_seconds = flush_seconds
+        self.events_processed = job.events_processed or 0
+        self.tickets_found = job.total_tickets_found or 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def record(self, tickets: int):
+        """Count one completed event and flush if the window has elapsed."""
+        self.events_processed += 1
+        self.tickets_found += tickets
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Write the counters to the job; a no-op when nothing changed since the last flush."""
+        self._last_flush = time.monotonic()
+        if not self._unflushed:
+            return
+        if self.on_flush:
+            # e.g. make the checkpoint durable before the UI reports the progress
+            self.on_flush()
+        self.job.events_processed = self.events_processed
+        self.job.total_tickets_found = self.tickets_found
+        db.session.commit()
+        self._unflushed = 0
+
+        if self.total_events:
+            progress = (self.events_processed / self.total_events) * 100
+            logger.info(f"Progress: {progress:.1f}% ({self.events_processed}/{self.total_events} events)")
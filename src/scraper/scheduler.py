@@ -27,6 +27,9 @@ class ScraperScheduler:
                 logger.info(f"Starting scheduled job {job_id} with settings from DB:")
                 logger.info(f"- Auto Upload: {job.auto_upload}")
                 logger.info(f"- Concurrent Requests: {job.concurrent_requests}")
+                logger.info(f"- Engine: {job.engine}")
+                logger.info(f"- Upload Mode: {job.upload_mode} (full every {job.full_upload_every})")
+                logger.info(f"- Distributed: {job.distributed}")
                 logger.info(f"- Interval Minutes: {job.interval_minutes}")
                 
                 job.status = 'running'
@@ -45,12 +48,19 @@ class ScraperScheduler:
                     ticketmaster_api=ticketmaster_api,
                     output_dir=app.config['OUTPUT_FILE_DIR'],
                     concurrent_requests=job.concurrent_requests,  
-                    auto_upload=job.auto_upload 
+                    auto_upload=job.auto_upload,
+                    engine=job.engine or 'threaded',
+                    upload_mode=job.upload_mode or 'full',
+                    full_upload_every=job.full_upload_every or 6,
+                    distributed=bool(job.distributed)
                 )
 
                 logger.info(f"Initialized scraper with settings - auto_upload: {scraper.auto_upload}, concurrent_requests: {scraper.max_concurrent}")
                 
-                success, output_file = scraper.run(job)
+                try:
+                    success, output_file = scraper.run(job)
+                finally:
+                    ticketmaster_api.close()
                 
                 logger.info(f"Scraper run completed - success: {success}, output_file: {output_file}")
 
@@ -84,4 +94,45 @@ class ScraperScheduler:
                         db.session.commit()
                 except Exception as inner_e:
                     logger.error(f"Error updating job status: {str(inner_e)}")
-                raise e
\ No newline at end of file
+                raise e
+
+    @staticmethod
+    def resume_interrupted(app, stale_after: timedelta = timedelta(minutes=5)):
+        """Restart the latest job if the previous process died mid-run or with its next run scheduled.
+
+        The job is claimed with a conditional update to 'resuming' so only one
+        process reschedules it; a claim that never started within stale_after
+        is taken over. EventScraper.run then resumes the run's checkpoint.
+        """
+        with app.app_context():
+            now = datetime.now()
+            job = ScraperJob.query.order_by(ScraperJob.id.desc()).first()
+            if not job:
+                return None
+
+            if job.status == 'running':
+                run_date = now
+            elif job.status == 'completed' and job.next_run:
+                run_date = max(job.next_run, now)
+            elif job.status == 'resuming' and job.next_run and job.next_run < now - stale_after:
+                run_date = now
+            else:
+                return None
+
+            claimed = ScraperJob.query.filter_by(id=job.id, status=job.status, next_run=job.next_run).update(
+                {'status': 'resuming', 'next_run': run_date}
+            )
+            db.session.commit()
+            if not claimed:
+                return None
+
+            scheduler.add_job(
+                func=ScraperScheduler.start_scraper,
+                trigger='date',
+                run_date=run_date,
+                args=[job.id, app],
+                id=f'scraper_{job.id}_{now.strftime("%Y%m%d_%H%M%S")}',
+                replace_existing=True
+            )
+            logger.info(f"Job {job.id} will resume at {run_date}")
+            return job.id
@@ -1,43 +1,86 @@
 from concurrent import futures
+import itertools
 import zlib
 from flask import current_app
-import pandas as pd
 import logging
-import time
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
-from ..models.database import Event, ScraperJob, VenueMapping, db
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+from ..models.database import Event, ScraperJob, db
 from concurrent.futures import ThreadPoolExecutor
 from ..services import UploadService
+from ..services.metrics import events_scraped_total, last_run_timestamp, listings_per_event, run_seconds, runs_total
+from .async_engine import AsyncScrapeEngine
+from .cancellation import CancellationToken, JobStatusWatcher, cancellation_registry
+from .checkpoint import RunCheckpoint
+from .delta import InventoryDeltaTracker, baseline_lock
+from .double_check import DoubleCheckPipeline, ticket_key
+from .history import PriceHistory, history_available
+from .listing import EventColumns, EventListings, ListingRows, ProviderSeats
+from .profiling import SamplingProfiler
+from .progress import ProgressReporter
+from .snapshot import RunSnapshot
+from .tiers import DEFAULT_SCRAPE_TIERS, ScrapeTierSchedule
+from .work_queue import DistributedRun
 
 logger = logging.getLogger(__name__)
 
 class EventScraper:
-    def __init__(self, todaytix_api, ticketmaster_api, output_dir: str, concurrent_requests: int = 5, auto_upload: bool = False):
+    ENGINES = ('threaded', 'async')
+    UPLOAD_MODES = ('full', 'delta')
+
+    def __init__(self, todaytix_api, ticketmaster_api, output_dir: str, concurrent_requests: int = 5, auto_upload: bool = False,
+                 engine: str = 'threaded', upload_mode: str = 'full', full_upload_every: int = 6, distributed: bool = False):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown scraper engine: {engine}")
+        if upload_mode not in self.UPLOAD_MODES:
+            raise ValueError(f"Unknown upload mode: {upload_mode}")
         self.todaytix_api = todaytix_api
         self.ticketmaster_api = ticketmaster_api
         self.output_dir = output_dir
         self.max_concurrent = concurrent_requests
+        self.ticketmaster_api.configure_pool(concurrent_requests)
         self.auto_upload = auto_upload
+        self.engine = engine
+        self.upload_mode = upload_mode
+        self.full_upload_every = full_upload_every
+        self.distributed = distributed
+        self.delta_tracker = InventoryDeltaTracker(os.path.join(output_dir, 'state'))
         self.app = current_app._get_current_object()
-        self._stop_requested = False
+        # The store's CSV upload is a full inventory sync unless configured to take partial files
+        self.delta_uploads = upload_mode == 'delta' and self.app.config.get('STORE_DELTA_UPLOADS', False)
+        if upload_mode == 'delta' and not self.delta_uploads:
+            logger.warning("Delta upload mode needs STORE_DELTA_UPLOADS; uploading full snapshots instead")
+        self.scrape_tiers = ScrapeTierSchedule.from_spec(self.app.config.get('SCRAPE_TIERS', DEFAULT_SCRAPE_TIERS))
+        self.cancel_token = CancellationToken()
+        self.stop_poll_interval = self.app.config.get('SCRAPER_STOP_POLL_SECONDS', 2.0)
         self._executor = None
-        self._temp_inventory = {}
-        self.double_check_delay = 1200
+        self.double_check_delay = self.app.config.get('DOUBLE_CHECK_DELAY_SECONDS', 1200)
+        self.double_check = DoubleCheckPipeline(self.app, self.double_check_delay)
+        self._pending_double_checks = set()
+        self.run_snapshot = None
+        self.progress_flush_events = self.app.config.get('PROGRESS_FLUSH_EVENTS', 25)
+        self.progress_flush_seconds = self.app.config.get('PROGRESS_FLUSH_SECONDS', 2.0)
+        self.checkpoint_max_age_minutes = self.app.config.get('RUN_CHECKPOINT_MAX_AGE_MINUTES', 120)
+        self.profile_interval = self.app.config.get('PROFILE_INTERVAL_SECONDS', 0.005)
+        self.history = None
+        if self.app.config.get('HISTORY_ENABLED'):
+            if history_available():
+                self.history = PriceHistory(self.app.config['HISTORY_DIR'], self.app.config.get('HISTORY_RETENTION_DAYS', 90))
+            else:
+                logger.warning("HISTORY_ENABLED is set but pyarrow is not installed; price history is off")
 
     def request_stop(self):
         """Signal the scraper to stop gracefully"""
-        self._stop_requested = True
+        self.cancel_token.cancel()
         if self._executor:
-            self._executor.shutdown(wait=False)
+            self._executor.shutdown(wait=False, cancel_futures=True)
 
     def should_stop(self) -> bool:
         """Check if stop has been requested"""
-        with self.app.app_context():
-            # Check both internal flag and job status
-            job = ScraperJob.query.order_by(ScraperJob.id.desc()).first()
-            return self._stop_requested or (job and job.status == 'stopped')
+        # Job status changes are picked up by the JobStatusWatcher started in run()
+        return self.cancel_token.is_cancelled()
 
     def generate_section_hash(self, section_name: str) -> str:
         """Generate a 3-digit hash from section name."""
@@ -65,15 +108,15 @@ class EventScraper:
 
         return f"{event_id}{section_hash}{row_num}{first_seat}"
 
-    def process_seats(self, event: Event, seats_data: List[Dict]) -> List[Dict]:
+    def process_seats(self, event: Event, seats_data: ProviderSeats) -> EventListings:
         """Process seats data for an event."""
-        if self.should_stop():
-            return []
-
-        processed_data = []
         date_str = event.event_date.strftime('%m/%d/%Y')
         date_parts = date_str.split('/')
         in_hand_date = f"{date_parts[2]}-{date_parts[0].zfill(2)}-{date_parts[1].zfill(2)}"
+        # Columns that do not vary per listing are stored once for the event
+        processed_data = EventListings(EventColumns.for_event(event, in_hand_date))
+        if self.should_stop():
+            return processed_data
 
         for seat in seats_data:
             if self.should_stop():
@@ -89,44 +132,24 @@ class EventScraper:
                             seat.get('fees', {}).get('concierge', 0) + \
                             seat.get('fees', {}).get('order', 0)
 
-            processed_data.append({
-                "inventory_id": self.generate_inventory_id(
+            processed_data.append(
+                self.generate_inventory_id(
                     str(event.event_id),
                     seat['section'],
                     seat['row'],
                     seat['seats']
                 ),
-                "event_name": event.event_name,
-                "venue_name": event.venue_name or 'Unknown Venue',
-                "event_date": f"{event.event_date.strftime('%Y-%m-%d')}T{event.event_time}:00",
-                "event_id": event.event_id,
-                "quantity": 2,
-                "section": seat['section'],
-                "row": seat['row'],
-                "seats": seat['seats'],
-                "barcodes": "",
-                "internal_notes": "",
-                "public_notes": "",
-                "tags": "",
-                "list_price": unit_list_price,
-                "face_price": seat['face_value'],
-                "taxed_cost": taxed_cost,
-                "cost": seat['price'],
-                "hide_seats": "Y",
-                "in_hand": event.in_hand or "N",
-                "in_hand_date": event.in_hand_date or in_hand_date,
-                "instant_transfer": "N",
-                "files_available": "N",
-                "split_type": "NEVERLEAVEONE",
-                "custom_split": "",
-                "stock_type": event.stock_type or "ELECTRONIC",
-                "zone": "N",
-                "shown_quantity": "",
-                "passthrough": "",
-            })
+                seat['section'],
+                seat['row'],
+                seat['seats'],
+                list_price=unit_list_price,
+                face_price=seat['face_value'],
+                taxed_cost=taxed_cost,
+                cost=seat['price']
+            )
         return processed_data
 
-    def process_event_with_context(self, event: Event) -> List[Dict]:
+    def process_event_with_context(self, event: Event) -> Optional[ListingRows]:
         """Wrapper to handle Flask context in threads"""
         if self.should_stop():
             return []
@@ -134,8 +157,8 @@ class EventScraper:
         with self.app.app_context():
             return self.process_event(event)
 
-    def process_event(self, event: Event) -> List[Dict]:
-        """Process a single event."""
+    def process_event(self, event: Event) -> Optional[ListingRows]:
+        """Process a single event; None when the scrape failed, so the run keeps its previous listings."""
         if self.should_stop():
             return []
 
@@ -151,76 +174,42 @@ class EventScraper:
 
         except Exception as e:
             logger.error(f"Error processing event {event.event_name}: {str(e)}")
-            return []
+            return None
 
-    def process_double_check_event(self, event: Event) -> List[Dict]:
+    def process_double_check_event(self, event: Event) -> ListingRows:
         """Handle double-check process for Ticketmaster events."""
-        if not event.ticketmaster_id:
-            logger.error(f"Missing Ticketmaster ID for event: {event.event_name}")
-            return []
-
-        event_key = f"{event.website}_{event.ticketmaster_id}"
-
-        # First scrape
-        if event_key not in self._temp_inventory:
+        if self.double_check_stage(event) == 'first':
             logger.info(f"Performing first scrape for double-check event: {event.event_name}")
-            first_scrape = self.ticketmaster_api.get_seats(event.ticketmaster_id)
-            if not first_scrape:
-                return []
-
-            self._temp_inventory[event_key] = {
-                'data': first_scrape,
-                'timestamp': time.time(),
-                'processed': False
-            }
-            return []  # Return empty list to continue with other events
-
-        # Check if enough time has passed for second scrape
-        elapsed_time = time.time() - self._temp_inventory[event_key]['timestamp']
-        if elapsed_time < self.double_check_delay:
-            return []  # Not ready for second scrape yet
-
-        if self._temp_inventory[event_key]['processed']:
-            return []  # Already processed this event
-
-        # Perform second scrape and compare
-        logger.info(f"Performing second scrape for double-check event: {event.event_name}")
-        second_scrape = self.ticketmaster_api.get_seats(event.ticketmaster_id)
+            self.record_first_scrape(event, self.ticketmaster_api.get_seats(event.ticketmaster_id))
+        # Stable tickets are published by the pipeline once the confirmation scrape runs
+        return []
 
-        # Compare and keep only matching tickets
-        first_scrape = self._temp_inventory[event_key]['data']
-        stable_tickets = self.compare_scrapes(first_scrape, second_scrape)
+    def double_check_stage(self, event: Event) -> Optional[str]:
+        """Return 'first' if a double-check event needs its first scrape, else None."""
+        if not event.ticketmaster_id:
+            logger.error(f"Missing Ticketmaster ID for event: {event.event_name}")
+            return None
 
-        # Mark event as completed first scrape
-        with self.app.app_context():
-            event.first_scrape_completed = True
-            db.session.commit()
+        if event.id in self._pending_double_checks:
+            return None  # Confirmation already scheduled
 
-        # Clean up temporary storage
-        self._temp_inventory[event_key]['processed'] = True
+        return 'first'
 
-        # Process the stable tickets
-        return self.process_seats(event, stable_tickets)
+    def record_first_scrape(self, event: Event, first_scrape: ProviderSeats):
+        """Persist the first scrape of a double-check event and schedule its confirmation."""
+        self.double_check.record_first_scrape(event, first_scrape)
 
-    def compare_scrapes(self, first_scrape: List[Dict], second_scrape: List[Dict]) -> List[Dict]:
+    def compare_scrapes(self, first_scrape: ProviderSeats, second_scrape: ProviderSeats) -> ProviderSeats:
         """Compare two scrapes and return only matching tickets."""
-        # Create sets of ticket identifiers for comparison
-        def create_ticket_id(ticket):
-            return f"{ticket['section']}_{ticket['row']}_{ticket['seats']}_{ticket['price']}"
+        first_set = {ticket_key(ticket) for ticket in first_scrape}
 
-        first_set = {create_ticket_id(ticket) for ticket in first_scrape}
-        second_set = {create_ticket_id(ticket) for ticket in second_scrape}
-
-        # Keep only tickets that appear in both scrapes
-        stable_ids = first_set.intersection(second_set)
-
-        # Return the full ticket data for stable tickets
+        # Return the full ticket data for tickets that appear in both scrapes
         return [
             ticket for ticket in second_scrape
-            if create_ticket_id(ticket) in stable_ids
+            if ticket_key(ticket) in first_set
         ]
 
-    def process_ticketmaster_event(self, event: Event) -> List[Dict]:
+    def process_ticketmaster_event(self, event: Event) -> ListingRows:
         """Process a regular Ticketmaster event."""
         if not event.ticketmaster_id:
             logger.error(f"Missing Ticketmaster ID for event: {event.event_name}")
@@ -229,22 +218,14 @@ class EventScraper:
         seats_data = self.ticketmaster_api.get_seats(event.ticketmaster_id)
         return self.process_seats(event, seats_data)
 
-    def process_todaytix_event(self, event: Event) -> List[Dict]:
+    def process_todaytix_event(self, event: Event) -> ListingRows:
         """Process a TodayTix event."""
         # Existing TodayTix processing logic
         if not event.todaytix_event_id or not event.todaytix_show_id:
             logger.error(f"Missing TodayTix IDs for event: {event.event_name}")
             return []
 
-        try:
-            rules = {}
-            for rule in event.rules:
-                rules[rule.rule_type] = rule.keyword
-        except Exception as e:
-            logger.error(f"Error fetching rules for event {event.event_name}: {str(e)}")
-            rules = {}
-
-        excluded_seats = VenueMapping.get_excluded_seats(event.event_name, event.venue_name)
+        rules, excluded_seats = self.todaytix_filters(event)
 
         seats_data = self.todaytix_api.get_seats(
             int(event.todaytix_show_id),
@@ -254,100 +235,289 @@ class EventScraper:
         )
         return self.process_seats(event, seats_data)
 
+    def todaytix_filters(self, event: Event):
+        """Return the pattern rules and excluded seats for a TodayTix event from the run snapshot."""
+        return dict(event.rules), self.run_snapshot.excluded_seats(event)
+
+    def _iter_threaded_results(self, events: List[Event]) -> Iterator[Tuple[Event, Optional[ListingRows]]]:
+        """Process events on a thread pool, yielding (event, seats) as each one completes; seats is None on failure."""
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
+            self._executor = executor
+            future_to_event = {
+                executor.submit(self.process_event_with_context, event): event
+                for event in events
+            }
+
+            for future in futures.as_completed(future_to_event):
+                if self.should_stop():
+                    logger.info("Stop requested, terminating scraper")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return
+
+                # Drop the finished future so its rows can be freed once written
+                event = future_to_event.pop(future)
+                try:
+                    seats = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing event {event.event_name}: {str(e)}")
+                    seats = None
+                yield event, seats
+
+    def iter_results(self, events: List[Event]) -> Iterator[Tuple[Event, Optional[ListingRows]]]:
+        """Scrape events with the configured engine, yielding (event, rows) as each one completes.
+
+        rows is None for an event whose scrape failed, as opposed to one with no listings.
+        """
+        self._pending_double_checks = self.double_check.pending_event_ids()
+        if self.engine == 'async':
+            return AsyncScrapeEngine(self, self.max_concurrent).iter_results(events)
+        return self._iter_threaded_results(events)
+
+    def publish_results(self, output_file: str) -> bool:
+        """Write the delta against the previous run and upload the full file, or the delta when the store takes them.
+
+        Returns False only when an upload was attempted and failed.
+        """
+        success = True
+        delta_file = None
+        delta = None
+        try:
+            delta = self.delta_tracker.compute(output_file)
+            if delta is not None:
+                delta_file = self.delta_tracker.write_delta_csv(
+                    output_file, delta, f"{os.path.splitext(output_file)[0]}_delta.csv"
+                )
+                logger.info(f"Inventory delta: {delta.to_dict()} -> {delta_file}")
+        except Exception as e:
+            logger.error(f"Error computing inventory delta: {str(e)}")
+            delta = None
+
+        # Upload the file if auto_upload is enabled
+        if self.auto_upload:
+            full = (
+                not self.delta_uploads
+                or delta is None
+                or self.delta_tracker.full_upload_due(self.full_upload_every)
+            )
+            if not full and delta.is_empty:
+                logger.info("No inventory changes since last run, skipping delta upload")
+                self.delta_tracker.record_upload(full=False, success=True)
+            else:
+                upload_service = UploadService(
+                    current_app.config['STORE_API_BASE_URL'],
+                    current_app.config['STORE_API_KEY'],
+                    current_app.config['COMPANY_ID']
+                )
+                upload_file = output_file if full else delta_file
+                logger.info(f"Uploading {'full snapshot' if full else 'delta'}: {upload_file}")
+                success, message = upload_service.upload_csv(upload_file)
+                if success:
+                    logger.info(f"File uploaded successfully: {message}")
+                else:
+                    logger.error(f"File upload failed: {message}")
+                self.delta_tracker.record_upload(full=full, success=success)
+        else:
+            self.delta_tracker.mark_out_of_sync()
+
+        self.delta_tracker.commit(output_file)
+        return success
+
+    def record_history(self, output_file: str, run_started: datetime, skipped_event_ids):
+        """Add the run's scraped listings to the Parquet price history, if enabled."""
+        if self.history is None:
+            return
+        try:
+            providers = {event.event_id: event.website for event in self.run_snapshot.events}
+            self.history.record_run(output_file, run_started, providers, exclude_event_ids=skipped_event_ids)
+            self.history.maintain()
+        except Exception as e:
+            logger.error(f"Error recording price history: {str(e)}")
+
+    def _mark_scraped(self, event_ids: List[int], scraped_at: datetime):
+        """Record when events were scraped so the tier schedule can skip them until due."""
+        for i in range(0, len(event_ids), 500):
+            Event.query.filter(Event.id.in_(event_ids[i:i + 500])).update(
+                {'last_scraped_at': scraped_at}, synchronize_session=False
+            )
+        db.session.commit()
+
     def run(self, job: ScraperJob):
         """Run the scraper with job tracking and concurrent processing."""
+        started = time.monotonic()
+        result = 'failed'
+        try:
+            if job.profile:
+                success, output_file = self._run_profiled(job)
+            else:
+                success, output_file = self._run(job)
+            if success:
+                result = 'completed'
+            elif self.should_stop():
+                result = 'stopped'
+            return success, output_file
+        finally:
+            run_seconds.observe(time.monotonic() - started, result=result)
+            runs_total.inc(result=result)
+            last_run_timestamp.set(time.time(), result=result)
+
+    def _run_profiled(self, job: ScraperJob):
+        """Run once under the sampling profiler and save the profile next to the output."""
+        # One run per request: reset the flag before the run can fail or be resumed
+        job.profile = False
+        db.session.commit()
+
+        run_started = datetime.now()
+        with SamplingProfiler(self.profile_interval) as profiler:
+            success, output_file = self._run(job)
+
+        if output_file:
+            name = os.path.basename(output_file).replace('tickets_', 'profile_', 1).replace('.csv', '.json')
+        else:
+            name = f"profile_{run_started.strftime('%Y%m%d_%H%M%S')}.json"
+        try:
+            profiler.save(os.path.join(self.output_dir, name))
+        except Exception as e:
+            logger.error(f"Error saving profile: {str(e)}")
+        return success, output_file
+
+    def _run(self, job: ScraperJob):
+        self.cancel_token.reset()
+        cancellation_registry.register(job.id, self.cancel_token)
+        watcher = JobStatusWatcher(self.app, job.id, self.cancel_token, self.stop_poll_interval)
+        watcher.start()
         try:
-            self._stop_requested = False
             logger.info("Starting scraper run")
             logger.info(f"Using max concurrent requests: {self.max_concurrent}")
+            logger.info(f"Using {self.engine} engine")
             logger.info(f"Auto upload enabled: {self.auto_upload}")
             output_file = None
 
-            todaytix_events = Event.query.filter(
-                Event.todaytix_event_id.isnot(None),
-                Event.todaytix_show_id.isnot(None),
-                Event.website == 'TodayTix'
-            ).all()
-
-            ticketmaster_events = Event.query.filter(
-                Event.ticketmaster_id.isnot(None),
-                Event.website == 'TicketMaster'
-            ).all()
-
-            all_events = todaytix_events + ticketmaster_events
+            # Workers only read this snapshot, never the session, so progress
+            # commits on this thread cannot expire what they are reading
+            self.run_snapshot = RunSnapshot.load()
+            all_events = self.run_snapshot.events
 
             if not all_events:
                 logger.warning("No events found with required IDs")
                 return False, None
 
-            all_seats_data = []
-            processed_events = 0
-
-            # Process events concurrently
-            with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
-                self._executor = executor
-                future_to_event = {
-                    executor.submit(self.process_event_with_context, event): event
-                    for event in all_events
-                }
+            checkpoint = RunCheckpoint(os.path.join(self.output_dir, 'state'))
+            resumed = checkpoint.load(job.id, timedelta(minutes=self.checkpoint_max_age_minutes))
+            if resumed:
+                # Finish the interrupted run: same due events, same output file
+                run_started = resumed.run_started
+                timestamp = resumed.timestamp
+                skipped_event_ids = set(resumed.skipped_event_ids)
+                pending_ids = resumed.pending_ids
+                due_count = len(resumed.due_ids)
+                due_events = [e for e in all_events if e.id in pending_ids]
+                failed_ids = set(resumed.failed_ids)
+                scraped_ids = list(resumed.done_ids - failed_ids)
+                job.events_processed = len(resumed.done_ids)
+                job.total_tickets_found = resumed.row_count
+                db.session.commit()
+                writer = checkpoint.resume(resumed, self.output_dir)
+                logger.info(f"Resuming run started {run_started}: {len(resumed.done_ids)} of {due_count} events already done")
+            else:
+                # Only events whose urgency tier says they are due get scraped this run
+                run_started = datetime.now()
+                timestamp = run_started.strftime('%Y%m%d_%H%M%S')
+                slack_minutes = (job.interval_minutes or 0) / 2
+                due_events = [e for e in all_events if self.scrape_tiers.is_due(e, run_started, slack_minutes)]
+                skipped_event_ids = {e.event_id for e in all_events} - {e.event_id for e in due_events}
+                due_count = len(due_events)
+                failed_ids = set()
+                scraped_ids = []
+                writer = checkpoint.start(job.id, run_started, timestamp, [e.id for e in due_events],
+                                          skipped_event_ids, self.output_dir)
+                logger.info(f"{len(due_events)} of {len(all_events)} events due for scraping")
+
+            progress = ProgressReporter(job, due_count, self.progress_flush_events, self.progress_flush_seconds,
+                                        on_flush=lambda: checkpoint.sync(writer))
+
+            # Double-checked events use their confirmed rows instead of a fresh scrape
+            confirmed_ids = self.double_check.confirmed_event_ids()
+            confirmed_events = [e for e in due_events if e.id in confirmed_ids]
+            due_events = [e for e in due_events if e.id not in confirmed_ids]
+
+            if self.distributed:
+                completed_events = DistributedRun(
+                    self, job,
+                    batch_size=self.app.config.get('WORK_QUEUE_BATCH_SIZE', 25),
+                    lease_seconds=self.app.config.get('WORK_QUEUE_LEASE_SECONDS', 120),
+                    poll_seconds=self.app.config.get('WORK_QUEUE_POLL_SECONDS', 2.0)
+                ).iter_results(due_events)
+            else:
+                completed_events = self.iter_results(due_events)
+            completed_events = itertools.chain(self.double_check.iter_confirmed(confirmed_events), completed_events)
+
+            # Rows are streamed to the checkpointed partial file as events complete
+            try:
+                for event, seats_data in completed_events:
+                    if seats_data is None:
+                        # Not "no inventory": keep its previous listings and leave it due
+                        logger.warning(f"Scrape of {event.event_name} failed, keeping its previous listings")
+                        checkpoint.record(event.id, writer, failed=True)
+                        failed_ids.add(event.id)
+                        progress.record(0)
+                        continue
+
+                    if seats_data:
+                        writer.write_rows(seats_data)
+                        logger.info(f"Found {len(seats_data)} seats for event: {event.event_name}")
+
+                    checkpoint.record(event.id, writer)
+                    scraped_ids.append(event.id)
+                    progress.record(len(seats_data))
+                    provider = event.website.lower()
+                    listings_per_event.observe(len(seats_data), provider=provider)
+                    events_scraped_total.inc(provider=provider)
+
+                # Whatever ended the loop, finished or stopped, the UI gets the final counts
+                progress.flush()
+            except BaseException:
+                # Keep the partial output so the next run resumes it
+                writer.detach()
+                checkpoint.close()
+                raise
 
-                for future in futures.as_completed(future_to_event):
-                    if self.should_stop():
-                        logger.info("Stop requested, terminating scraper")
-                        return False, None
+            if self.should_stop():
+                logger.info("Stop requested, terminating scraper")
+                # The checkpoint removes the partial file unless a newer run has taken it over
+                writer.detach()
+                checkpoint.discard()
+                return False, None
 
-                    event = future_to_event[future]
-                    try:
-                        seats_data = future.result()
-                        if seats_data:
-                            all_seats_data.extend(seats_data)
-                            job.total_tickets_found += len(seats_data)
-                            logger.info(f"Found {len(seats_data)} seats for event: {event.event_name}")
+            self._mark_scraped(scraped_ids, run_started)
 
-                        processed_events += 1
-                        job.events_processed = processed_events
-                        db.session.commit()
+            # Keep listings of events that were not due or failed, so every output is a complete snapshot.
+            # Double-check events still being confirmed wrote no rows; keep what a confirmation published for them.
+            carried_event_ids = skipped_event_ids | {
+                e.event_id for e in all_events
+                if e.id in failed_ids or (e.website == 'TicketMaster' and e.double_check and not e.first_scrape_completed)
+            }
+            with baseline_lock:
+                writer.write_rows(self.delta_tracker.carried_rows(carried_event_ids))
 
-                        progress = (processed_events / len(all_events)) * 100
-                        logger.info(f"Progress: {progress:.1f}% ({processed_events}/{len(all_events)} events)")
+                if not writer.row_count:
+                    logger.warning("No data collected")
+                    writer.detach()
+                    checkpoint.discard()
+                    return False, None
 
-                    except Exception as e:
-                        logger.error(f"Error processing event {event.event_name}: {str(e)}")
+                output_file = writer.publish(os.path.join(self.output_dir, f'tickets_{timestamp}.csv'))
+                checkpoint.discard()
+                self.double_check.clear_confirmed(e.id for e in confirmed_events)
 
-            if self.should_stop():
-                logger.info("Stop requested, terminating scraper")
-                return False, None
+                self.record_history(output_file, run_started, carried_event_ids)
 
-            if all_seats_data:
-                # Save directly as CSV instead of Excel
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                output_file = os.path.join(self.output_dir, f'tickets_{timestamp}.csv')
-
-                # Save as CSV without BOM
-                output_df = pd.DataFrame(all_seats_data)
-                output_df.to_csv(output_file, index=False, encoding='utf-8')
-                logger.info(f"Saved {len(output_df)} rows to {output_file}")
-
-                # Upload the file if auto_upload is enabled
-                if self.auto_upload:
-                    upload_service = UploadService(
-                        current_app.config['STORE_API_BASE_URL'],
-                        current_app.config['STORE_API_KEY'],
-                        current_app.config['COMPANY_ID']
-                    )
-                    success, message = upload_service.upload_csv(output_file)
-                    if success:
-                        logger.info(f"File uploaded successfully: {message}")
-                    else:
-                        logger.error(f"File upload failed: {message}")
-
-                return True, output_file
-            else:
-                logger.warning("No data collected")
-                return False, None
+                self.publish_results(output_file)
+            return True, output_file
 
         except Exception as e:
             logger.error(f"Error running scraper: {str(e)}")
             return False, None
         finally:
+            watcher.stop()
+            cancellation_registry.unregister(job.id, self.cancel_token)
             self._executor = None
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import selectinload
+from ..models.database import Event, VenueMapping
+
+_NO_EXCLUSIONS = MappingProxyType({})
+
+@dataclass(frozen=True)
+class EventSnapshot:
+    """Read-only copy of the Event fields the scraper uses, safe to share across worker threads.
+
+    Attribute names match Event so the parsing code accepts either.
+    """
+    id: int
+    website: str
+    event_id: str
+    event_name: str
+    venue_name: Optional[str]
+    event_date: date
+    event_time: str
+    ticketmaster_id: Optional[str]
+    todaytix_event_id: Optional[str]
+    todaytix_show_id: Optional[str]
+    markup: float
+    stock_type: Optional[str]
+    in_hand_date: Optional[date]
+    in_hand: Optional[str]
+    double_check: bool
+    first_scrape_completed: bool
+    last_scraped_at: Optional[datetime]
+    rules: Tuple[Tuple[str, str], ...] = ()  # (rule_type, keyword) pairs
+
+    @classmethod
+    def from_event(cls, event: Event) -> 'EventSnapshot':
+        return cls(
+            id=event.id,
+            website=event.website,
+            event_id=event.event_id,
+            event_name=event.event_name,
+            venue_name=event.venue_name,
+            event_date=event.event_date,
+            event_time=event.event_time,
+            ticketmaster_id=event.ticketmaster_id,
+            todaytix_event_id=event.todaytix_event_id,
+            todaytix_show_id=event.todaytix_show_id,
+            markup=event.markup,
+            stock_type=event.stock_type,
+            in_hand_date=event.in_hand_date,
+            in_hand=event.in_hand,
+            double_check=bool(event.double_check),
+            first_scrape_completed=bool(event.first_scrape_completed),
+            last_scraped_at=event.last_scraped_at,
+            rules=tuple((rule.rule_type, rule.keyword) for rule in event.rules)
+        )
+
+class RunSnapshot:
+    """Everything a scraper run reads from the database, loaded up front in three queries.
+
+    Workers only read from the snapshot, so they never share the session or
+    issue per-event queries.
+    """
+
+    def __init__(self, events: Tuple[EventSnapshot, ...],
+                 excluded_seats: Dict[Tuple[str, str], Dict[str, FrozenSet[str]]]):
+        self.events = events
+        self._excluded_seats = MappingProxyType({
+            venue: MappingProxyType(sections) for venue, sections in excluded_seats.items()
+        })
+
+    @classmethod
+    def load(cls, event_ids: Optional[Iterable[int]] = None) -> 'RunSnapshot':
+        """Load scrapable events, or only event_ids, with their rules and the active venue mappings."""
+        query = Event.query.options(selectinload(Event.rules))
+        if event_ids is not None:
+            query = query.filter(Event.id.in_(list(event_ids)))
+        events = query.filter(or_(
+            and_(
+                Event.website == 'TodayTix',
+                Event.todaytix_event_id.isnot(None),
+                Event.todaytix_show_id.isnot(None)
+            ),
+            and_(
+                Event.website == 'TicketMaster',
+                Event.ticketmaster_id.isnot(None)
+            )
+        )).all()
+
+        # TodayTix events first, as the scraper has always submitted them
+        snapshots = [EventSnapshot.from_event(e) for e in events if e.website == 'TodayTix']
+        snapshots += [EventSnapshot.from_event(e) for e in events if e.website == 'TicketMaster']
+        return cls(tuple(snapshots), VenueMapping.excluded_seats_index())
+
+    def excluded_seats(self, event: EventSnapshot) -> Mapping[str, FrozenSet[str]]:
+        """Excluded seats keyed by 'section_row' for the event's name and venue"""
+        return self._excluded_seats.get((event.event_name, event.venue_name), _NO_EXCLUSIONS)
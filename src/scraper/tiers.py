@@ -0,0 +1,68 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import List, Optional
+from ..models.database import Event
+
+logger = logging.getLogger(__name__)
+
+# Events within 48h every run, within two weeks hourly, anything later every 6 hours
+DEFAULT_SCRAPE_TIERS = '48:0,336:60,*:360'
+
+@dataclass(frozen=True)
+class ScrapeTier:
+    max_hours_ahead: Optional[float]  # None means no upper bound
+    interval_minutes: int
+
+    @property
+    def name(self) -> str:
+        bound = f'<={self.max_hours_ahead:g}h' if self.max_hours_ahead is not None else 'later'
+        return f'{bound} every {self.interval_minutes}m'
+
+def event_start(event: Event) -> datetime:
+    """Combine an event's date and free-text time, falling back to midnight"""
+    for fmt in ('%H:%M', '%H:%M:%S', '%I:%M %p', '%I:%M%p'):
+        try:
+            return datetime.combine(event.event_date, datetime.strptime(event.event_time.strip(), fmt).time())
+        except (AttributeError, ValueError):
+            continue
+    return datetime.combine(event.event_date, time())
+
+class ScrapeTierSchedule:
+    """Decide which events are due for scraping based on how soon they start"""
+
+    def __init__(self, tiers: List[ScrapeTier]):
+        bounded = sorted((t for t in tiers if t.max_hours_ahead is not None), key=lambda t: t.max_hours_ahead)
+        unbounded = [t for t in tiers if t.max_hours_ahead is None][:1]
+        self.tiers = bounded + (unbounded or [ScrapeTier(None, 0)])
+
+    @classmethod
+    def from_spec(cls, spec: str) -> 'ScrapeTierSchedule':
+        """Parse 'hours:minutes,...' where hours is the tier's upper bound ('*' for none)"""
+        tiers = []
+        for part in (spec or '').split(','):
+            if not part.strip():
+                continue
+            try:
+                hours, minutes = part.split(':')
+                tiers.append(ScrapeTier(
+                    None if hours.strip() == '*' else float(hours),
+                    int(minutes)
+                ))
+            except ValueError:
+                logger.error(f"Ignoring invalid scrape tier: {part}")
+        return cls(tiers)
+
+    def tier_for(self, event: Event, now: datetime) -> ScrapeTier:
+        hours_ahead = (event_start(event) - now).total_seconds() / 3600
+        for tier in self.tiers:
+            if tier.max_hours_ahead is None or hours_ahead <= tier.max_hours_ahead:
+                return tier
+        return self.tiers[-1]
+
+    def is_due(self, event: Event, now: datetime, slack_minutes: float = 0) -> bool:
+        """An event is due if it was never scraped or its tier interval (less slack) has passed"""
+        if event.last_scraped_at is None:
+            return True
+        interval = self.tier_for(event, now).interval_minutes
+        return now - event.last_scraped_at >= timedelta(minutes=max(0, interval - slack_minutes))
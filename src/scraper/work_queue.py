@@ -0,0 +1,292 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import and_, func, or_
+from ..models.database import ScrapeBatch, ScrapeRun, db
+from .listing import ListingRows
+
+logger = logging.getLogger(__name__)
+
+def node_name() -> str:
+    """Identify this process as a lease owner"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+@dataclass(frozen=True)
+class ClaimedBatch:
+    id: int
+    run_id: int
+    job_id: int
+    event_ids: Tuple[int, ...]
+
+class WorkQueue:
+    """Lease-based queue of event batches shared by every scraper node through the database.
+
+    Claims, heartbeats and completions are conditional UPDATEs checked by
+    rowcount, so two nodes can never both own a batch on SQLite or on a server
+    RDBMS. A batch whose lease runs out without a heartbeat goes back to any
+    node that asks, up to max_attempts times.
+    """
+
+    CLAIMABLE_RUN_STATUS = 'open'
+
+    def __init__(self, app, owner: Optional[str] = None, lease_seconds: int = 120, max_attempts: int = 3):
+        self.app = app
+        self.owner = owner or node_name()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def _claimable(self, now: datetime):
+        return and_(
+            ScrapeBatch.attempts < self.max_attempts,
+            or_(
+                ScrapeBatch.status == 'pending',
+                and_(ScrapeBatch.status == 'leased', ScrapeBatch.lease_expires_at < now)
+            )
+        )
+
+    def create_run(self, job_id: int, event_ids: List[int], batch_size: int) -> int:
+        """Split event_ids into batches on a new open run; older open runs of the job are abandoned."""
+        batch_size = max(1, batch_size)
+        with self.app.app_context():
+            ScrapeRun.query.filter_by(job_id=job_id, status='open').update(
+                {'status': 'abandoned', 'closed_at': datetime.now()}
+            )
+            run = ScrapeRun(job_id=job_id, status='open')
+            db.session.add(run)
+            db.session.flush()
+            for i in range(0, len(event_ids), batch_size):
+                db.session.add(ScrapeBatch(
+                    run_id=run.id,
+                    event_ids=','.join(str(event_id) for event_id in event_ids[i:i + batch_size]),
+                    status='pending',
+                    attempts=0
+                ))
+                run.total_batches += 1
+            db.session.commit()
+            logger.info(f"Queued {len(event_ids)} events in {run.total_batches} batches for run {run.id}")
+            return run.id
+
+    def claim(self, run_id: Optional[int] = None) -> Optional[ClaimedBatch]:
+        """Lease the oldest claimable batch, from run_id or from any open run."""
+        with self.app.app_context():
+            now = datetime.now()
+            candidates = db.session.query(ScrapeBatch.id, ScrapeBatch.run_id, ScrapeRun.job_id, ScrapeBatch.event_ids).join(
+                ScrapeRun, ScrapeRun.id == ScrapeBatch.run_id
+            ).filter(
+                ScrapeRun.status == self.CLAIMABLE_RUN_STATUS,
+                self._claimable(now)
+            )
+            if run_id is not None:
+                candidates = candidates.filter(ScrapeBatch.run_id == run_id)
+
+            for batch_id, batch_run_id, job_id, event_ids in candidates.order_by(ScrapeBatch.id).limit(5).all():
+                claimed = ScrapeBatch.query.filter(ScrapeBatch.id == batch_id, self._claimable(now)).update({
+                    'status': 'leased',
+                    'lease_owner': self.owner,
+                    'lease_expires_at': now + timedelta(seconds=self.lease_seconds),
+                    'attempts': ScrapeBatch.attempts + 1
+                }, synchronize_session=False)
+                db.session.commit()
+                if claimed:
+                    return ClaimedBatch(batch_id, batch_run_id, job_id, tuple(int(i) for i in event_ids.split(',') if i))
+            return None
+
+    def _update_owned(self, batch_id: int, values: Dict) -> bool:
+        with self.app.app_context():
+            updated = ScrapeBatch.query.filter_by(id=batch_id, status='leased', lease_owner=self.owner).update(
+                values, synchronize_session=False
+            )
+            db.session.commit()
+            return bool(updated)
+
+    def heartbeat(self, batch_id: int) -> bool:
+        """Extend the lease; False once the batch was reclaimed or its run closed."""
+        return self._update_owned(batch_id, {'lease_expires_at': datetime.now() + timedelta(seconds=self.lease_seconds)})
+
+    def complete(self, batch_id: int, results: List[Tuple[int, Optional[ListingRows]]]) -> bool:
+        """Store a batch's listings as [(event id, rows), ...], rows None for failed events; False if the lease was lost meanwhile."""
+        return self._update_owned(batch_id, {
+            'status': 'done',
+            # Positional rows in TICKET_CSV_COLUMNS order, written back as-is by the coordinator
+            'results': ScrapeBatch.encode_results([
+                (event_id, None if rows is None else list(rows)) for event_id, rows in results
+            ]),
+            'ticket_count': sum(len(rows) for _, rows in results if rows is not None),
+            'completed_at': datetime.now()
+        })
+
+    def release(self, batch_id: int) -> bool:
+        """Hand a batch back without counting the attempt, e.g. on shutdown."""
+        return self._update_owned(batch_id, {
+            'status': 'pending',
+            'lease_owner': None,
+            'lease_expires_at': None,
+            'attempts': ScrapeBatch.attempts - 1
+        })
+
+    def completed_batches(self, run_id: int, exclude) -> Iterator[Tuple[int, List]]:
+        """Yield (batch id, results) for finished batches of the run not in exclude, one at a time."""
+        with self.app.app_context():
+            batch_ids = [row[0] for row in db.session.query(ScrapeBatch.id).filter(
+                ScrapeBatch.run_id == run_id,
+                ScrapeBatch.status == 'done'
+            ).all() if row[0] not in exclude]
+
+        for batch_id in batch_ids:
+            with self.app.app_context():
+                payload = db.session.query(ScrapeBatch.results).filter_by(id=batch_id).scalar()
+            yield batch_id, ScrapeBatch.decode_results(payload)
+
+    def failed_batches(self, run_id: int, exclude) -> List[Tuple[int, Tuple[int, ...]]]:
+        """(batch id, event ids) of batches of the run that ran out of attempts, not in exclude"""
+        with self.app.app_context():
+            rows = db.session.query(ScrapeBatch.id, ScrapeBatch.event_ids).filter(
+                ScrapeBatch.run_id == run_id,
+                ScrapeBatch.status == 'failed'
+            ).all()
+        return [
+            (batch_id, tuple(int(i) for i in event_ids.split(',') if i))
+            for batch_id, event_ids in rows if batch_id not in exclude
+        ]
+
+    def is_finished(self, run_id: int) -> bool:
+        """True when no batch of the run is pending or leased; batches out of attempts are failed."""
+        with self.app.app_context():
+            now = datetime.now()
+            exhausted = ScrapeBatch.query.filter(
+                ScrapeBatch.run_id == run_id,
+                ScrapeBatch.attempts >= self.max_attempts,
+                or_(
+                    ScrapeBatch.status == 'pending',
+                    and_(ScrapeBatch.status == 'leased', ScrapeBatch.lease_expires_at < now)
+                )
+            ).update({'status': 'failed'}, synchronize_session=False)
+            db.session.commit()
+            if exhausted:
+                logger.error(f"{exhausted} batches of run {run_id} failed after {self.max_attempts} attempts")
+
+            outstanding = db.session.query(func.count(ScrapeBatch.id)).filter(
+                ScrapeBatch.run_id == run_id,
+                ScrapeBatch.status.in_(('pending', 'leased'))
+            ).scalar()
+            return outstanding == 0
+
+    def close_run(self, run_id: int, status: str):
+        """Close the run so no node claims from it again and drop the merged payloads."""
+        with self.app.app_context():
+            ScrapeRun.query.filter_by(id=run_id).update({'status': status, 'closed_at': datetime.now()})
+            ScrapeBatch.query.filter(
+                ScrapeBatch.run_id == run_id,
+                ScrapeBatch.status.in_(('pending', 'leased'))
+            ).update({'status': 'cancelled'}, synchronize_session=False)
+            ScrapeBatch.query.filter_by(run_id=run_id).update({'results': None}, synchronize_session=False)
+            db.session.commit()
+
+class LeaseHeartbeat:
+    """Keep a batch lease alive from a background thread while it is being scraped"""
+
+    def __init__(self, queue: WorkQueue, batch_id: int, on_lost: Optional[Callable[[], None]] = None):
+        self.queue = queue
+        self.batch_id = batch_id
+        self.on_lost = on_lost
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'lease-heartbeat-{batch_id}', daemon=True)
+
+    def _run(self):
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            try:
+                alive = self.queue.heartbeat(self.batch_id)
+            except Exception as e:
+                logger.error(f"Heartbeat for batch {self.batch_id} failed: {str(e)}")
+                continue
+            if not alive:
+                logger.warning(f"Lost lease on batch {self.batch_id}")
+                self.lost = True
+                if self.on_lost:
+                    self.on_lost()
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+class DistributedRun:
+    """Coordinate one scraper run through the work queue.
+
+    The coordinating node queues the due events in batches, scrapes the
+    events only it can handle while other nodes start on the queue, then works
+    on the batches itself like any other node while collecting those finished
+    elsewhere. Batches that ran out of attempts are scraped locally. Results
+    are yielded per event in the same shape as the local engines, so the run
+    loop streams them into one output file.
+    """
+
+    def __init__(self, scraper, job, batch_size: int = 25, lease_seconds: int = 120, poll_seconds: float = 2.0):
+        self.scraper = scraper
+        self.job = job
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.queue = WorkQueue(scraper.app, lease_seconds=lease_seconds)
+
+    @staticmethod
+    def runs_locally(event) -> bool:
+        # First scrapes of double-check events schedule their confirmation on this process's scheduler
+        return event.website == 'TicketMaster' and event.double_check and not event.first_scrape_completed
+
+    def iter_results(self, events: List) -> Iterator[Tuple[object, Optional[ListingRows]]]:
+        scraper = self.scraper
+        local_events = [e for e in events if self.runs_locally(e)]
+        queued = {e.id: e for e in events if not self.runs_locally(e)}
+
+        run_id = self.queue.create_run(self.job.id, list(queued), self.batch_size)
+        merged = set()
+        finished = False
+        try:
+            yield from scraper.iter_results(local_events)
+
+            while not scraper.should_stop():
+                claimed = self.queue.claim(run_id)
+                if claimed:
+                    batch_events = [queued[event_id] for event_id in claimed.event_ids]
+                    with LeaseHeartbeat(self.queue, claimed.id):
+                        results = list(scraper.iter_results(batch_events))
+                    if scraper.should_stop():
+                        self.queue.release(claimed.id)
+                        break
+                    if self.queue.complete(claimed.id, [(event.id, rows) for event, rows in results]):
+                        merged.add(claimed.id)
+                        yield from results
+                    continue
+
+                # Check completion before collecting, so batches finished in between are not missed
+                finished = self.queue.is_finished(run_id)
+                collected = False
+                for batch_id, results in self.queue.completed_batches(run_id, merged):
+                    merged.add(batch_id)
+                    collected = True
+                    for event_id, rows in results:
+                        yield queued[event_id], rows
+                for batch_id, event_ids in self.queue.failed_batches(run_id, merged):
+                    # Rather than dropping its events from the output
+                    merged.add(batch_id)
+                    collected = True
+                    logger.warning(f"Scraping the {len(event_ids)} events of failed batch {batch_id} locally")
+                    yield from scraper.iter_results([queued[event_id] for event_id in event_ids])
+                if finished:
+                    break
+                if not collected:
+                    scraper.cancel_token.wait(self.poll_seconds)
+        finally:
+            self.queue.close_run(run_id, 'completed' if finished else 'cancelled')
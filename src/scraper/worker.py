@@ -0,0 +1,116 @@
+"""Headless scraper node for distributed runs.
+
+Claims batches from the shared work queue and scrapes them, without the web
+UI or scheduler. Point it at the same DATABASE_URL as the web app:
+
+    python -m src.scraper.worker --engine async --concurrency 50
+"""
+import argparse
+import logging
+import signal
+import threading
+from typing import Optional
+from ..models.database import ScraperJob, db
+from ..ticketmaster.api import TicketmasterAPI
+from ..todaytix.api import TodayTixAPI
+from .scraper import EventScraper
+from .snapshot import RunSnapshot
+from .work_queue import ClaimedBatch, LeaseHeartbeat, WorkQueue
+
+logger = logging.getLogger(__name__)
+
+class QueueWorker:
+    """Claim and scrape work-queue batches until stopped"""
+
+    def __init__(self, app, engine: Optional[str] = None, concurrency: Optional[int] = None):
+        self.app = app
+        self.engine = engine
+        self.concurrency = concurrency
+        self.poll_seconds = app.config.get('WORK_QUEUE_POLL_SECONDS', 2.0)
+        self.queue = WorkQueue(app, lease_seconds=app.config.get('WORK_QUEUE_LEASE_SECONDS', 120))
+        self._stop = threading.Event()
+        self._scraper = None
+        self._todaytix_api = None
+        self._ticketmaster_api = None
+
+    def stop(self):
+        self._stop.set()
+        scraper = self._scraper
+        if scraper:
+            scraper.request_stop()
+
+    def run_forever(self):
+        logger.info(f"Worker {self.queue.owner} waiting for batches")
+        while not self._stop.is_set():
+            try:
+                claimed = self.queue.claim()
+            except Exception as e:
+                logger.error(f"Error claiming a batch: {str(e)}")
+                claimed = None
+            if claimed is None:
+                self._stop.wait(self.poll_seconds)
+                continue
+            self.process(claimed)
+        if self._ticketmaster_api is not None:
+            self._ticketmaster_api.close()
+        logger.info(f"Worker {self.queue.owner} stopped")
+
+    def _scraper_for(self, job: ScraperJob) -> EventScraper:
+        """The worker's scraper, rebuilt only when the job's engine or concurrency changes; call inside an app context"""
+        engine = self.engine or job.engine or 'threaded'
+        concurrency = self.concurrency or job.concurrent_requests
+        scraper = self._scraper
+        if scraper is None or (scraper.engine, scraper.max_concurrent) != (engine, concurrency):
+            # Provider clients and their connection pools last as long as the worker
+            if self._ticketmaster_api is None:
+                self._todaytix_api = TodayTixAPI()
+                self._ticketmaster_api = TicketmasterAPI()
+            scraper = self._scraper = EventScraper(
+                todaytix_api=self._todaytix_api,
+                ticketmaster_api=self._ticketmaster_api,
+                output_dir=self.app.config['OUTPUT_FILE_DIR'],
+                concurrent_requests=concurrency,
+                engine=engine
+            )
+        # A stop from a lost lease applies to that batch only
+        scraper.cancel_token.reset()
+        if self._stop.is_set():
+            scraper.request_stop()
+        return scraper
+
+    def process(self, claimed: ClaimedBatch):
+        with self.app.app_context():
+            try:
+                job = db.session.get(ScraperJob, claimed.job_id)
+                scraper = self._scraper_for(job)
+                scraper.run_snapshot = RunSnapshot.load(claimed.event_ids)
+                logger.info(f"Scraping batch {claimed.id} of run {claimed.run_id} ({len(scraper.run_snapshot.events)} events)")
+
+                with LeaseHeartbeat(self.queue, claimed.id, on_lost=scraper.request_stop) as heartbeat:
+                    results = [(event.id, rows) for event, rows in scraper.iter_results(scraper.run_snapshot.events)]
+
+                if self._stop.is_set():
+                    self.queue.release(claimed.id)
+                elif heartbeat.lost or not self.queue.complete(claimed.id, results):
+                    logger.warning(f"Discarding batch {claimed.id}, its lease was lost")
+                else:
+                    logger.info(f"Completed batch {claimed.id} ({sum(len(rows) for _, rows in results if rows)} tickets)")
+            except Exception as e:
+                # Leave the lease to expire so another node retries the batch
+                logger.error(f"Error processing batch {claimed.id}: {str(e)}")
+
+def main():
+    from ..app import create_worker_app
+
+    parser = argparse.ArgumentParser(description='Run a headless scraper node for distributed runs')
+    parser.add_argument('--engine', choices=EventScraper.ENGINES, help="Defaults to the job's engine")
+    parser.add_argument('--concurrency', type=int, help="Defaults to the job's concurrent requests")
+    args = parser.parse_args()
+
+    worker = QueueWorker(create_worker_app(), engine=args.engine, concurrency=args.concurrency)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: worker.stop())
+    worker.run_forever()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,359 @@
+import atexit
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..models.database import TicketmasterHeader
+from .metrics import Gauge, metrics
+from .write_behind import write_behind
+
+logger = logging.getLogger(__name__)
+
+# Same limits as TicketmasterHeader.active_after_failures and get_active_headers
+MAX_FAILURES = 3
+HEADER_LIFETIME = timedelta(hours=24)
+
+class PooledHeader:
+    """One Ticketmaster header held in memory with its health stats"""
+
+    def __init__(self, header_id: int, headers: Dict, created_at: Optional[datetime], failures: int = 0):
+        self.id = header_id
+        self.headers = headers
+        self.cookie = headers.get('Cookie', '')
+        self.created_at = created_at or datetime.now()
+        self.failures = failures or 0
+        self.success_rate = 1.0
+        self.in_flight = 0
+        self.uses = 0
+        self.last_used = None
+        # Order of last use within the pool, and which of its _Tier heap items is current
+        self.use_seq = 0
+        self.heap_version = 0
+        # Set by the header prober; without one, headers count as verified when added
+        self.verified = False
+        self.probe_blocked = False
+        self.probe_failures = 0
+        self.probe_successes = 0
+        self.probe_inconclusive = 0
+        self.next_probe_at = 0.0
+        self.probing = False
+
+    @property
+    def expired(self) -> bool:
+        return datetime.now() - self.created_at > HEADER_LIFETIME
+
+    @property
+    def dead(self) -> bool:
+        return self.failures >= MAX_FAILURES
+
+class _Tier:
+    """Headers of one health tier, with a heap ordered by (in_flight, use_seq) for acquire().
+
+    A header's heap item goes stale when its in_flight or last use changes,
+    or when it leaves the tier. Stale items are skipped when they reach the
+    top, and the heap is rebuilt once they outnumber the live ones.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, PooledHeader] = {}
+        self._heap: List[Tuple[int, int, int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def values(self) -> Iterable[PooledHeader]:
+        return self._entries.values()
+
+    def add(self, entry: PooledHeader):
+        self._entries[entry.id] = entry
+        self.push(entry)
+
+    def remove(self, entry: PooledHeader):
+        if self._entries.get(entry.id) is entry:
+            del self._entries[entry.id]
+
+    def push(self, entry: PooledHeader):
+        """Queue entry at its current position"""
+        entry.heap_version += 1
+        heapq.heappush(self._heap, (entry.in_flight, entry.use_seq, entry.heap_version, entry.id))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(e.in_flight, e.use_seq, e.heap_version, e.id) for e in self._entries.values()]
+            heapq.heapify(self._heap)
+
+    def first(self) -> Optional[PooledHeader]:
+        """Header with the fewest requests in flight, least recently used among equals"""
+        heap = self._heap
+        while heap:
+            _, _, version, header_id = heap[0]
+            entry = self._entries.get(header_id)
+            if entry is not None and entry.heap_version == version:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+class HeaderPool:
+    """Active Ticketmaster headers kept in memory so picking one costs no database round trip.
+
+    Headers sit in two tiers: healthy, and degraded once their rolling success
+    rate drops below degraded_below. acquire() takes the header with the
+    fewest requests in flight from the healthy tier (the degraded one only
+    when no healthy header is left), the least recently used among equals.
+    Each tier keeps its headers in a heap on that order, so acquire and
+    release cost O(log n) however busy the pool is. A header that reaches
+    MAX_FAILURES leaves the pool. Usage and failures go to
+    ticketmaster_headers through the write-behind buffer, never on the
+    request path; a reloader thread syncs the pool with the active rows every
+    reload_interval seconds to pick up headers stored elsewhere and drop
+    expired ones.
+
+    With require_probe set (see HeaderProber), new headers wait in an
+    unverified tier and reach acquire() once a probe has passed or
+    promote_after probes in a row were inconclusive, and a header whose probe
+    was blocked counts as degraded. disable_probing() releases every waiting
+    header.
+    """
+
+    def __init__(self, degraded_below: float = 0.5, reload_interval: float = 60.0, promote_after: int = 3):
+        self.degraded_below = degraded_below
+        self.reload_interval = reload_interval
+        self.promote_after = promote_after
+        self._healthy = _Tier()
+        self._degraded = _Tier()
+        self._unverified = _Tier()
+        # Acquired headers take use_seq from _uses; headers never used sort before them, in load order
+        self._uses = itertools.count()
+        self._added = itertools.count(-2 ** 62)
+        self.require_probe = False
+        self._by_cookie: Dict[str, PooledHeader] = {}
+        self._lock = threading.Lock()
+        self._app = None
+        self._reloader = None
+        self._stop_event = threading.Event()
+        self.loaded_at = 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._healthy) + len(self._degraded) + len(self._unverified)
+
+    def _tier(self, entry: PooledHeader) -> _Tier:
+        if not entry.verified:
+            return self._unverified
+        if entry.probe_blocked or entry.success_rate < self.degraded_below:
+            return self._degraded
+        return self._healthy
+
+    def _retier(self, entry: PooledHeader, tier: _Tier):
+        """Requeue entry after its stats changed, moving it out of tier if they now put it in another one"""
+        target = self._tier(entry)
+        if target is tier:
+            tier.push(entry)
+        else:
+            tier.remove(entry)
+            target.add(entry)
+
+    def _entries(self) -> List[PooledHeader]:
+        return list(self._healthy.values()) + list(self._degraded.values()) + list(self._unverified.values())
+
+    def _add(self, entry: PooledHeader):
+        if entry.dead or entry.expired or not entry.cookie:
+            return
+        previous = self._by_cookie.get(entry.cookie)
+        if previous is not None:
+            # Keep the live stats of a header already in the pool
+            if previous.id == entry.id:
+                return
+            self._discard(previous)
+        entry.verified = not self.require_probe
+        entry.use_seq = next(self._added)
+        self._by_cookie[entry.cookie] = entry
+        self._tier(entry).add(entry)
+
+    def _discard(self, entry: PooledHeader):
+        self._healthy.remove(entry)
+        self._degraded.remove(entry)
+        self._unverified.remove(entry)
+        if self._by_cookie.get(entry.cookie) is entry:
+            del self._by_cookie[entry.cookie]
+
+    def load(self, rows: List) -> int:
+        """Sync the pool with active TicketmasterHeader rows; call inside an app context"""
+        from flask import current_app
+
+        entries = [PooledHeader(row.id, row.headers_dict, row.created_at, row.failures) for row in rows]
+        with self._lock:
+            active_ids = {entry.id for entry in entries}
+            for entry in self._entries():
+                # Expired headers are pruned here rather than on the acquire path
+                if entry.id not in active_ids or entry.expired:
+                    self._discard(entry)
+            for entry in entries:
+                self._add(entry)
+            self.loaded_at = time.monotonic()
+            self._app = current_app._get_current_object()
+            count = len(self._healthy) + len(self._degraded) + len(self._unverified)
+        self._start_reloader()
+        return count
+
+    def add(self, row):
+        """Add a header row that was just stored"""
+        with self._lock:
+            self._add(PooledHeader(row.id, row.headers_dict, row.created_at, row.failures))
+
+    def acquire(self) -> Optional[PooledHeader]:
+        """Healthiest header with the fewest requests in flight, or None when the pool is empty"""
+        with self._lock:
+            for tier in (self._healthy, self._degraded):
+                entry = tier.first()
+                if entry is not None:
+                    break
+            else:
+                return None
+            entry.in_flight += 1
+            entry.uses += 1
+            entry.use_seq = next(self._uses)
+            entry.last_used = datetime.now()
+            tier.push(entry)
+        write_behind.update(TicketmasterHeader, entry.id, max={'last_used': entry.last_used})
+        return entry
+
+    def release(self, cookie: str, ok: Optional[bool]):
+        """Record how a request with this header went: True success, False failure, None no verdict (throttled)"""
+        with self._lock:
+            entry = self._by_cookie.get(cookie)
+            if entry is None:
+                return
+            tier = self._tier(entry)
+            entry.in_flight = max(0, entry.in_flight - 1)
+            if ok is None:
+                tier.push(entry)
+                return
+
+            entry.success_rate = 0.8 * entry.success_rate + (0.2 if ok else 0.0)
+            if ok:
+                self._retier(entry, tier)
+                return
+            entry.failures += 1
+            # Have the prober look at it again soon
+            entry.next_probe_at = 0.0
+            if entry.dead:
+                self._discard(entry)
+                logger.info(f"Header {entry.id} removed from the pool after {entry.failures} failures")
+            else:
+                self._retier(entry, tier)
+
+        write_behind.update(TicketmasterHeader, entry.id, add={'failures': 1}, set={'is_active': TicketmasterHeader.active_after_failures})
+
+    def due_for_probe(self, limit: int) -> List[PooledHeader]:
+        """Up to limit headers whose next probe is due, unverified ones first; they stay claimed until record_probe"""
+        now = time.monotonic()
+        with self._lock:
+            due = [entry for entry in self._entries() if not entry.probing and entry.next_probe_at <= now]
+            due.sort(key=lambda entry: (entry.verified, entry.next_probe_at))
+            due = due[:limit]
+            for entry in due:
+                entry.probing = True
+            return due
+
+    def record_probe(self, entry: PooledHeader, ok: Optional[bool], next_in: float, dead_after: int = 2):
+        """Apply a probe result: True passed, False blocked, None inconclusive (throttled or unreachable)"""
+        with self._lock:
+            entry.probing = False
+            entry.next_probe_at = time.monotonic() + next_in
+            if self._by_cookie.get(entry.cookie) is not entry:
+                return
+
+            tier = self._tier(entry)
+            if ok is None:
+                entry.probe_inconclusive += 1
+                if not entry.verified and entry.probe_inconclusive >= self.promote_after:
+                    # The probe target, not the header, is the likely problem
+                    entry.verified = True
+                    self._retier(entry, tier)
+                    logger.info(f"Header {entry.id} admitted after {entry.probe_inconclusive} inconclusive probes")
+                return
+
+            entry.verified = True
+            entry.probe_inconclusive = 0
+            if ok:
+                entry.probe_blocked = False
+                entry.probe_failures = 0
+                entry.probe_successes += 1
+                # A passed probe outweighs earlier request failures
+                entry.success_rate = max(entry.success_rate, self.degraded_below)
+                self._retier(entry, tier)
+                return
+            entry.probe_blocked = True
+            entry.probe_successes = 0
+            entry.probe_failures += 1
+            if entry.probe_failures < dead_after:
+                self._retier(entry, tier)
+                return
+            self._discard(entry)
+            logger.info(f"Header {entry.id} removed from the pool after {entry.probe_failures} blocked probes")
+
+        write_behind.update(TicketmasterHeader, entry.id, set={'is_active': False})
+
+    def disable_probing(self):
+        """Stop requiring probes and hand out the headers still waiting for one"""
+        with self._lock:
+            self.require_probe = False
+            for entry in list(self._unverified.values()):
+                entry.verified = True
+                self._retier(entry, self._unverified)
+
+    def _start_reloader(self):
+        with self._lock:
+            if self._reloader is not None and self._reloader.is_alive():
+                return
+            self._stop_event.clear()
+            self._reloader = threading.Thread(target=self._reload_loop, name='header-pool-reloader')
+            self._reloader.daemon = True
+            self._reloader.start()
+
+    def _reload_loop(self):
+        while not self._stop_event.wait(self.reload_interval):
+            self._reload()
+
+    def _reload(self):
+        try:
+            with self._app.app_context():
+                self.load(TicketmasterHeader.get_active_headers())
+        except Exception as e:
+            logger.error(f"Error reloading header pool: {str(e)}")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._reloader is not None:
+            self._reloader.join(timeout=10)
+            self._reloader = None
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            entries = self._entries()
+            return {
+                'healthy': len(self._healthy),
+                'degraded': len(self._degraded),
+                'unverified': len(self._unverified),
+                'in_flight': sum(entry.in_flight for entry in entries),
+                'pending_writes': len(write_behind)
+            }
+
+    def collect(self) -> List[Gauge]:
+        """Pooled headers per health state, for the metrics endpoint"""
+        pooled = Gauge('scraper_header_pool_headers', 'Ticketmaster headers in the in-memory pool', ('state',))
+        snapshot = self.snapshot()
+        pooled.set(snapshot['healthy'], state='healthy')
+        pooled.set(snapshot['degraded'], state='degraded')
+        pooled.set(snapshot['unverified'], state='unverified')
+        return [pooled]
+
+header_pool = HeaderPool(
+    degraded_below=float(os.getenv('HEADER_DEGRADED_SUCCESS_RATE', '0.5')),
+    reload_interval=float(os.getenv('HEADER_POOL_RELOAD_SECONDS', '60'))
+)
+metrics.register_collector(header_pool.collect)
+atexit.register(header_pool.stop)
@@ -0,0 +1,169 @@
+import logging
+import os
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from .header_pool import HeaderPool, PooledHeader, header_pool
+from .host_limiter import host_limiters
+from .metrics import header_probes_total
+
+logger = logging.getLogger(__name__)
+
+class ProbeTargetError(Exception):
+    """The probe request itself is wrong (e.g. HEADER_PROBE_EVENT_ID no longer exists), whatever the header"""
+
+class HeaderProber:
+    """Check pooled headers against Ticketmaster before the scraper gets them.
+
+    Every tick, headers whose probe is due get one single-pick quickpicks
+    request for a known event. 200 marks the header healthy, 401/403 marks it
+    degraded and a second blocked probe in a row removes it; throttling, 5xx
+    and network errors are inconclusive and retried sooner. Once started, the
+    pool hands out only headers that passed a probe (or kept coming back
+    inconclusive). Any other 4xx means the probe event is misconfigured:
+    probing stops, and so does the requirement, whenever the loop exits.
+
+    The next probe is interval seconds away, doubled for each passed probe in
+    a row up to max_backoff times, halved for headers past half their
+    lifetime, and a quarter of it for degraded headers or inconclusive probes.
+    A failed request on the hot path makes the header due again at once.
+    """
+
+    def __init__(self, pool: HeaderPool, event_id: Optional[str], interval: float = 300, max_backoff: int = 8,
+                 concurrency: int = 2, tick: float = 5):
+        self.pool = pool
+        self.event_id = event_id
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.concurrency = max(1, concurrency)
+        self.tick = tick
+        self.results = Counter()
+        self.error = None
+        self._api = None
+        self._app = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.event_id)
+
+    def start(self, app):
+        if not self.enabled:
+            logger.info("HEADER_PROBE_EVENT_ID not set, header probing is off")
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._app = app
+        self.pool.require_probe = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._probe_loop, name='header-prober')
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"Started header prober against event {self.event_id}")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def next_interval(self, entry: PooledHeader, ok: Optional[bool]) -> float:
+        """Seconds until the next probe of entry, given the result of the one just made"""
+        if not ok:
+            return self.interval / 4
+        # probe_successes does not count this probe yet
+        interval = self.interval * min(2 ** entry.probe_successes, self.max_backoff)
+        if datetime.now() - entry.created_at > timedelta(hours=12):
+            interval /= 2
+        return interval
+
+    def probe(self, entry: PooledHeader) -> Optional[bool]:
+        """One probe request with the header: True passed, False blocked, None inconclusive"""
+        api = self._api
+        url = api._build_seats_url(self.event_id, 0, 1)
+        headers = dict(entry.headers)
+        headers['TMPS-Correlation-Id'] = str(uuid.uuid4())
+        limiter = host_limiters.get(url)
+        try:
+            with limiter.request() as slot:
+                response = api.transport.request('GET', url, headers=headers, timeout=15, session=api.session)
+                slot.record(response.status_code, response.headers)
+        except Exception as e:
+            logger.debug(f"Probe of header {entry.id} failed: {str(e)}")
+            return None
+
+        if response.status_code == 200:
+            return True
+        if response.status_code == 401 or (response.status_code == 403 and not limiter.throttled()):
+            return False
+        if 400 <= response.status_code < 500 and response.status_code not in (403, 429):
+            raise ProbeTargetError(f"probe of event {self.event_id} returned {response.status_code}")
+        return None
+
+    def _probe_and_record(self, entry: PooledHeader):
+        try:
+            ok = self.probe(entry)
+        except ProbeTargetError:
+            self.pool.record_probe(entry, None, self.next_interval(entry, None))
+            raise
+        except Exception as e:
+            logger.error(f"Error probing header {entry.id}: {str(e)}")
+            ok = None
+        result = {True: 'healthy', False: 'blocked', None: 'inconclusive'}[ok]
+        self.results[result] += 1
+        header_probes_total.inc(result=result)
+        self.pool.record_probe(entry, ok, self.next_interval(entry, ok))
+
+    def _probe_loop(self):
+        try:
+            with self._app.app_context():
+                self._probe_until_stopped()
+        finally:
+            # Without a prober, waiting headers would never reach acquire()
+            self.pool.disable_probing()
+            logger.info("Header prober stopped, pooled headers no longer need a probe")
+
+    def _probe_until_stopped(self):
+        from ..ticketmaster.api import TicketmasterAPI
+
+        try:
+            self._api = TicketmasterAPI()
+            self._api.configure_pool(self.concurrency)
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Header prober could not start: {str(e)}")
+            return
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='header-probe') as executor:
+                while True:
+                    due = self.pool.due_for_probe(self.concurrency * 4)
+                    if due:
+                        list(executor.map(self._probe_and_record, due))
+                    if self._stop_event.wait(0 if due else self.tick):
+                        break
+        except ProbeTargetError as e:
+            self.error = str(e)
+            logger.error(f"Header probing disabled: {str(e)}. Check HEADER_PROBE_EVENT_ID.")
+        finally:
+            self._api.close()
+
+    def snapshot(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'event_id': self.event_id,
+            'error': self.error,
+            'results': dict(self.results)
+        }
+
+header_prober = HeaderProber(
+    header_pool,
+    os.getenv('HEADER_PROBE_EVENT_ID'),
+    interval=float(os.getenv('HEADER_PROBE_INTERVAL_SECONDS', '300')),
+    concurrency=int(os.getenv('HEADER_PROBE_CONCURRENCY', '2'))
+)
@@ -1,10 +1,15 @@
 import json
+import math
 import requests
 import logging
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from flask import current_app
 from ..models.database import db, TicketmasterHeader
+from .header_pool import header_pool
+from .metrics import header_fetch_seconds, header_fetches_total
 import os
 import random
 
@@ -29,7 +34,16 @@ class HeaderService:
         self.min_headers = int(os.getenv('MIN_HEADERS', '20'))
         self.refresh_threshold = int(os.getenv('REFRESH_THRESHOLD', '10'))
         self.check_interval = int(os.getenv('CHECK_INTERVAL', '300'))  # 5 minutes
+        self.prefetch_concurrency = max(1, int(os.getenv('HEADER_PREFETCH_CONCURRENCY', '4')))
+        # Headers this close to their 24h expiry are replaced ahead of time
+        self.refresh_before_expiry = timedelta(minutes=int(os.getenv('HEADER_REFRESH_BEFORE_EXPIRY_MINUTES', '60')))
         self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._prefetch_lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self._avg_fetch_seconds = None
+        self._refill = None
+        self._app = None
         self._thread = None
         self._initialized = True
         
@@ -37,7 +51,7 @@ class HeaderService:
         """Fetch a new header from the API and store it in the database"""
         # First, check if we already have enough headers to avoid duplicate fetching
         with self._lock:
-            active_count = self._count_active_headers()
+            active_count = self._count_active_headers(self.refresh_before_expiry)
             if active_count >= self.min_headers:
                 logger.info(f"Already have {active_count} headers, skipping fetch")
                 return None
@@ -47,19 +61,24 @@ class HeaderService:
                 logger.error("Header fetcher API URL or key not configured")
                 return None
                 
-            response = requests.get(
-                f"{self.api_url}/api/headers",
-                headers={"X-API-Key": self.api_key},
-                timeout=120
-            )
+            started = time.monotonic()
+            with header_fetch_seconds.time():
+                response = requests.get(
+                    f"{self.api_url}/api/headers",
+                    headers={"X-API-Key": self.api_key},
+                    timeout=120
+                )
+            self._record_fetch_time(time.monotonic() - started)
             
             if response.status_code != 200:
                 logger.error(f"Failed to fetch header: {response.status_code} - {response.text}")
+                header_fetches_total.inc(result=f'http_{response.status_code}')
                 return None
                 
             data = response.json()
             if not data.get("success"):
                 logger.error(f"API returned error: {data.get('error')}")
+                header_fetches_total.inc(result='api_error')
                 return None
                 
             headers_dict = data.get("headers", {})
@@ -67,17 +86,17 @@ class HeaderService:
             # Check if the header contains a cookie
             if "Cookie" not in headers_dict or not headers_dict["Cookie"]:
                 logger.warning("Fetched header doesn't contain a cookie, skipping")
+                header_fetches_total.inc(result='no_cookie')
                 return None
             
             # Check if this header cookie already exists in the database
             cookie = headers_dict.get("Cookie", "")
             with self._lock:
-                existing = TicketmasterHeader.query.filter(
-                    TicketmasterHeader.headers.like(f'%{cookie}%')
-                ).first()
+                existing = TicketmasterHeader.find_by_cookie(cookie)
                 
                 if existing:
                     logger.info(f"Header with this cookie already exists, skipping")
+                    header_fetches_total.inc(result='duplicate')
                     return existing
                 
                 # Store in database
@@ -85,50 +104,130 @@ class HeaderService:
                 db.session.add(header)
                 db.session.commit()
                 
+                header_pool.add(header)
                 logger.info(f"Added new header with ID {header.id}")
+                header_fetches_total.inc(result='added')
                 return header
                 
         except Exception as e:
             logger.error(f"Error fetching header: {str(e)}")
+            header_fetches_total.inc(result='error')
             return None
     
-    def _count_active_headers(self):
-        """Count active, non-expired headers"""
-        expiry_time = datetime.now() - timedelta(hours=24)
+    def _record_fetch_time(self, seconds: float):
+        with self._status_lock:
+            if self._avg_fetch_seconds is None:
+                self._avg_fetch_seconds = seconds
+            else:
+                self._avg_fetch_seconds = 0.8 * self._avg_fetch_seconds + 0.2 * seconds
+    
+    def _count_active_headers(self, expiring_within: timedelta = timedelta(0)):
+        """Count active headers that are not expired and will not expire within expiring_within"""
+        expiry_time = datetime.now() - timedelta(hours=24) + expiring_within
         return TicketmasterHeader.query.filter(
             TicketmasterHeader.is_active == True,
-            TicketmasterHeader.headers.like('%Cookie%'),
+            TicketmasterHeader.has_cookie == True,
             TicketmasterHeader.created_at >= expiry_time
         ).count()
             
     def get_all_active_headers(self):
-        """Get all active headers from the database"""
+        """Get all active headers from the database and sync the in-memory header pool with them"""
         headers = TicketmasterHeader.get_active_headers()
         
         # Only fetch more if we have ZERO headers
         if len(headers) == 0:
             logger.warning("No active headers found, fetching new ones")
+            # fetch_new_header takes the lock itself
             for _ in range(3):  # Fetch just a few to get things working
-                with self._lock:
-                    new_header = self.fetch_new_header()
-                    if new_header:
-                        headers.append(new_header)
-                        
+                new_header = self.fetch_new_header()
+                if new_header:
+                    headers.append(new_header)
+        
+        header_pool.load(headers)
         return [h.headers_dict for h in headers]
         
+    def _fetch_header_with_context(self, app):
+        """fetch_new_header on a prefetch thread, which needs its own app context"""
+        with app.app_context():
+            header = self.fetch_new_header()
+            with self._status_lock:
+                self._refill['completed'] += 1
+                if header:
+                    self._refill['added'] += 1
+            return header
+    
+    def prefetch(self, count):
+        """Fetch up to count headers, prefetch_concurrency requests at a time; returns the headers stored"""
+        if count <= 0:
+            return []
+        app = current_app._get_current_object()
+        
+        with self._prefetch_lock:
+            started = time.monotonic()
+            with self._status_lock:
+                self._refill = {
+                    'started_at': datetime.now().isoformat(timespec='seconds'),
+                    'requested': count,
+                    'completed': 0,
+                    'added': 0,
+                    'seconds': None
+                }
+            
+            with ThreadPoolExecutor(max_workers=min(count, self.prefetch_concurrency), thread_name_prefix='header-prefetch') as executor:
+                headers = [h for h in executor.map(lambda _: self._fetch_header_with_context(app), range(count)) if h]
+            
+            with self._status_lock:
+                self._refill['seconds'] = round(time.monotonic() - started, 1)
+            logger.info(f"Prefetched {len(headers)} of {count} headers in {self._refill['seconds']}s")
+            return headers
+    
+    def _refill_needed(self):
+        """Headers to fetch now: replace those close to expiry, and top up to min_headers once below refresh_threshold"""
+        active_count = self._count_active_headers()
+        fresh_count = self._count_active_headers(self.refresh_before_expiry)
+        if active_count < self.refresh_threshold or fresh_count < active_count:
+            return max(0, self.min_headers - fresh_count)
+        return 0
+    
+    def request_refill(self):
+        """Wake the maintenance task early, e.g. when requests find the header pool empty"""
+        self._wake_event.set()
+    
+    def status(self):
+        """Pool counts and refill progress, with an estimate of the time to refill"""
+        active_count = self._count_active_headers()
+        fresh_count = self._count_active_headers(self.refresh_before_expiry)
+        with self._status_lock:
+            refill = dict(self._refill) if self._refill else None
+            avg_fetch_seconds = self._avg_fetch_seconds
+        
+        in_progress = refill is not None and refill['seconds'] is None
+        remaining = refill['requested'] - refill['completed'] if in_progress else max(0, self.min_headers - fresh_count)
+        estimate = None
+        if avg_fetch_seconds is not None:
+            estimate = round(math.ceil(remaining / self.prefetch_concurrency) * avg_fetch_seconds, 1)
+        
+        return {
+            'active': active_count,
+            'fresh': fresh_count,
+            'expiring_soon': active_count - fresh_count,
+            'target': self.min_headers,
+            'refill_in_progress': in_progress,
+            'last_refill': refill,
+            'avg_fetch_seconds': round(avg_fetch_seconds, 1) if avg_fetch_seconds is not None else None,
+            'estimated_refill_seconds': estimate
+        }
+        
     def cleanup_expired_headers(self):
         """Remove expired headers from the database"""
         with self._lock:
             expiry_time = datetime.now() - timedelta(hours=24)
             expired = TicketmasterHeader.query.filter(
                 TicketmasterHeader.created_at < expiry_time
-            ).all()
-            
-            for header in expired:
-                db.session.delete(header)
+            ).delete(synchronize_session=False)
                 
             db.session.commit()
-            return len(expired)
+            return expired
     
     def start_background_task(self):
         """Start background task to maintain headers"""
@@ -137,6 +236,7 @@ class HeaderService:
             return
             
         self._stop_event.clear()
+        self._app = current_app._get_current_object()
         self._thread = threading.Thread(target=self._maintain_headers)
         self._thread.daemon = True
         self._thread.start()
@@ -148,6 +248,7 @@ class HeaderService:
             return
             
         self._stop_event.set()
+        self._wake_event.set()
         self._thread.join(timeout=10)
         self._thread = None
         logger.info("Stopped background header maintenance task")
@@ -157,46 +258,27 @@ class HeaderService:
         logger.info("Header maintenance task started")
         
         # Add initial random delay to stagger worker startups
-        time.sleep(random.uniform(1, 30))
+        if self._stop_event.wait(random.uniform(1, 30)):
+            return
         
         while not self._stop_event.is_set():
+            self._wake_event.clear()
             try:
-                # Add a lock to prevent race conditions
-                with self._lock:
+                with self._app.app_context():
                     # Clean up expired headers
                     cleaned = self.cleanup_expired_headers()
                     if cleaned > 0:
                         logger.info(f"Cleaned up {cleaned} expired headers")
                     
-                    # Count active headers
-                    active_count = self._count_active_headers()
-                    
-                    logger.info(f"Active headers: {active_count}/{self.min_headers}")
+                    needed = self._refill_needed()
+                    logger.info(f"Active headers: {self._count_active_headers()}/{self.min_headers}")
                     
-                    # Fetch more if below threshold
-                    if active_count < self.refresh_threshold:
-                        needed = self.min_headers - active_count
-                        logger.info(f"Fetching {needed} new headers")
-                        
+                    if needed:
                         # Wait a short random time to reduce chance of workers colliding
                         time.sleep(random.uniform(0, 3))
-                        
-                        success_count = 0
-                        for _ in range(needed):
-                            # Recheck count after each fetch to avoid overfetching
-                            current_count = self._count_active_headers()
-                            if current_count >= self.min_headers:
-                                logger.info("Reached target header count, stopping fetch")
-                                break
-                                
-                            header = self.fetch_new_header()
-                            if header:
-                                success_count += 1
-                                
-                            # Small delay to avoid overwhelming the API
-                            time.sleep(2)
-                            
-                        logger.info(f"Added {success_count} new headers")
+                        logger.info(f"Fetching {needed} new headers")
+                        added = self.prefetch(needed)
+                        logger.info(f"Added {len(added)} new headers")
             
             except Exception as e:
                 logger.error(f"Error in header maintenance task: {str(e)}")
@@ -206,5 +288,5 @@ class HeaderService:
             sleep_time = self.check_interval + jitter
             logger.debug(f"Sleeping for {sleep_time} seconds")
             
-            # Sleep until next check
-            self._stop_event.wait(sleep_time)
\ No newline at end of file
+            # Sleep until next check, or until a refill is requested
+            self._wake_event.wait(sleep_time)
\ No newline at end of file
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from .metrics import Gauge, metrics
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean the host wants us to back off
+CONGESTION_STATUSES = {403, 429, 503}
+
+def parse_retry_after(value: Optional[str], max_seconds: float = 300) -> Optional[float]:
+    """Parse a Retry-After header given as seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), max_seconds)
+
+class RequestSlot:
+    """Outcome of one request made under a limiter slot"""
+
+    def __init__(self):
+        self.status = None
+        self.retry_after = None
+        self.error = False
+
+    def record(self, status: int, headers=None):
+        self.status = status
+        if headers is not None:
+            self.retry_after = parse_retry_after(headers.get('Retry-After'))
+
+class AdaptiveHostLimiter:
+    """AIMD concurrency window for one upstream host.
+
+    The window grows by roughly one slot per window's worth of healthy responses
+    and is multiplied by decrease_factor on errors, congestion statuses or
+    responses slower than slow_latency, at most once per cooldown so a burst of
+    failures counts as one congestion event. Retry-After pauses the host.
+    """
+
+    def __init__(self, host: str, initial_window: float = 4, min_window: float = 1, max_window: float = 64,
+                 slow_latency: float = 5.0, decrease_factor: float = 0.5, burst_size: int = 3, burst_seconds: float = 10):
+        self.host = host
+        self.min_window = min_window
+        self.max_window = max_window
+        self.window = min(max(initial_window, min_window), max_window)
+        self.slow_latency = slow_latency
+        self.decrease_factor = decrease_factor
+        self.burst_size = burst_size
+        self.burst_seconds = burst_seconds
+        self.in_flight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._ewma_latency = None
+        self._success_rate = 1.0
+        self._congestion_times = deque()
+        self._cond = threading.Condition()
+        self._async_waiters = []
+
+    def _can_start(self, now: float) -> bool:
+        return self.in_flight < max(1, int(self.window)) and now >= self._blocked_until
+
+    def _wait_time(self, now: float) -> Optional[float]:
+        return self._blocked_until - now if now < self._blocked_until else None
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._can_start(now):
+                    self.in_flight += 1
+                    return
+                self._cond.wait(self._wait_time(now))
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                if self._can_start(now):
+                    self.in_flight += 1
+                    return
+                timeout = self._wait_time(now)
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait({waiter}, timeout=timeout)
+            finally:
+                with self._cond:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+
+    def _wake_waiters(self):
+        self._cond.notify_all()
+        for loop, waiter in self._async_waiters:
+            loop.call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+        self._async_waiters = []
+
+    def release(self, latency: float, status: Optional[int] = None, error: bool = False, retry_after: Optional[float] = None):
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            if status is None:
+                congested = error
+            else:
+                congested = status in CONGESTION_STATUSES or status >= 500
+            self._success_rate = 0.9 * self._success_rate + (0.0 if congested else 0.1)
+            self._ewma_latency = latency if self._ewma_latency is None else 0.8 * self._ewma_latency + 0.2 * latency
+
+            if congested:
+                self._congestion_times.append(now)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                logger.warning(f"{self.host} asked to retry after {retry_after:.0f}s")
+
+            if congested or latency > self.slow_latency:
+                # One multiplicative decrease per round trip, not one per failed request
+                if now - self._last_decrease >= max(1.0, self._ewma_latency):
+                    self.window = max(self.min_window, self.window * self.decrease_factor)
+                    self._last_decrease = now
+                    logger.info(f"Concurrency window for {self.host} reduced to {self.window:.1f}")
+            else:
+                self.window = min(self.max_window, self.window + 1.0 / self.window)
+
+            self._wake_waiters()
+
+    def throttled(self) -> bool:
+        """True while the host is paused or has sent a burst of congestion responses"""
+        with self._cond:
+            now = time.monotonic()
+            while self._congestion_times and now - self._congestion_times[0] > self.burst_seconds:
+                self._congestion_times.popleft()
+            return now < self._blocked_until or len(self._congestion_times) >= self.burst_size
+
+    @contextmanager
+    def request(self):
+        """Hold a slot for one request; record the response status on the yielded slot."""
+        self.acquire()
+        slot = RequestSlot()
+        started = time.monotonic()
+        try:
+            yield slot
+        except Exception:
+            slot.error = True
+            raise
+        finally:
+            self.release(time.monotonic() - started, slot.status, slot.error, slot.retry_after)
+
+    @asynccontextmanager
+    async def request_async(self):
+        await self.acquire_async()
+        slot = RequestSlot()
+        started = time.monotonic()
+        try:
+            yield slot
+        except Exception:
+            slot.error = True
+            raise
+        finally:
+            self.release(time.monotonic() - started, slot.status, slot.error, slot.retry_after)
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            now = time.monotonic()
+            return {
+                'window': round(self.window, 2),
+                'in_flight': self.in_flight,
+                'success_rate': round(self._success_rate, 3),
+                'avg_latency_ms': round(self._ewma_latency * 1000) if self._ewma_latency is not None else None,
+                'retry_after_seconds': round(self._blocked_until - now, 1) if now < self._blocked_until else 0
+            }
+
+class HostLimiterRegistry:
+    """One AdaptiveHostLimiter per host, shared by every client in the process"""
+
+    def __init__(self):
+        self._limiters: Dict[str, AdaptiveHostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> AdaptiveHostLimiter:
+        host = urlparse(url).netloc or url
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = AdaptiveHostLimiter(
+                    host,
+                    initial_window=float(os.getenv('HOST_CONCURRENCY_INITIAL', '4')),
+                    min_window=float(os.getenv('HOST_CONCURRENCY_MIN', '1')),
+                    max_window=float(os.getenv('HOST_CONCURRENCY_MAX', '64')),
+                    slow_latency=float(os.getenv('HOST_SLOW_LATENCY_SECONDS', '5'))
+                )
+                self._limiters[host] = limiter
+            return limiter
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {host: limiter.snapshot() for host, limiter in limiters.items()}
+
+    def collect(self) -> List[Gauge]:
+        """Current window and in-flight requests per host, for the metrics endpoint"""
+        window = Gauge('scraper_host_concurrency_window', 'Adaptive concurrency window per upstream host', ('host',))
+        in_flight = Gauge('scraper_host_in_flight_requests', 'Requests in flight per upstream host', ('host',))
+        for host, snapshot in self.snapshot().items():
+            window.set(snapshot['window'], host=host)
+            in_flight.set(snapshot['in_flight'], host=host)
+        return [window, in_flight]
+
+host_limiters = HostLimiterRegistry()
+metrics.register_collector(host_limiters.collect)
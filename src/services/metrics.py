@@ -0,0 +1,208 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; covers fast API pages up to slow header fetches and uploads
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: Tuple = ()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class _Metric:
+    TYPE = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.TYPE}'] + self._samples()
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination"""
+
+    TYPE = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in values]
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. the duration of the last run"""
+
+    TYPE = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in values]
+
+class Histogram(_Metric):
+    """Cumulative bucket counts plus sum and count, as Prometheus histograms are exposed"""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # [per-bucket counts..., sum]
+                series = self._values[key] = [0] * len(self.buckets) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block, also when it raises"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, (('le', _format_value(bound)),))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(series[-1])}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+class MetricsRegistry:
+    """Process-wide metrics, rendered in the Prometheus text exposition format.
+
+    Metrics are created once by name and shared; asking for an existing name
+    returns the same instance. Collectors are callables run at render time for
+    values that live elsewhere, like the host limiter windows.
+    """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.TYPE}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Optional[Iterable[float]] = None) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets or DEFAULT_BUCKETS)
+
+    def register_collector(self, collector: Callable[[], Iterable[_Metric]]):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+            collectors = list(self._collectors)
+        for collector in collectors:
+            metrics.extend(collector())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+
+# Upstream requests, per page or proxy call
+provider_request_seconds = metrics.histogram(
+    'scraper_provider_request_seconds', 'Latency of one upstream request', ('provider', 'operation'))
+provider_responses_total = metrics.counter(
+    'scraper_provider_responses_total', 'Upstream responses by status code ("error" for transport failures)',
+    ('provider', 'operation', 'status'))
+provider_retries_total = metrics.counter(
+    'scraper_provider_retries_total', 'Upstream requests retried after a failed attempt', ('provider', 'operation'))
+
+# Ticketmaster headers
+header_failures_total = metrics.counter(
+    'scraper_header_failures_total', 'Ticketmaster headers marked as failed')
+header_fetch_seconds = metrics.histogram(
+    'scraper_header_fetch_seconds', 'Latency of fetching a new header from the header API')
+header_fetches_total = metrics.counter(
+    'scraper_header_fetches_total', 'Header fetch attempts by result', ('result',))
+header_probes_total = metrics.counter(
+    'scraper_header_probes_total', 'Background header probes by result', ('result',))
+
+# Uploads
+upload_seconds = metrics.histogram(
+    'scraper_upload_seconds', 'Duration of a CSV upload, credentials request included')
+uploads_total = metrics.counter(
+    'scraper_uploads_total', 'CSV uploads by result', ('result',))
+
+# Scraper runs
+listings_per_event = metrics.histogram(
+    'scraper_listings_per_event', 'Listings found per scraped event', ('provider',),
+    buckets=(0, 1, 10, 50, 100, 250, 500, 1000, 2500, 5000))
+events_scraped_total = metrics.counter(
+    'scraper_events_scraped_total', 'Events scraped by provider', ('provider',))
+run_seconds = metrics.histogram(
+    'scraper_run_seconds', 'Duration of a scraper run', ('result',),
+    buckets=(10, 30, 60, 120, 300, 600, 900, 1200, 1800, 3600))
+runs_total = metrics.counter(
+    'scraper_runs_total', 'Scraper runs by result', ('result',))
+last_run_timestamp = metrics.gauge(
+    'scraper_last_run_timestamp_seconds', 'Unix time the last scraper run finished', ('result',))
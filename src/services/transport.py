@@ -0,0 +1,221 @@
+import asyncio
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT_MODES = ('passthrough', 'record', 'replay')
+
+# Credentials and per-request noise left out of recording keys and files
+VOLATILE_PARAMS = {'apikey', 'apisecret'}
+# Response headers worth keeping; the limiter reads Retry-After
+RECORDED_HEADERS = ('Content-Type', 'Retry-After')
+
+def normalise_request(method: str, url, params: Optional[Dict] = None) -> Tuple[str, str]:
+    """(method, url with sorted query and without credentials) identifying a request"""
+    parts = urlsplit(str(url))
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query += [(key, str(value)) for key, value in params.items()]
+    query = sorted((key, value) for key, value in query if key.lower() not in VOLATILE_PARAMS)
+    return method.upper(), urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+class TransportResponse:
+    """The parts of a response the provider clients use, for async and replayed requests"""
+
+    def __init__(self, status_code: int, headers, content: bytes, url: str = ''):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+class RecordingStore:
+    """Recorded responses as gzipped JSON files keyed by the normalised request.
+
+    Each key holds every response recorded for it in order; replay walks
+    through them and starts over, so paginated or repeated scrapes of the
+    same event see the recorded sequence. New recordings are buffered and
+    written by flush(), each changed file once, after every flush_every
+    additions and on close().
+    """
+
+    def __init__(self, recordings_dir: str, flush_every: int = 500):
+        self.recordings_dir = recordings_dir
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._cache: Dict[str, List[Dict]] = {}
+        self._positions: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._unflushed = 0
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        return hashlib.sha1(f'{method} {url}'.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.recordings_dir, key[:2], f'{key}.json.gz')
+
+    def _read(self, key: str) -> List[Dict]:
+        if key not in self._cache:
+            path = self._path(key)
+            if os.path.exists(path):
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    self._cache[key] = json.load(f)
+            else:
+                self._cache[key] = []
+        return self._cache[key]
+
+    def add(self, method: str, url: str, response, latency: float):
+        key = self.key(method, url)
+        entry = {
+            'method': method,
+            'url': url,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            'body': response.content.decode('utf-8', errors='replace'),
+            'latency_ms': round(latency * 1000, 1),
+            'recorded_at': datetime.now().isoformat(timespec='seconds')
+        }
+        with self._lock:
+            self._read(key).append(entry)
+            self._dirty.add(key)
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        for key in self._dirty:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f'{path}.tmp'
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump(self._cache[key], f)
+            os.replace(temp_path, path)
+        self._dirty.clear()
+        self._unflushed = 0
+
+    def flush(self):
+        """Write the recordings added since the last flush"""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        self.flush()
+
+    def next(self, method: str, url: str) -> Optional[Dict]:
+        key = self.key(method, url)
+        with self._lock:
+            entries = self._read(key)
+            if not entries:
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return entries[position % len(entries)]
+
+class ProviderTransport:
+    """HTTP layer under TicketmasterAPI and TodayTixAPI.
+
+    'passthrough' sends requests as before; 'record' also stores each
+    request/response pair with its latency; 'replay' answers from the
+    recordings without touching the network, waiting the recorded latency
+    times latency_scale. A request missing from the recordings gets a 404.
+    """
+
+    def __init__(self, mode: str = 'passthrough', recordings_dir: Optional[str] = None, latency_scale: float = 1.0):
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f"Unknown transport mode: {mode}")
+        if mode != 'passthrough' and not recordings_dir:
+            raise ValueError(f"Transport mode {mode} needs a recordings directory")
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.store = RecordingStore(recordings_dir) if recordings_dir else None
+        self.replay_misses = 0
+        self._misses_lock = threading.Lock()
+
+    def _replayed(self, method: str, url: str) -> Tuple[TransportResponse, float]:
+        entry = self.store.next(method, url)
+        if entry is None:
+            with self._misses_lock:
+                self.replay_misses += 1
+            logger.warning(f"No recording for {method} {url}")
+            return TransportResponse(404, {}, b'{}', url), 0.0
+        body = entry['body'].encode('utf-8')
+        return TransportResponse(entry['status'], entry['headers'], body, url), entry['latency_ms'] / 1000 * self.latency_scale
+
+    def request(self, method: str, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                timeout: float = 30, session: Optional[requests.Session] = None):
+        """Blocking request through requests (or the given session)."""
+        if self.mode == 'replay':
+            response, delay = self._replayed(*normalise_request(method, url, params))
+            if delay:
+                time.sleep(delay)
+            return response
+
+        started = time.monotonic()
+        response = (session or requests).request(method, url, params=params, headers=headers, timeout=timeout)
+        if self.mode == 'record':
+            self.store.add(*normalise_request(method, url, params), response, time.monotonic() - started)
+        return response
+
+    def close(self):
+        """Write out buffered recordings"""
+        if self.store is not None:
+            self.store.close()
+
+    async def request_async(self, session, method: str, url, params: Optional[Dict] = None,
+                            headers: Optional[Dict] = None) -> TransportResponse:
+        """Request on a shared aiohttp session, with the body read."""
+        if self.mode == 'replay':
+            response, delay = self._replayed(*normalise_request(method, url, params))
+            if delay:
+                await asyncio.sleep(delay)
+            return response
+
+        started = time.monotonic()
+        async with session.request(method, url, params=params, headers=headers) as raw:
+            response = TransportResponse(raw.status, raw.headers, await raw.read(), str(raw.url))
+        if self.mode == 'record':
+            self.store.add(*normalise_request(method, url, params), response, time.monotonic() - started)
+        return response
+
+_transports: Dict[Tuple, ProviderTransport] = {}
+_transports_lock = threading.Lock()
+
+def transport_from_env() -> ProviderTransport:
+    """The process-wide transport configured by PROVIDER_TRANSPORT and friends"""
+    settings = (
+        os.getenv('PROVIDER_TRANSPORT', 'passthrough').lower(),
+        os.getenv('PROVIDER_RECORDINGS_DIR', 'data/recordings'),
+        float(os.getenv('PROVIDER_REPLAY_LATENCY_SCALE', '1.0'))
+    )
+    with _transports_lock:
+        transport = _transports.get(settings)
+        if transport is None:
+            transport = _transports[settings] = ProviderTransport(*settings)
+            if transport.mode != 'passthrough':
+                logger.info(f"Provider transport in {transport.mode} mode on {settings[1]}")
+            if transport.mode == 'record':
+                atexit.register(transport.close)
+        return transport
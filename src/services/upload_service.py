@@ -4,6 +4,8 @@ from typing import Dict, Optional, Tuple
 import os
 import pandas as pd
 import chardet
+from ..constants import TICKET_CSV_COLUMNS
+from .metrics import upload_seconds, uploads_total
 
 logger = logging.getLogger(__name__)
 
@@ -16,15 +18,7 @@ class UploadService:
             'accept': 'application/json',
             'Content-Type': 'application/json'
         }
-        self.required_headers = [
-            'inventory_id', 'event_name', 'venue_name', 'event_date', 
-            'event_id', 'quantity', 'section', 'row', 'seats', 'barcodes',
-            'internal_notes', 'public_notes', 'tags', 'list_price', 
-            'face_price', 'taxed_cost', 'cost', 'hide_seats', 'in_hand',
-            'in_hand_date', 'instant_transfer', 'files_available', 
-            'split_type', 'custom_split', 'stock_type', 'zone', 
-            'shown_quantity', 'passthrough'
-        ]
+        self.required_headers = list(TICKET_CSV_COLUMNS)
 
     def create_empty_dataframe(self) -> pd.DataFrame:
         """Create an empty DataFrame with required headers."""
@@ -174,10 +168,14 @@ class UploadService:
 
     def upload_csv(self, file_path: str) -> Tuple[bool, str]:
         """Complete upload process including requesting credentials and uploading."""
-        # Request upload credentials
-        success, upload_data = self.request_upload()
-        if not success:
-            return False, upload_data.get("error", "Failed to get upload credentials")
-
-        # Upload to S3
-        return self.upload_to_s3(file_path, upload_data)
\ No newline at end of file
+        with upload_seconds.time():
+            # Request upload credentials
+            success, upload_data = self.request_upload()
+            if not success:
+                uploads_total.inc(result='no_credentials')
+                return False, upload_data.get("error", "Failed to get upload credentials")
+
+            # Upload to S3
+            success, message = self.upload_to_s3(file_path, upload_data)
+        uploads_total.inc(result='success' if success else 'failed')
+        return success, message
\ No newline at end of file
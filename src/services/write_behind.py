@@ -0,0 +1,142 @@
+import atexit
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+from sqlalchemy import case
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+class PendingUpdate:
+    """Updates queued for one row, merged as they arrive"""
+
+    def __init__(self):
+        self.set: Dict[str, object] = {}
+        self.max: Dict[str, object] = {}
+        self.add: Dict[str, float] = {}
+
+    def merge(self, other: 'PendingUpdate'):
+        self.set.update(other.set)
+        for column, value in other.max.items():
+            if column not in self.max or value > self.max[column]:
+                self.max[column] = value
+        for column, amount in other.add.items():
+            self.add[column] = self.add.get(column, 0) + amount
+
+    def values(self, model) -> Dict:
+        """UPDATE values: maxima kept against the stored value, additions on top of it, then sets.
+
+        A callable set value gets the other new values, for columns derived
+        from merged ones (e.g. deactivating once failures reach a limit).
+        """
+        values = {}
+        for name, value in self.max.items():
+            column = getattr(model, name)
+            values[name] = case((column.is_(None), value), (column < value, value), else_=column)
+        for name, amount in self.add.items():
+            column = getattr(model, name)
+            values[name] = case((column.is_(None), amount), else_=column + amount)
+        for name, value in self.set.items():
+            values[name] = value(values) if callable(value) else value
+        return values
+
+class WriteBehindBuffer:
+    """Small row updates queued in memory and written by one writer thread.
+
+    Callers on the request path queue updates with update() and return
+    immediately. Updates to the same row are merged (last set wins, max keeps
+    the largest value, add sums), and the writer flushes everything pending in
+    one transaction every flush_interval seconds and at shutdown, so SQLite
+    sees one fsync per interval instead of one per request. A flush that
+    fails (e.g. 'database is locked') puts its updates back for the next one.
+    """
+
+    def __init__(self, flush_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self._pending: Dict[Tuple[type, int], PendingUpdate] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._app = None
+        self._writer = None
+        self._stop_event = threading.Event()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def update(self, model, row_id: int, set: Optional[Dict] = None, max: Optional[Dict] = None,
+               add: Optional[Dict] = None):
+        """Queue an update of one row; the writer starts with the first update made inside an app context"""
+        update = PendingUpdate()
+        update.set.update(set or {})
+        update.max.update(max or {})
+        update.add.update(add or {})
+        self._merge({(model, row_id): update})
+        if self._writer is None or not self._writer.is_alive():
+            from flask import current_app, has_app_context
+            if has_app_context():
+                self._start(current_app._get_current_object())
+
+    def _merge(self, updates: Dict[Tuple[type, int], PendingUpdate]):
+        with self._lock:
+            for key, update in updates.items():
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._pending[key] = update
+                else:
+                    pending.merge(update)
+
+    def flush(self) -> int:
+        """Write everything pending in one transaction; returns the rows updated"""
+        from ..models.database import db
+
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending or self._app is None:
+                    return 0
+                pending, self._pending = self._pending, {}
+
+            with self._app.app_context():
+                try:
+                    for (model, row_id), update in pending.items():
+                        db.session.execute(db.update(model).where(model.id == row_id).values(**update.values(model)))
+                    db.session.commit()
+                except OperationalError as e:
+                    db.session.rollback()
+                    logger.warning(f"Write-behind flush of {len(pending)} rows failed, retrying: {str(e)}")
+                    # Older updates first, so sets queued since then still win
+                    with self._lock:
+                        newer, self._pending = self._pending, pending
+                    self._merge(newer)
+                    return 0
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Write-behind flush of {len(pending)} rows dropped: {str(e)}")
+                    return 0
+            return len(pending)
+
+    def _start(self, app):
+        with self._lock:
+            self._app = app
+            if self._writer is not None and self._writer.is_alive():
+                return
+            self._stop_event.clear()
+            self._writer = threading.Thread(target=self._write_loop, name='write-behind')
+            self._writer.daemon = True
+            self._writer.start()
+
+    def _write_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        """Stop the writer and flush what is still pending"""
+        self._stop_event.set()
+        if self._writer is not None:
+            self._writer.join(timeout=10)
+            self._writer = None
+        self.flush()
+
+write_behind = WriteBehindBuffer(flush_interval=float(os.getenv('WRITE_BEHIND_FLUSH_SECONDS', '1')))
+atexit.register(write_behind.stop)
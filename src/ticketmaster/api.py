@@ -1,43 +1,139 @@
 import os
 import re
-import requests
+import asyncio
+import aiohttp
 import logging
 import uuid
-import random
-from typing import Dict, List
+import socket
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
+from itertools import islice
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from flask import current_app, has_app_context
+from yarl import URL
+from ..services.header_pool import header_pool
 from ..services.header_service import HeaderService
+from ..services.host_limiter import host_limiters
+from ..services.transport import ProviderTransport, transport_from_env
+from ..services.metrics import header_failures_total, provider_request_seconds, provider_responses_total, provider_retries_total
 
 logger = logging.getLogger(__name__)
 
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections send TCP keep-alive probes, so idle sockets survive between pages"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        socket_options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            socket_options += [(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30), (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)]
+        kwargs['socket_options'] = socket_options
+        super().init_poolmanager(*args, **kwargs)
+
 class TicketmasterAPI:
     BASE_URL = 'https://services.ticketmaster.com/api/ismds'
+    # While no header is pooled, how often a request may look in the database for new ones
+    EMPTY_POOL_RELOAD_SECONDS = 5
 
-    def __init__(self):
+    def __init__(self, transport: ProviderTransport = None):
+        self.transport = transport or transport_from_env()
         self.api_key = os.getenv('TICKETMASTER_API_KEY')
         self.api_secret = os.getenv('TICKETMASTER_API_SECRET')
         self.consumer_api = os.getenv('TICKETMASTER_CONSUMER_API')
-        self.headers_list = []
+        self.header_pool = header_pool
         self.header_service = HeaderService()
+        self.page_size = int(os.getenv('TICKETMASTER_PAGE_SIZE', '40'))
+        # Most pages of one event in flight at once, so a large event cannot take every host slot and fetcher
+        self.page_concurrency = int(os.getenv('TICKETMASTER_PAGE_CONCURRENCY', '8'))
+        self.pool_size = 0
+        self._page_executor = None
+        self._reload_lock = threading.Lock()
+        self.session = self._build_session()
+        self.configure_pool(int(os.getenv('TICKETMASTER_POOL_SIZE', '20')))
         
         # Load headers from database at initialization
         self._load_headers()
         
+    @staticmethod
+    def _build_session() -> requests.Session:
+        session = requests.Session()
+        # Cookies come from the rotating header pool; a shared jar would leak one header's cookies into another's requests
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    def configure_pool(self, pool_size: int):
+        """Size the keep-alive connection pool and the page fetchers for this many concurrent events"""
+        pool_size = max(1, pool_size)
+        if pool_size <= self.pool_size:
+            return
+        previous = self.session.adapters.get('https://')
+        # Event threads and page fetchers each hold a connection
+        adapter = KeepAliveAdapter(pool_connections=4, pool_maxsize=pool_size * 2, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if isinstance(previous, KeepAliveAdapter):
+            previous.close()
+        if self._page_executor:
+            self._page_executor.shutdown(wait=False)
+        self._page_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='quickpicks-page')
+        self.pool_size = pool_size
+
+    def close(self):
+        """Stop the page fetchers and close pooled connections; the client is not used afterwards"""
+        if self._page_executor:
+            self._page_executor.shutdown(wait=False, cancel_futures=True)
+            self._page_executor = None
+        self.session.close()
+        self.pool_size = 0
+
     def _load_headers(self):
-        """Load headers from database"""
+        """Load headers from database into the shared header pool"""
         try:
-            self.headers_list = self.header_service.get_all_active_headers()
-            logger.info(f"Loaded {len(self.headers_list)} headers")
+            self.header_service.get_all_active_headers()
+            logger.info(f"Loaded {len(self.header_pool)} headers")
         except Exception as e:
             logger.error(f"Error loading headers: {str(e)}")
-            self.headers_list = []
         
     def _get_header(self):
         """Get a header to use for the request"""
-        if not self.headers_list or len(self.headers_list) == 0:
-            self._load_headers()
-            
-        if not self.headers_list or len(self.headers_list) == 0:
+        lease = self.header_pool.acquire()
+        if lease is None and self._reload_due():
+            lease = self._reload_and_acquire()
+        return self._header_for(lease)
+
+    async def _get_header_async(self):
+        """_get_header for the event loop; reloading the pool from the database runs on a worker thread"""
+        lease = self.header_pool.acquire()
+        if lease is None and self._reload_due():
+            app = current_app._get_current_object() if has_app_context() else None
+            lease = await asyncio.to_thread(self._run_with_context, app, self._reload_and_acquire)
+        return self._header_for(lease)
+
+    def _reload_due(self) -> bool:
+        """While no header is pooled, whether a request may look in the database for new ones"""
+        if self._reload_lock.locked():
+            return False
+        return time.monotonic() - self.header_pool.loaded_at >= self.EMPTY_POOL_RELOAD_SECONDS
+
+    def _reload_and_acquire(self):
+        # One reload at a time; requests arriving meanwhile use the default headers
+        if self._reload_lock.acquire(blocking=False):
+            try:
+                self._load_headers()
+            finally:
+                self._reload_lock.release()
+        return self.header_pool.acquire()
+
+    def _header_for(self, lease):
+        """Request headers from a pooled lease, or the default headers when there is none"""
+        if lease is None:
+            # Have the header service refill now rather than at its next check
+            self.header_service.request_refill()
             # Fallback to default headers
             return {
                 'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:133.0) Gecko/20100101 Firefox/133.0',
@@ -55,56 +151,31 @@ class TicketmasterAPI:
                 'Cache-Control': 'no-cache',
             }
             
-        # Choose a random header from the list
-        header = random.choice(self.headers_list)
-        
-        # Mark as used in database
-        self._mark_header_used(header)
-        
-        # Add correlation ID
+        # Copy so concurrent requests with the same header get their own correlation ID
+        header = dict(lease.headers)
         header['TMPS-Correlation-Id'] = str(uuid.uuid4())
         
         return header
         
-    def _mark_header_used(self, header):
-        """Mark the header as used in the database"""
-        try:
-            # Find the header by cookie
-            cookie = header.get('Cookie', '')
-            if not cookie:
-                return
-                
-            from ..models.database import TicketmasterHeader
-            db_header = TicketmasterHeader.query.filter(
-                TicketmasterHeader.headers.like(f'%{cookie}%')
-            ).first()
-            
-            if db_header:
-                db_header.mark_used()
-        except Exception as e:
-            logger.error(f"Error marking header as used: {str(e)}")
+    def _mark_header_success(self, header):
+        """Record a successful request with the header in the pool"""
+        self.header_pool.release(header.get('Cookie', ''), True)
             
     def _mark_header_failure(self, header):
-        """Mark the header as failed in the database"""
-        try:
-            # Find the header by cookie
-            cookie = header.get('Cookie', '')
-            if not cookie:
-                return
-                
-            from ..models.database import TicketmasterHeader
-            db_header = TicketmasterHeader.query.filter(
-                TicketmasterHeader.headers.like(f'%{cookie}%')
-            ).first()
-            
-            if db_header:
-                db_header.mark_failure()
-                # Remove from current list
-                if header in self.headers_list:
-                    self.headers_list.remove(header)
-        except Exception as e:
-            logger.error(f"Error marking header as failed: {str(e)}")
+        """Record a failed request with the header; the pool drops it after three failures"""
+        cookie = header.get('Cookie', '')
+        if not cookie:
+            return
+        self.header_pool.release(cookie, False)
+        header_failures_total.inc()
             
+    def _handle_failed_status(self, header, status_code: int, limiter):
+        """Mark the header as failed unless the host is rate limiting everyone."""
+        if status_code == 429 or (status_code == 403 and limiter.throttled()):
+            self.header_pool.release(header.get('Cookie', ''), None)
+            return
+        self._mark_header_failure(header)
+
     def search_events(self, event_name: str, location: str, start_date: str, end_date: str) -> List[Dict]:
         try:
             base_url = 'https://app.ticketmaster.com/discovery/v2/events'
@@ -137,18 +208,24 @@ class TicketmasterAPI:
                         'page': page
                     }
 
+                    limiter = host_limiters.get(base_url)
                     try:
-                        response = requests.get(
-                            base_url,
-                            params=query_params,
-                            headers=headers,
-                            timeout=30
-                        )
+                        with limiter.request() as slot:
+                            response = self.transport.request(
+                                'GET',
+                                base_url,
+                                params=query_params,
+                                headers=headers,
+                                timeout=30,
+                                session=self.session
+                            )
+                            slot.record(response.status_code, response.headers)
                         
                         if response.status_code == 200:
+                            self._mark_header_success(headers)
                             success = True
                         else:
-                            self._mark_header_failure(headers)
+                            self._handle_failed_status(headers, response.status_code, limiter)
                             retry_count += 1
                             logger.warning(f"Request failed with status {response.status_code}, retrying ({retry_count}/{max_retries})")
                     except Exception as e:
@@ -229,83 +306,222 @@ class TicketmasterAPI:
                 
             return []
 
-    def get_seats(self, event_id: str) -> List[Dict]:
-        """Get available seats for a specific event."""
-        seats_data = []
-        offset = 0
-        limit = 40
+    def _build_seats_url(self, event_id: str, offset: int, limit: int) -> str:
+        """Build the quickpicks URL for one page of an event's seats."""
+        base_url = f'{self.BASE_URL}/event/{event_id}/quickpicks'
+
+        # Query parameters
+        query_params = (
+            f'show=places+sections'
+            f'&mode=primary:ppsectionrow+resale:ga_areas+platinum:all'
+            f'&qty=2'
+            f"&q=not('accessible')"
+            f'&includeStandard=true'
+            f'&includeResale=false'
+            f'&includePlatinumInventoryType=false'
+            f'&ticketTypes=000000000001'
+            f'&embed=area&embed=offer&embed=description'
+            f'&apikey={self.api_key}'
+            f'&apisecret={self.api_secret}'
+            f'&resaleChannelId=internal.ecommerce.consumer.desktop.web.browser.ticketmaster.us'
+            f'&limit={limit}'
+            f'&offset={offset}'
+            f'&sort=listprice'
+        )
+
+        return f"{base_url}?{query_params}"
+
+    def _next_offsets(self, offset: int, limit: int, total) -> List[int]:
+        """Offsets of the next pages to fetch: all remaining ones when the pick total is known.
+
+        They are fetched page_concurrency at a time by _fetch_pages and
+        _fetch_page_bounded.
+        """
+        if not isinstance(total, int) or self.page_concurrency <= 1:
+            return [offset]
+        return list(range(offset, total, limit))
+
+    def _fetch_page(self, event_id: str, offset: int, limit: int) -> Optional[Dict]:
+        """One quickpicks page with retries, or None once they are used up"""
         max_retries = 3
+        response = None
 
-        while True:
-            try:
-                base_url = f'{self.BASE_URL}/event/{event_id}/quickpicks'
-
-                # Query parameters
-                query_params = (
-                    f'show=places+sections'
-                    f'&mode=primary:ppsectionrow+resale:ga_areas+platinum:all'
-                    f'&qty=2'
-                    f"&q=not('accessible')"
-                    f'&includeStandard=true'
-                    f'&includeResale=false'
-                    f'&includePlatinumInventoryType=false'
-                    f'&ticketTypes=000000000001'
-                    f'&embed=area&embed=offer&embed=description'
-                    f'&apikey={self.api_key}'
-                    f'&apisecret={self.api_secret}'
-                    f'&resaleChannelId=internal.ecommerce.consumer.desktop.web.browser.ticketmaster.us'
-                    f'&limit={limit}'
-                    f'&offset={offset}'
-                    f'&sort=listprice'
-                )
-
-                url = f"{base_url}?{query_params}"
-
-                # Use retry logic just like in search_events
-                retry_count = 0
-                success = False
-                response = None
+        try:
+            url = self._build_seats_url(event_id, offset, limit)
+
+            # Use retry logic just like in search_events
+            retry_count = 0
+            success = False
+
+            while retry_count < max_retries and not success:
+                # Get a header for this request
+                headers = self._get_header()
+                limiter = host_limiters.get(url)
+                if retry_count:
+                    provider_retries_total.inc(provider='ticketmaster', operation='quickpicks')
+                try:
+                    with limiter.request() as slot, provider_request_seconds.time(provider='ticketmaster', operation='quickpicks'):
+                        response = self.transport.request('GET', url, headers=headers, timeout=30, session=self.session)
+                        slot.record(response.status_code, response.headers)
+                    provider_responses_total.inc(provider='ticketmaster', operation='quickpicks', status=response.status_code)
+
+                    if response.status_code == 200:
+                        self._mark_header_success(headers)
+                        success = True
+                    else:
+                        self._handle_failed_status(headers, response.status_code, limiter)
+                        retry_count += 1
+                        logger.warning(f"Request failed with status {response.status_code}, retrying ({retry_count}/{max_retries})")
+                except Exception as e:
+                    logger.error(f"Request error: {str(e)}")
+                    provider_responses_total.inc(provider='ticketmaster', operation='quickpicks', status='error')
+                    self._mark_header_failure(headers)
+                    retry_count += 1
 
-                while retry_count < max_retries and not success:
-                    # Get a header for this request
-                    headers = self._get_header()
-                    print(headers)
-                    try:
-                        response = requests.get(url, headers=headers, timeout=30)
+            if not success:
+                logger.error(f"Failed to get seats for event {event_id} after multiple retries")
+                return None
 
-                        if response.status_code == 200:
-                            success = True
-                        else:
-                            self._mark_header_failure(headers)
-                            retry_count += 1
-                            logger.warning(f"Request failed with status {response.status_code}, retrying ({retry_count}/{max_retries})")
-                    except Exception as e:
-                        logger.error(f"Request error: {str(e)}")
-                        self._mark_header_failure(headers)
-                        retry_count += 1
+            return response.json()
 
-                if not success:
-                    logger.error(f"Failed to get seats for event {event_id} after multiple retries")
-                    break
+        except Exception as e:
+            logger.error(f"Error fetching seats for event {event_id}: {str(e)}")
+            if response is not None and hasattr(response, 'text'):
+                logger.error(f"Response content: {response.text}")
+            return None
+
+    def _fetch_page_with_context(self, app, event_id: str, offset: int, limit: int) -> Optional[Dict]:
+        """_fetch_page on a page fetcher thread, which needs its own app context for header bookkeeping"""
+        return self._run_with_context(app, self._fetch_page, event_id, offset, limit)
+
+    @staticmethod
+    def _run_with_context(app, func, *args):
+        """func(*args) on a worker thread, in its own app context so it gets its own database session"""
+        if app is None:
+            return func(*args)
+        with app.app_context():
+            return func(*args)
+
+    def _fetch_pages(self, app, event_id: str, offsets: List[int], limit: int) -> List[Optional[Dict]]:
+        """Pages at offsets, in order, with at most page_concurrency of them in flight.
+
+        Each finished page hands its slot to the next offset, so the event
+        keeps its share of the fetcher pool busy without taking all of it.
+        Nothing more is submitted once a page fails; its None fails the event.
+        """
+        remaining = iter(offsets)
+        pages = {}
+        pending = {}
+
+        def submit(offset):
+            future = self._page_executor.submit(self._fetch_page_with_context, app, event_id, offset, limit)
+            pending[future] = offset
+
+        for offset in islice(remaining, self.page_concurrency):
+            submit(offset)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                data = pages[pending.pop(future)] = future.result()
+                if data is None:
+                    remaining = iter(())
+                offset = next(remaining, None)
+                if offset is not None:
+                    submit(offset)
+        return [pages.get(offset) for offset in offsets]
+
+    def _collect_pages(self, event_id: str, seats_data: List[Dict], pages: List[Optional[Dict]], limit: int) -> bool:
+        """Add pages to seats_data in offset order; False once a page is empty or the last one.
+
+        A page that could not be fetched fails the whole event, so the run keeps
+        its previous listings instead of publishing part of them.
+        """
+        if any(data is None for data in pages):
+            raise RuntimeError(f"Failed to get seats for event {event_id}")
+        for data in pages:
+            if not data.get('picks'):
+                return False
+            seats_data.extend(self._process_seats_data(data))
+            if len(data['picks']) < limit:
+                return False
+        return True
 
-                data = response.json()
+    def get_seats(self, event_id: str) -> List[Dict]:
+        """Get available seats for a specific event.
 
-                if not data.get('picks'):
-                    break
+        The first page gives the pick total; the remaining pages are then
+        fetched page_concurrency at a time and merged in offset order. Raises
+        if a page cannot be fetched.
+        """
+        seats_data = []
+        limit = self.page_size
+        offsets = [0]
+        app = current_app._get_current_object() if has_app_context() else None
+
+        while offsets:
+            if len(offsets) == 1:
+                pages = [self._fetch_page(event_id, offsets[0], limit)]
+            else:
+                pages = self._fetch_pages(app, event_id, offsets, limit)
+            if not self._collect_pages(event_id, seats_data, pages, limit):
+                break
+            offsets = self._next_offsets(offsets[-1] + limit, limit, pages[-1].get('total'))
 
-                processed_seats = self._process_seats_data(data)
-                seats_data.extend(processed_seats)
+        return seats_data
 
-                if len(data['picks']) < limit:
-                    break
+    async def _fetch_page_async(self, session: aiohttp.ClientSession, event_id: str, offset: int, limit: int) -> Optional[Dict]:
+        """Async counterpart of _fetch_page"""
+        url = URL(self._build_seats_url(event_id, offset, limit), encoded=True)
+        limiter = host_limiters.get(self.BASE_URL)
+        max_retries = 3
+        retry_count = 0
+
+        try:
+            while retry_count < max_retries:
+                headers = await self._get_header_async()
+                if retry_count:
+                    provider_retries_total.inc(provider='ticketmaster', operation='quickpicks')
+                try:
+                    async with limiter.request_async() as slot:
+                        with provider_request_seconds.time(provider='ticketmaster', operation='quickpicks'):
+                            response = await self.transport.request_async(session, 'GET', url, headers=headers)
+                        slot.record(response.status_code, response.headers)
+                    provider_responses_total.inc(provider='ticketmaster', operation='quickpicks', status=response.status_code)
+                    if response.status_code == 200:
+                        self._mark_header_success(headers)
+                        return response.json()
+                    self._handle_failed_status(headers, response.status_code, limiter)
+                    retry_count += 1
+                    logger.warning(f"Request failed with status {response.status_code}, retrying ({retry_count}/{max_retries})")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.error(f"Request error: {str(e)}")
+                    provider_responses_total.inc(provider='ticketmaster', operation='quickpicks', status='error')
+                    self._mark_header_failure(headers)
+                    retry_count += 1
+        except Exception as e:
+            logger.error(f"Error fetching seats for event {event_id}: {str(e)}")
+            return None
 
-                offset += limit
+        logger.error(f"Failed to get seats for event {event_id} after multiple retries")
+        return None
+
+    async def _fetch_page_bounded(self, semaphore: asyncio.Semaphore, session: aiohttp.ClientSession, event_id: str, offset: int, limit: int) -> Optional[Dict]:
+        """_fetch_page_async holding one of the event's page_concurrency slots"""
+        async with semaphore:
+            return await self._fetch_page_async(session, event_id, offset, limit)
+
+    async def get_seats_async(self, session: aiohttp.ClientSession, event_id: str) -> List[Dict]:
+        """Async counterpart of get_seats, run on a shared aiohttp session."""
+        seats_data = []
+        limit = self.page_size
+        offsets = [0]
+        semaphore = asyncio.Semaphore(max(1, self.page_concurrency))
 
-            except Exception as e:
-                logger.error(f"Error fetching seats for event {event_id}: {str(e)}")
-                if 'response' in locals() and response and hasattr(response, 'text'):
-                    logger.error(f"Response content: {response.text}")
+        while offsets:
+            pages = await asyncio.gather(*(self._fetch_page_bounded(semaphore, session, event_id, offset, limit) for offset in offsets))
+            if not self._collect_pages(event_id, seats_data, pages, limit):
                 break
+            offsets = self._next_offsets(offsets[-1] + limit, limit, pages[-1].get('total'))
 
         return seats_data
 
@@ -1,4 +1,6 @@
 import re
+import asyncio
+import aiohttp
 from flask import current_app
 import requests
 import logging
@@ -6,13 +8,17 @@ import os
 import json
 from typing import Dict, List, Optional
 from .models import ShowTime, Seat
+from ..services.host_limiter import host_limiters
+from ..services.transport import ProviderTransport, transport_from_env
+from ..services.metrics import provider_request_seconds, provider_responses_total
 
 logger = logging.getLogger(__name__)
 
 class TodayTixAPI:
     BASE_URL = "https://api.todaytix.com/api/v2"
     
-    def __init__(self):
+    def __init__(self, transport: ProviderTransport = None):
+        self.transport = transport or transport_from_env()
         self.proxy_url = os.getenv('PROXY_API_URL')
         self.proxy_api_key = os.getenv('PROXY_API_KEY')
         logger.info(f"Proxy URL: {self.proxy_url}")
@@ -35,11 +41,19 @@ class TodayTixAPI:
             proxy_params.update(params)
         try:
             logger.info(f"Making proxy request to: {target_url}")
-            response = self.session.request(
-                method=method,
-                url=f"{self.proxy_url}/api/proxy/request",
-                params=proxy_params
-            )
+            with host_limiters.get(self.proxy_url).request() as slot, provider_request_seconds.time(provider='todaytix', operation='proxy'):
+                try:
+                    response = self.transport.request(
+                        method,
+                        f"{self.proxy_url}/api/proxy/request",
+                        params=proxy_params,
+                        session=self.session
+                    )
+                except requests.RequestException:
+                    provider_responses_total.inc(provider='todaytix', operation='proxy', status='error')
+                    raise
+                slot.record(response.status_code, response.headers)
+            provider_responses_total.inc(provider='todaytix', operation='proxy', status=response.status_code)
             response.raise_for_status()
             
             proxy_response = response.json()
@@ -56,6 +70,49 @@ class TodayTixAPI:
             logger.error(f"Failed to parse response: {str(e)}")
             return None
 
+    async def _make_proxy_request_async(self, session: aiohttp.ClientSession, method: str, endpoint: str, params: Dict = None) -> Dict:
+        """Async counterpart of _make_proxy_request, run on a shared aiohttp session."""
+        target_url = f"{self.BASE_URL}{endpoint}"
+        proxy_params = {'url': target_url}
+
+        if params:
+            # aiohttp rejects bool params; encode them the way requests does
+            proxy_params.update({k: str(v) if isinstance(v, bool) else v for k, v in params.items()})
+        try:
+            logger.info(f"Making proxy request to: {target_url}")
+            async with host_limiters.get(self.proxy_url).request_async() as slot:
+                with provider_request_seconds.time(provider='todaytix', operation='proxy'):
+                    try:
+                        response = await self.transport.request_async(
+                            session,
+                            method,
+                            f"{self.proxy_url}/api/proxy/request",
+                            params=proxy_params,
+                            headers=dict(self.session.headers)
+                        )
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        provider_responses_total.inc(provider='todaytix', operation='proxy', status='error')
+                        raise
+                slot.record(response.status_code, response.headers)
+            provider_responses_total.inc(provider='todaytix', operation='proxy', status=response.status_code)
+            if response.status_code >= 400:
+                logger.error(f"Proxy request failed: {response.status_code} for {target_url}")
+                return None
+            proxy_response = response.json()
+
+            if not proxy_response.get('content'):
+                logger.error("No content in proxy response")
+                return None
+
+            return json.loads(proxy_response['content'])
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Proxy request failed: {str(e)}")
+            return None
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse response: {str(e)}")
+            return None
+
     def search_event(self, event_name: str, location: int = 2) -> Optional[Dict]:
         """
         Search for an event and return its details.
@@ -142,24 +199,46 @@ class TodayTixAPI:
 
         return None, seats_list
 
+    def _sections_endpoint(self, show_id: int, showtime_id: int) -> str:
+        return f'/shows/{show_id}/showtimes/{showtime_id}/sections'
+
+    def _sections_params(self) -> Dict:
+        return {
+            'allowMultipleGaSections': True,
+            'quantity': 2,
+            'groupSelectionBy': 'SAME_PROVIDER'
+        }
+
     def get_seats(self, show_id: int, showtime_id: int, rules: dict = None, excluded_seats: dict = None) -> List[Dict]:
         """
         Get available seats for a specific showtime.
         When rules exist, apply pattern matching.
         When no rules, get pairs of seats starting with lowest numbered seats.
         """
-        params = {
-            'allowMultipleGaSections': True,
-            'quantity': 2,
-            'groupSelectionBy': 'SAME_PROVIDER'
-        }
-        
         data = self._make_proxy_request(
             'GET',
-            f'/shows/{show_id}/showtimes/{showtime_id}/sections',
-            params=params
+            self._sections_endpoint(show_id, showtime_id),
+            params=self._sections_params()
         )
-        
+        if data is None:
+            raise RuntimeError(f"Failed to get sections for showtime {showtime_id}")
+        return self._pair_seats(data, rules, excluded_seats)
+
+    async def get_seats_async(self, session: aiohttp.ClientSession, show_id: int, showtime_id: int,
+                              rules: dict = None, excluded_seats: dict = None) -> List[Dict]:
+        """Async counterpart of get_seats, run on a shared aiohttp session."""
+        data = await self._make_proxy_request_async(
+            session,
+            'GET',
+            self._sections_endpoint(show_id, showtime_id),
+            params=self._sections_params()
+        )
+        if data is None:
+            raise RuntimeError(f"Failed to get sections for showtime {showtime_id}")
+        return self._pair_seats(data, rules, excluded_seats)
+
+    def _pair_seats(self, data: Optional[Dict], rules: dict = None, excluded_seats: dict = None) -> List[Dict]:
+        """Turn a sections response into the cheapest seat pair per section and row."""
         if not data or 'data' not in data:
             return []
     